@@ -0,0 +1,123 @@
+"""
+Synthetic dataset generator for the benchmarks.
+
+Writes N images and M YOLO label files (labels for the first M images) into one
+folder, with a configurable number of boxes per file and class distribution.
+Generation is seeded, so the same arguments always produce the same dataset.
+
+Usage: python -m benchmarks.dataset <folder> [--images N] [--labels M] ...
+"""
+import os
+import argparse
+import numpy as np
+from PIL import Image
+
+from src.utils import save_yolo
+
+DEFAULT_IMAGE_SIZE = (1920, 1080)
+
+def parse_range(value):
+    """'8' -> (8, 8), '2-12' -> (2, 12)"""
+    low, _, high = str(value).partition('-')
+    return int(low), int(high or low)
+
+def parse_weights(value, num_classes):
+    """'5,3,1' -> normalized class probabilities; empty -> uniform over num_classes"""
+    if not value:
+        return np.full(num_classes, 1.0 / num_classes)
+    weights = np.array([float(w) for w in value.split(',')], dtype=np.float64)
+    return weights / weights.sum()
+
+def random_boxes(rng, count, class_probs):
+    """count normalized YOLO boxes fully inside the image, classes drawn from class_probs."""
+    w = rng.uniform(0.01, 0.3, count)
+    h = rng.uniform(0.01, 0.3, count)
+    x = rng.uniform(w / 2, 1 - w / 2)
+    y = rng.uniform(h / 2, 1 - h / 2)
+    classes = rng.choice(len(class_probs), size=count, p=class_probs)
+    return [{
+        'class_id': int(c),
+        'x_center': float(xc),
+        'y_center': float(yc),
+        'w': float(bw),
+        'h': float(bh)
+    } for c, xc, yc, bw, bh in zip(classes, x, y, w, h)]
+
+def write_image(path, size, seed):
+    """A cheap but non-trivial image (gradient plus noise) so JPEG sizes are realistic."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.integers(0, 64, (height // 8, width // 8, 3), dtype=np.uint8)
+    noise = np.asarray(Image.fromarray(noise).resize((width, height), Image.NEAREST), dtype=np.float32)
+    pixels = np.clip(gradient * 0.75 + noise, 0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(path, "JPEG", quality=85)
+
+def generate_dataset(folder, num_images=200, num_labels=None, boxes_per_file=(2, 12), num_classes=8,
+                     class_weights=None, image_size=DEFAULT_IMAGE_SIZE, seed=0):
+    """
+    Writes the synthetic dataset into folder.
+    
+    Args:
+        num_labels (int): Number of label files (default: one per image).
+        boxes_per_file (tuple): Inclusive (min, max) boxes per label file.
+        class_weights (np.ndarray): Class probabilities (default: uniform over num_classes).
+    
+    Returns:
+        list: Image filenames, in generation order.
+    """
+    os.makedirs(folder, exist_ok=True)
+    num_labels = num_images if num_labels is None else min(num_labels, num_images)
+    class_probs = class_weights if class_weights is not None else np.full(num_classes, 1.0 / num_classes)
+    rng = np.random.default_rng(seed)
+
+    filenames = []
+    for i in range(num_images):
+        filename = f"frame_{i}.jpg"
+        write_image(os.path.join(folder, filename), image_size, seed + i)
+        filenames.append(filename)
+
+    for filename in filenames[:num_labels]:
+        count = int(rng.integers(boxes_per_file[0], boxes_per_file[1] + 1))
+        name, _ = os.path.splitext(filename)
+        save_yolo(os.path.join(folder, name + ".txt"), random_boxes(rng, count, class_probs))
+
+    with open(os.path.join(folder, "predefined_classes.txt"), 'w') as f:
+        for class_id in range(len(class_probs)):
+            f.write(f"class_{class_id}\n")
+
+    return filenames
+
+def add_dataset_arguments(parser):
+    parser.add_argument("--images", type=int, default=200, help="number of images")
+    parser.add_argument("--labels", type=int, default=None, help="number of label files (default: one per image)")
+    parser.add_argument("--boxes", default="2-12", help="boxes per label file, 'N' or 'MIN-MAX'")
+    parser.add_argument("--classes", type=int, default=8, help="number of classes")
+    parser.add_argument("--class-weights", default="", help="comma separated class weights (default: uniform)")
+    parser.add_argument("--image-size", default="1920x1080", help="WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=0)
+
+def dataset_options(args):
+    """The generate_dataset() keyword arguments for parsed command line args."""
+    width, height = (int(v) for v in args.image_size.lower().split('x'))
+    weights = parse_weights(args.class_weights, args.classes)
+    return {
+        'num_images': args.images,
+        'num_labels': args.labels,
+        'boxes_per_file': parse_range(args.boxes),
+        'num_classes': len(weights),
+        'class_weights': weights,
+        'image_size': (width, height),
+        'seed': args.seed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic YOLO dataset")
+    parser.add_argument("folder")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+    filenames = generate_dataset(args.folder, **dataset_options(args))
+    print(f"Wrote {len(filenames)} images to {args.folder}")
+
+if __name__ == "__main__":
+    main()
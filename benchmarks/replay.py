@@ -0,0 +1,216 @@
+"""
+Replays an input trace recorded with F9 (src.input_trace) against AnnotationApp
+and measures UI latency on an identical workload.
+
+For every event it records the handler latency (the synchronous event_generate()
+dispatch), the frame time (handler plus the idle redraw flush) and the number of
+redraw_canvas() calls. Without a DISPLAY, an Xvfb virtual X server is started.
+
+Usage:
+    python -m benchmarks.replay input_trace.jsonl [--image-dir DIR] [--speed 0] [--no-buffer-pool] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import numpy as np
+
+VIRTUAL_DISPLAY = ":99"
+
+def start_virtual_display(screen="1920x1080x24"):
+    """Starts Xvfb when no display is available. Returns the process (or None)."""
+    if os.environ.get('DISPLAY'):
+        return None
+    if not shutil.which('Xvfb'):
+        sys.exit("No DISPLAY and Xvfb was not found. Install Xvfb or run under a desktop session.")
+    process = subprocess.Popen(['Xvfb', VIRTUAL_DISPLAY, '-screen', '0', screen, '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = VIRTUAL_DISPLAY
+    time.sleep(0.5) # let the server come up
+    return process
+
+def silence_dialogs():
+    """Modal dialogs would block the replay: log them and answer 'no' instead."""
+    from tkinter import messagebox, filedialog, simpledialog
+    def log(kind, answer=None):
+        def dialog(title=None, message=None, **kwargs):
+            print(f"[{kind}] {title}: {message}", file=sys.stderr)
+            return answer
+        return dialog
+    for name in ('showinfo', 'showwarning', 'showerror'):
+        setattr(messagebox, name, log(name))
+    for name in ('askyesno', 'askokcancel', 'askyesnocancel'):
+        setattr(messagebox, name, log(name, False))
+    for name in ('askdirectory', 'asksaveasfilename', 'askopenfilename'):
+        setattr(filedialog, name, log(name, ""))
+    for name in ('askstring', 'askinteger', 'askfloat'):
+        setattr(simpledialog, name, log(name, None))
+
+def generate(app, root, event):
+    """Regenerates one recorded event on its widget. Returns False if the widget no longer exists."""
+    try:
+        widget = root.nametowidget(event['widget'])
+    except KeyError:
+        return False
+
+    kwargs = {'x': event.get('x') or 0, 'y': event.get('y') or 0}
+    if event.get('state') is not None:
+        kwargs['state'] = event['state']
+    event_type = event['type']
+
+    if event_type.startswith('Key'):
+        # Key events go to the focus window
+        if root.focus_get() is not widget:
+            widget.focus_force()
+        widget.event_generate(f"<{event_type}>", keysym=event['keysym'], **kwargs)
+    elif event_type.startswith('Button'):
+        widget.event_generate(f"<{event_type}>", button=event.get('num') or 1, **kwargs)
+    elif event_type == 'MouseWheel':
+        widget.event_generate("<MouseWheel>", delta=event.get('delta') or 0, **kwargs)
+    else:
+        widget.event_generate(f"<{event_type}>", **kwargs)
+    return True
+
+def percentiles(values):
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(max(values))}
+
+def replay(header, events, image_dir=None, output_dir=None, speed=0.0, buffer_pool=True):
+    """
+    Drives a fresh AnnotationApp with the events.
+    
+    Args:
+        speed (float): 0 replays as fast as possible, 1 at the recorded pace, 2 twice as fast, ...
+        buffer_pool (bool): False allocates a new PhotoImage for every displayed image,
+                            as before the display buffer pool, for before/after runs.
+    
+    Returns:
+        dict: Totals, per-event-type latency percentiles and the perf timer summary.
+    """
+    import tkinter as tk
+    from src import perf
+    from src.app import AnnotationApp
+
+    silence_dialogs()
+    root = tk.Tk()
+    if header.get('geometry'):
+        root.geometry(header['geometry'])
+    app = AnnotationApp(root)
+    app.watchdog.stop()
+    app.auto_save.set(False) # never touch the dataset's labels
+    if not buffer_pool:
+        app.display_buffers.max_buffers = 0 # every show() allocates and keeps nothing
+
+    app.image_dir = image_dir or header.get('image_dir') or ""
+    app.output_dir = output_dir or header.get('output_dir') or app.image_dir
+    if app.image_dir:
+        app.load_images()
+        if header.get('image') in app.image_list:
+            app.load_image(app.image_list.index(header['image']))
+    app.zoom_factor = header.get('zoom_factor', 1.0)
+    if app.current_image:
+        app.redraw_canvas()
+    root.update()
+
+    # Count redraws through the instance, which every handler calls via self.redraw_canvas
+    redraws = [0]
+    original_redraw = app.redraw_canvas
+    def counted_redraw(*args, **kwargs):
+        redraws[0] += 1
+        return original_redraw(*args, **kwargs)
+    app.redraw_canvas = counted_redraw
+
+    perf.reset()
+    perf.set_enabled(True)
+
+    samples = [] # (type, handler_ms, frame_ms, redraws, photo_allocs)
+    skipped = 0
+    start = time.perf_counter()
+    for event in events:
+        if speed > 0:
+            delay = start + event['t'] / speed - time.perf_counter()
+            if delay > 0:
+                # Keep servicing timers and background results while waiting
+                end = time.perf_counter() + delay
+                while time.perf_counter() < end:
+                    root.update()
+                    time.sleep(0.001)
+
+        before = redraws[0]
+        allocs = perf.get_counter("display.photo_alloc")
+        t0 = time.perf_counter()
+        if not generate(app, root, event):
+            skipped += 1
+            continue
+        t1 = time.perf_counter()
+        root.update_idletasks() # geometry and canvas redisplay
+        t2 = time.perf_counter()
+        samples.append((event['type'], (t1 - t0) * 1000, (t2 - t0) * 1000, redraws[0] - before,
+                        perf.get_counter("display.photo_alloc") - allocs))
+        root.update() # pending after() callbacks, not attributed to the event
+    total = time.perf_counter() - start
+
+    perf.set_enabled(False)
+    by_type = {}
+    for event_type in sorted(set(s[0] for s in samples)):
+        rows = [s for s in samples if s[0] == event_type]
+        by_type[event_type] = {
+            'count': len(rows),
+            'redraws': sum(r[3] for r in rows),
+            'photo_allocs': sum(r[4] for r in rows),
+            'handler': percentiles([r[1] for r in rows]),
+            'frame': percentiles([r[2] for r in rows])
+        }
+
+    result = {
+        'buffer_pool': buffer_pool,
+        'events': len(samples),
+        'skipped': skipped,
+        'wall_s': total,
+        'redraws': redraws[0],
+        'handler': percentiles([s[1] for s in samples]),
+        'frame': percentiles([s[2] for s in samples]),
+        'by_type': by_type,
+        'perf': perf.summary(),
+        'counters': perf.counters()
+    }
+    root.destroy()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an input trace and measure UI latency")
+    parser.add_argument("trace")
+    parser.add_argument("--image-dir", help="override the image folder stored in the trace")
+    parser.add_argument("--output-dir", help="override the label folder stored in the trace")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="0 = as fast as possible (default), 1 = recorded pace")
+    parser.add_argument("--no-buffer-pool", action="store_true",
+                        help="allocate a PhotoImage per displayed image (the behaviour before the buffer pool)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    from src.input_trace import load_trace
+    header, events = load_trace(args.trace)
+
+    display = start_virtual_display()
+    try:
+        result = replay(header, events, args.image_dir, args.output_dir, args.speed, not args.no_buffer_pool)
+    finally:
+        if display:
+            display.terminate()
+
+    result['trace'] = args.trace
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
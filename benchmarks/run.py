@@ -0,0 +1,253 @@
+"""
+Micro-benchmarks for the src/utils hot functions and batch paths.
+
+Generates a synthetic dataset (see benchmarks.dataset), times every benchmark
+over several repeats and prints the results as JSON. With --baseline, each
+median is compared against a stored run and the exit code is 1 when any
+benchmark is slower than the baseline by more than --tolerance.
+
+Usage:
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import contextlib
+import platform
+import statistics
+import tempfile
+import numpy as np
+import PIL
+
+from src.utils import (parse_yolo, save_yolo, normalize_box, denormalize_box, natural_sort_key,
+                       update_annotation_file, backup_annotations, scan_images_for_class,
+                       resize_images_to_lowres)
+from benchmarks.dataset import generate_dataset, add_dataset_arguments, dataset_options
+
+DEFAULT_REPEATS = 5
+DEFAULT_TOLERANCE = 0.10
+RESIZE_IMAGES = 10 # resize_images_to_lowres writes 1920x1080 JPEGs, keep it small
+
+BENCHMARKS = [] # (name, setup function)
+
+def benchmark(name):
+    """
+    Registers a benchmark. The decorated function receives the dataset context and
+    returns (run, items, cleanup): run() is timed, items is the number of units it
+    processes, cleanup() (or None) runs untimed after every repeat.
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+def label_paths(ctx):
+    return [os.path.join(ctx['folder'], os.path.splitext(f)[0] + ".txt") for f in ctx['labeled']]
+
+@benchmark("parse_yolo")
+def bench_parse_yolo(ctx):
+    paths = label_paths(ctx)
+    def run():
+        for path in paths:
+            parse_yolo(path, 1920, 1080)
+    return run, len(paths), None
+
+@benchmark("save_yolo")
+def bench_save_yolo(ctx):
+    out_dir = os.path.join(ctx['scratch'], "save_yolo")
+    os.makedirs(out_dir, exist_ok=True)
+    items = [(os.path.join(out_dir, os.path.basename(p)), parse_yolo(p, 1920, 1080)) for p in label_paths(ctx)]
+    def run():
+        for path, boxes in items:
+            save_yolo(path, boxes)
+    return run, len(items), None
+
+@benchmark("normalize_denormalize")
+def bench_normalize(ctx):
+    boxes = [b for p in label_paths(ctx) for b in parse_yolo(p, 1920, 1080)]
+    def run():
+        for box in boxes:
+            x1, y1, x2, y2 = denormalize_box(box, 1920, 1080)
+            normalize_box(x1, y1, x2, y2, 1920, 1080)
+    return run, len(boxes), None
+
+@benchmark("natural_sort")
+def bench_natural_sort(ctx):
+    names = list(ctx['filenames'])
+    random.Random(0).shuffle(names)
+    def run():
+        sorted(names, key=natural_sort_key)
+    return run, len(names), None
+
+@benchmark("update_annotation_file")
+def bench_update_annotation_file(ctx):
+    # Work on copies: the other benchmarks read the dataset's labels
+    out_dir = os.path.join(ctx['scratch'], "update_annotation_file")
+    os.makedirs(out_dir, exist_ok=True)
+    sources = label_paths(ctx)
+    paths = [os.path.join(out_dir, os.path.basename(p)) for p in sources]
+    # Rotate every class ID by one, so the file content changes but no box is dropped
+    num_classes = ctx['num_classes']
+    mapping = {c: (c + 1) % num_classes for c in range(num_classes)}
+    def restore():
+        for source, path in zip(sources, paths):
+            shutil.copyfile(source, path)
+    def run():
+        for path in paths:
+            update_annotation_file(path, mapping)
+    restore()
+    return run, len(paths), restore
+
+@benchmark("backup_annotations")
+def bench_backup_annotations(ctx):
+    result = {}
+    def run():
+        result['dir'] = backup_annotations(ctx['folder'])
+    def cleanup():
+        if result.get('dir'):
+            shutil.rmtree(result['dir'], ignore_errors=True)
+    return run, len(ctx['labeled']), cleanup
+
+@benchmark("filter_scan")
+def bench_filter_scan(ctx):
+    # The rarest class makes the scan read the most lines per file
+    class_id = int(np.argmin(ctx['class_weights']))
+    def run():
+        scan_images_for_class(ctx['folder'], ctx['filenames'], class_id)
+    return run, len(ctx['filenames']), None
+
+@benchmark("resize_images_to_lowres")
+def bench_resize_images(ctx):
+    folder = os.path.join(ctx['scratch'], "resize")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+        for f in ctx['filenames'][:RESIZE_IMAGES]:
+            shutil.copy(os.path.join(ctx['folder'], f), os.path.join(folder, f))
+    def run():
+        resize_images_to_lowres(folder)
+    def cleanup():
+        shutil.rmtree(folder + "_lowres", ignore_errors=True)
+    return run, len(os.listdir(folder)), cleanup
+
+def time_benchmark(setup, ctx, repeats):
+    run, items, cleanup = setup(ctx)
+    timings = []
+    for i in range(repeats + 1):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if cleanup:
+            cleanup()
+        if i > 0: # the first run is a warm-up
+            timings.append(elapsed)
+    median = statistics.median(timings)
+    return {
+        'items': items,
+        'repeats': repeats,
+        'min_s': min(timings),
+        'median_s': median,
+        'mean_s': statistics.mean(timings),
+        'us_per_item': median / max(items, 1) * 1e6
+    }
+
+def compare(results, baseline, tolerance):
+    """Adds the baseline ratio to every result. Returns the names of regressed benchmarks."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old or old.get('items') != result['items']:
+            result['baseline_ratio'] = None # not comparable
+            continue
+        ratio = result['median_s'] / max(old['median_s'], 1e-12)
+        result['baseline_ratio'] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AnnotationTool micro-benchmarks")
+    add_dataset_arguments(parser)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--only", default="", help="comma separated benchmark names")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="also write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown versus the baseline (default: 0.10 = 10%%)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated dataset")
+    args = parser.parse_args()
+
+    options = dataset_options(args)
+    scratch = tempfile.mkdtemp(prefix="annotation_bench_")
+    folder = os.path.join(scratch, "images")
+    try:
+        print(f"Generating {options['num_images']} images in {folder}...", file=sys.stderr)
+        filenames = generate_dataset(folder, **options)
+        num_labels = len(filenames) if options['num_labels'] is None else min(options['num_labels'], len(filenames))
+        ctx = {
+            'scratch': scratch,
+            'folder': folder,
+            'filenames': filenames,
+            'labeled': filenames[:num_labels],
+            'num_classes': options['num_classes'],
+            'class_weights': options['class_weights']
+        }
+
+        only = set(n for n in args.only.split(',') if n)
+        results = {}
+        # The utils functions print progress; keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            for name, setup in BENCHMARKS:
+                if only and name not in only:
+                    continue
+                print(f"Running {name}...")
+                results[name] = time_benchmark(setup, ctx, args.repeats)
+    finally:
+        if args.keep:
+            print(f"Dataset kept in {scratch}", file=sys.stderr)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pillow': PIL.__version__,
+            'numpy': np.__version__,
+            'cpus': os.cpu_count()
+        },
+        'dataset': {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in options.items()},
+        'results': results
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        report['baseline'] = args.baseline
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + "\n")
+
+    for name in regressions:
+        ratio = results[name]['baseline_ratio']
+        print(f"REGRESSION {name}: {ratio:.2f}x baseline median", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ def main():
     
     app = AnnotationApp(root)
     root.mainloop()
+    
+    app.watchdog.stop()
+    app.watchdog.write_summary()
 
 if __name__ == "__main__":
     main()
@@ -2,18 +2,59 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 from PIL import Image, ImageTk
-from src.utils import (load_classes, natural_sort_key, parse_yolo, save_yolo, denormalize_box, 
-                       normalize_box, load_config, save_config, resize_images_to_lowres,
-                       save_classes, create_class_mapping, update_annotation_file, backup_annotations)
-from src.ui_components import DarkButton, DarkLabel, DarkListbox, DarkFrame, SectionLabel, SidebarFrame, THEME, DarkEntry
+from src.utils import (load_classes, natural_sort_key, denormalize_box, 
+                       load_config, save_config, resize_images_to_lowres,
+                       save_classes, create_class_mapping, update_annotation_file, backup_annotations,
+                       get_label_path, scan_images_for_class, make_thumbnail)
+from src.interpolation import interpolate_boxes, write_interpolated_labels
+from src.batch_jobs import (BatchJournal, merge_boxes, paste_boxes_to_files, merge_into_label_files,
+                            list_journals, read_journal_description, undo_journal)
+from src.prefetch import ImagePrefetcher
+from src.tracker import track_forward
+from src.dedup import compute_hashes, cluster_hashes
+from src.similarity import SimilarityIndex
+from src.preannotate import PreannotationQueue, DEFAULT_LOOKAHEAD, DEFAULT_BATCH_SIZE, DEFAULT_WORKER_COMMAND
+from src.auto_annotate import (auto_annotate_frames, DEFAULT_SEARCH_MARGIN, DEFAULT_SCORE_THRESHOLD,
+                               DEFAULT_WORKING_WIDTH)
+from src import perf
+from src.watchdog import StallWatchdog
+from src.input_trace import InputRecorder
+from src.session import AnnotationSession
+from src.display_buffers import DisplayBufferPool
+from src.scrub import ScrubCache
+from src.thumbnail_cache import ThumbnailCache, THUMB_SIZE
+from src.filmstrip import Filmstrip
+from src.contact_sheet import ContactSheetWindow
+from src.metadata import MetadataCache
+from src.lint import lint_dataset, fix_label_files, LintReportWindow
+from src.dataset_stats import DatasetStatistics, export_summary_csv, export_summary_json, heatmap_overlay
+from src.overlay import plan_overlay, label_visible, LabelPool, rasterize_boxes, BITMAP_OVERLAY_MIN_BOXES
+from src.ui_components import DarkButton, DarkLabel, DarkListbox, DarkFrame, SectionLabel, SidebarFrame, THEME, DarkEntry, ProgressDialog
 import tkinter.simpledialog as simpledialog
 import tkinter.simpledialog as simpledialog
 import shutil
 import threading
+import time
 import concurrent.futures
 
 
+def _session_property(name):
+    """Exposes an AnnotationSession attribute as an app attribute"""
+    return property(lambda self: getattr(self.session, name),
+                    lambda self, value: setattr(self.session, name, value))
+
 class AnnotationApp:
+    # Frame list, boxes, selection and clipboard live in the Tk-free session
+    image_dir = _session_property('image_dir')
+    output_dir = _session_property('output_dir')
+    image_list = _session_property('image_list')
+    full_image_list = _session_property('full_image_list')
+    current_image_index = _session_property('current_index')
+    boxes = _session_property('boxes') # List of dicts (normalized)
+    selected_indices = _session_property('selected') # Set of ints
+    clipboard = _session_property('clipboard')
+    image_size = _session_property('image_size') # (width, height) at full resolution
+
     def __init__(self, root):
         self.root = root
         self.root.title("Annotation Tool - Midnight Glass")
@@ -21,13 +62,12 @@ class AnnotationApp:
         self.root.configure(bg=THEME['bg_main'])
         
         # State
-        self.image_dir = ""
-        self.output_dir = ""
-        self.image_list = []
-        self.full_image_list = [] # Store full list for filtering
-        self.current_image_index = -1
+        self.session = AnnotationSession()
+        self.session.subscribe(self.on_session_event)
         self.current_image = None # PIL Image
         self.tk_image = None # ImageTk
+        self.full_resolution = True # False while current_image is a reduced first-paint decode
+        self.full_resolution_pending = None # path of the frame decoding in the background
         self.scale = 1.0
         self.offset_x = 0
         self.offset_y = 0
@@ -42,11 +82,52 @@ class AnnotationApp:
         # Rendering Cache
         self.cached_dims = None # (width, height)
         self.cached_image_obj = None
+        self.display_buffers = DisplayBufferPool() # PhotoImages refilled instead of reallocated
         self.is_panning = False
-        
-        self.boxes = [] # List of dicts (normalized)
-        self.selected_indices = set() # Set of ints
-        self.clipboard = []
+        self.refine_delay_ms = 150 # idle time after a NEAREST preview before the LANCZOS upgrade
+        self.refine_generation = 0 # bumped on every resample; refine jobs of older views are dropped
+        self.refine_after_id = None
+        
+        # Decoded image buffer for the frames around the cursor
+        self.prefetcher = ImagePrefetcher(max_items=8)
+        self.prefetch_ahead = 3
+        
+        # Scrub mode: while navigation repeats faster than scrub_interval_ms, show thumbnails
+        # and load the frame in full once the key is released or nothing happened for scrub_settle_ms
+        self.scrub_cache = ScrubCache()
+        self.scrub_interval_ms = 120
+        self.scrub_settle_ms = 250
+        self.scrub_ahead = 24
+        self.scrub_index = None # frame shown while scrubbing, None when not scrubbing
+        self.scrub_after_id = None
+        self.last_navigation = 0.0
+        
+        # Proposed (ghost) boxes per image filename, accepted with the accept_proposals key
+        self.proposals = {}
+        self.track_frames_ahead = 5
+        
+        # Near-duplicate frame clusters: filename -> representative filename
+        self.frame_clusters = {}
+        self.cluster_members = {} # representative filename -> list of filenames
+        self.skip_duplicates = tk.BooleanVar(value=False)
+        
+        # Appearance descriptor index for "find similar frames"
+        self.similarity_index = None
+        
+        # Performance HUD
+        self.show_perf_hud = tk.BooleanVar(value=False)
+        self.recording_perf = tk.BooleanVar(value=False) # Keeps the timers on for Export Perf Trace
+        self.perf_hud_job = None
+        
+        # Input trace recording (replayed by benchmarks/replay.py)
+        self.recording_input = tk.BooleanVar(value=False)
+        self.input_recorder = InputRecorder(self.root, ignore_keysyms={self.config['toggle_input_trace'].strip('<>')})
+        
+        # Pre-Annotation Backend State
+        self.preannotation_queue = None
+        self.preannotation_command = DEFAULT_WORKER_COMMAND
+        self.preannotation_lookahead = DEFAULT_LOOKAHEAD
+        self.preannotation_batch_size = DEFAULT_BATCH_SIZE
         
         self.is_drawing = False
         self.start_x = 0
@@ -66,14 +147,49 @@ class AnnotationApp:
         self.batch_resize_template_w = None
         self.batch_resize_template_h = None
         
+        # Auto Annotate State
+        self.auto_annotate_exemplar = None # {'filename': str, 'box': dict}
+        
+        # Keyframe Interpolation State
+        self.keyframe = None # {'filename': str, 'boxes': list}
+        self.interpolate_by_order = tk.BooleanVar(value=False)
+        
         self.auto_save = tk.BooleanVar(value=True)
         self.show_labels = tk.BooleanVar(value=True)
+        self.bitmap_overlay = tk.BooleanVar(value=True)
+        self.show_filmstrip = tk.BooleanVar(value=False)
+        self.thumbnail_cache = None # ThumbnailCache of image_dir, built while the filmstrip is shown
+        self.contact_sheet = None # ContactSheetWindow while open
+        self.lint_window = None # LintReportWindow while open
+        self.metadata_cache = None # MetadataCache of image_dir (sizes without decoding)
+        self.dataset_stats = None # DatasetStatistics, built when the Statistics tab is first shown
+        self.statistics_summary = None
+        self.statistics_after_id = None
+        self.statistics_reread = False
         self.show_right_sidebar = tk.BooleanVar(value=True)
         
         # UI Setup
         self.setup_ui()
         self.bind_events()
         
+        # Box labels are pooled canvas items; dense frames are drawn with level-of-detail rules
+        self.label_pool = LabelPool(self.canvas, ("Segoe UI", 9, "bold"))
+        self.overlay_merged = False # boxes drawn as clusters or into the bitmap layer
+        
+        # Bitmap overlay layer for frames with thousands of boxes
+        self.display_image = None # resized PIL image behind the canvas image item
+        self.overlay_version = 0 # bumped when the layer's boxes change
+        self.overlay_detached = set() # edited selected boxes left out of the layer
+        self.overlay_layer_key = None
+        self.overlay_base = None # RGBA copy of display_image
+        self.overlay_base_source = None
+        self.overlay_photo = None
+        self.composited = False
+        
+        # Log event-loop freezes with the main thread's stack
+        self.watchdog = StallWatchdog(self.root)
+        self.watchdog.start()
+        
         # Populate filter combobox
         self.update_filter_combo()
 
@@ -108,28 +224,8 @@ class AnnotationApp:
         self.root.config(cursor="wait")
         
         def scan_thread():
-            filtered_images = []
-            total = len(self.full_image_list)
-            
-            # Use threading for faster IO
-            def check_file(filename):
-                name, _ = os.path.splitext(filename)
-                txt_path = os.path.join(self.output_dir, name + ".txt")
-                if os.path.exists(txt_path):
-                    try:
-                        with open(txt_path, 'r') as f:
-                            for line in f:
-                                parts = line.strip().split()
-                                if parts and int(parts[0]) == class_id:
-                                    return filename
-                    except:
-                        pass
-                return None
-
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                results = list(executor.map(check_file, self.full_image_list))
-            
-            filtered_images = [r for r in results if r is not None]
+            with perf.timer("filter_scan"):
+                filtered_images = scan_images_for_class(self.output_dir, self.full_image_list, class_id)
             
             # Update UI on main thread
             self.root.after(0, lambda: self.finish_filter(filtered_images, selection))
@@ -140,10 +236,7 @@ class AnnotationApp:
         self.root.config(cursor="")
         self.image_list = filtered_images
         self.image_list.sort(key=natural_sort_key)
-        
-        self.file_listbox.delete(0, tk.END)
-        for f in self.image_list:
-            self.file_listbox.insert(tk.END, f)
+        self.refresh_file_listbox()
             
         if self.image_list:
             self.load_image(0)
@@ -157,14 +250,186 @@ class AnnotationApp:
     def clear_image_filter(self):
         self.image_list = list(self.full_image_list)
         self.image_list.sort(key=natural_sort_key)
-        
-        self.file_listbox.delete(0, tk.END)
-        for f in self.image_list:
-            self.file_listbox.insert(tk.END, f)
+        self.refresh_file_listbox()
             
         if self.image_list:
             self.load_image(0)
         self.filter_combo.set("")
+
+    # --- Image Metadata ---
+    def refresh_metadata(self):
+        """Bring the folder's metadata cache up to date in the background (header reads of changed files only)"""
+        if not self.image_dir:
+            return
+        filenames = list(self.full_image_list)
+        try:
+            cache = MetadataCache(self.image_dir)
+        except Exception as e:
+            print(f"Error opening metadata cache: {e}")
+            return
+        if self.metadata_cache is not None:
+            self.metadata_cache.close()
+        self.metadata_cache = cache
+        
+        def metadata_thread():
+            try:
+                with perf.timer("metadata.refresh"):
+                    cache.refresh(filenames)
+            except Exception as e:
+                print(f"Error refreshing metadata cache: {e}")
+        
+        threading.Thread(target=metadata_thread, daemon=True).start()
+
+    def image_size_of(self, filename):
+        """(width, height) of an image of the folder from the metadata cache, or None if it is not read yet"""
+        if self.metadata_cache is None:
+            return None
+        return self.metadata_cache.size(filename)
+
+    # --- Review Sheet ---
+    def open_contact_sheet(self):
+        """Review the current file list as pages of thumbnails with their boxes"""
+        if not self.image_list: return
+        if self.contact_sheet is not None and self.contact_sheet.winfo_exists():
+            self.contact_sheet.lift()
+            return
+        
+        # Pages are rendered from the label files
+        if self.current_image_index != -1 and self.auto_save.get():
+            self.save_annotations()
+        
+        colors = {c['id']: c['color'] for c in self.classes}
+        self.contact_sheet = ContactSheetWindow(self.root, self.image_dir, self.output_dir, self.image_list, colors,
+                                                self.open_from_contact_sheet, self.show_flagged_frames)
+
+    def open_from_contact_sheet(self, filename):
+        if filename not in self.image_list:
+            self.clear_image_filter()
+        if filename in self.image_list:
+            self.load_image(self.image_list.index(filename))
+            self.root.lift()
+
+    def show_flagged_frames(self, filenames):
+        flagged = set(filenames)
+        filtered = [f for f in self.full_image_list if f in flagged]
+        if not filtered:
+            messagebox.showinfo("Review Sheet", "No flagged frames.")
+            return
+        self.image_list = filtered
+        self.refresh_file_listbox()
+        self.load_image(0)
+
+    def refresh_file_listbox(self):
+        self.file_listbox.delete(0, tk.END)
+        for f in self.image_list:
+            self.file_listbox.insert(tk.END, f)
+        if self.show_filmstrip.get():
+            self.filmstrip.set_count(len(self.image_list))
+
+    # --- Filmstrip ---
+    def on_filmstrip_toggle(self):
+        if self.show_filmstrip.get():
+            self.filmstrip.grid()
+            self.filmstrip.set_count(len(self.image_list))
+            self.filmstrip.show_index(self.current_image_index)
+            if self.thumbnail_cache is None:
+                self.build_thumbnails()
+        else:
+            self.filmstrip.grid_remove()
+
+    def get_filmstrip_thumbnail(self, index):
+        if self.thumbnail_cache is None:
+            return None
+        return self.thumbnail_cache.get(self.image_list[index])
+
+    def get_filmstrip_boxes(self, index):
+        return self.scrub_cache.boxes(get_label_path(self.output_dir, self.image_list[index]))
+
+    def build_thumbnails(self):
+        """Generate missing thumbnails in a process pool, nearest to the current frame first"""
+        if not self.full_image_list:
+            return
+        cache = ThumbnailCache(self.image_dir)
+        self.thumbnail_cache = cache
+        cache.load()
+        
+        center = 0
+        if self.current_image_index != -1 and self.image_list[self.current_image_index] in self.full_image_list:
+            center = self.full_image_list.index(self.image_list[self.current_image_index])
+        order = sorted(range(len(self.full_image_list)), key=lambda i: abs(i - center))
+        filenames = [self.full_image_list[i] for i in order]
+        
+        def on_progress(done, total):
+            self.root.after(0, self.on_thumbnail_progress, cache, done, total)
+        
+        def thumbnail_thread():
+            try:
+                cache.build(filenames, progress_callback=on_progress, should_stop=lambda: self.thumbnail_cache is not cache)
+            except Exception as e:
+                print(f"Error building thumbnails: {e}")
+            self.root.after(0, self.on_thumbnail_progress, cache, None, None)
+        
+        threading.Thread(target=thumbnail_thread, daemon=True).start()
+
+    def on_thumbnail_progress(self, cache, done, total):
+        if cache is not self.thumbnail_cache:
+            return
+        self.filmstrip.status = f"Thumbnails {done}/{total}" if done is not None else ""
+        if self.show_filmstrip.get():
+            self.filmstrip.render()
+
+    def find_similar_frames(self):
+        """Show the frames that look most like the current one as a filter result"""
+        if self.current_image_index == -1: return
+        
+        if self.similarity_index is None:
+            self.build_similarity_index(self.find_similar_frames)
+            return
+        
+        filename = self.image_list[self.current_image_index]
+        results = self.similarity_index.query(self.similarity_index.descriptor(filename))
+        
+        # Keep the current frame on top so the results can be paged through with next/prev
+        similar = [filename] + [f for f, _ in results if f != filename]
+        self.image_list = similar
+        self.refresh_file_listbox()
+        self.load_image(0)
+
+    def build_similarity_index(self, on_done=None):
+        """Build (or incrementally update) the descriptor index in the background"""
+        if not self.full_image_list:
+            return
+        
+        filenames = list(self.full_image_list)
+        index = SimilarityIndex(self.image_dir)
+        dialog = ProgressDialog(self.root, "Similar Frames", "Indexing frames...")
+        step = max(1, len(filenames) // 100)
+        
+        def on_progress(done, total):
+            if done % step == 0 or done == total:
+                self.root.after(0, dialog.update_progress, done, total)
+        
+        def index_thread():
+            try:
+                index.build(filenames, progress_callback=on_progress)
+                ok = True
+            except Exception as e:
+                print(f"Error building similarity index: {e}")
+                ok = False
+            self.root.after(0, lambda: self.finish_similarity_index(dialog, filenames, index if ok else None, on_done))
+        
+        threading.Thread(target=index_thread, daemon=True).start()
+
+    def finish_similarity_index(self, dialog, filenames, index, on_done):
+        if dialog.winfo_exists():
+            dialog.destroy()
+        
+        if index is None or filenames != self.full_image_list:
+            return
+        
+        self.similarity_index = index
+        if on_done:
+            on_done()
         
     def setup_ui(self):
         # Toolbar (Top) for toggles
@@ -235,13 +500,46 @@ class AnnotationApp:
         
         DarkButton(self.sidebar, text="Copy Boxes (Ctrl+C)", command=self.copy_boxes).pack(fill=tk.X, padx=10, pady=2)
         DarkButton(self.sidebar, text="Paste Boxes (Ctrl+V)", command=self.paste_boxes).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Paste to Range...", command=self.paste_boxes_to_range).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Paste to Filtered Images", command=self.paste_boxes_to_filtered).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Undo Last Batch", command=self.undo_last_batch).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Lint Labels", command=self.run_lint).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Track Forward (T)", command=self.track_boxes_forward).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Accept Proposals (Enter)", command=self.accept_proposals).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Set Keyframe (K)", command=self.set_keyframe).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Interpolate to Keyframe (I)", command=self.interpolate_from_keyframe).pack(fill=tk.X, padx=10, pady=2)
+        
+        DarkButton(self.sidebar, text="Propagate to Duplicates", command=self.propagate_to_cluster).pack(fill=tk.X, padx=10, pady=2)
+        
+        tk.Checkbutton(self.sidebar, text="Skip Duplicate Frames", variable=self.skip_duplicates, command=self.on_skip_duplicates_toggle,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+        
+        tk.Checkbutton(self.sidebar, text="Match Keyframes by Order", variable=self.interpolate_by_order,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
         
         tk.Checkbutton(self.sidebar, text="Auto Save", variable=self.auto_save, 
                        bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
         
         tk.Checkbutton(self.sidebar, text="Show Labels", variable=self.show_labels, command=self.redraw_canvas,
                        bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+        
+        tk.Checkbutton(self.sidebar, text=f"Bitmap Overlay ({BITMAP_OVERLAY_MIN_BOXES}+ boxes)", variable=self.bitmap_overlay, command=self.redraw_canvas,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+        
+        tk.Checkbutton(self.sidebar, text="Filmstrip", variable=self.show_filmstrip, command=self.on_filmstrip_toggle,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+        
+        tk.Checkbutton(self.sidebar, text="Performance HUD (F3)", variable=self.show_perf_hud, command=self.on_perf_hud_toggle,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
 
+        tk.Checkbutton(self.sidebar, text="Record Input Trace (F9)", variable=self.recording_input, command=self.on_input_trace_toggle,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+
+        tk.Checkbutton(self.sidebar, text="Record Perf Trace", variable=self.recording_perf, command=self.on_perf_recording_toggle,
+                       bg=THEME['bg_sidebar'], fg=THEME['fg_text'], selectcolor=THEME['bg_sidebar'], activebackground=THEME['bg_sidebar'], activeforeground=THEME['fg_highlight']).pack(anchor='w', padx=10, pady=5)
+        DarkButton(self.sidebar, text="Export Perf Trace", command=self.export_perf_trace).pack(fill=tk.X, padx=10, pady=2)
+        DarkButton(self.sidebar, text="Stall Report", command=self.show_stall_report).pack(fill=tk.X, padx=10, pady=2)
+        
         DarkButton(self.sidebar, text="Settings", command=self.open_settings_dialog).pack(fill=tk.X, padx=10, pady=(10, 2))
 
         # File List
@@ -260,6 +558,9 @@ class AnnotationApp:
         
         DarkButton(btn_filter_frame, text="Filter", command=self.apply_image_filter, width=8).pack(side=tk.LEFT, padx=(0, 2), expand=True, fill=tk.X)
         DarkButton(btn_filter_frame, text="Clear", command=self.clear_image_filter, width=8).pack(side=tk.RIGHT, padx=(2, 0), expand=True, fill=tk.X)
+        
+        DarkButton(filter_frame, text="Find Similar Frames", command=self.find_similar_frames).pack(fill=tk.X, pady=2)
+        DarkButton(filter_frame, text="Review Sheet", command=self.open_contact_sheet).pack(fill=tk.X, pady=2)
 
         # Container for listbox and scrollbar
         file_list_container = DarkFrame(self.sidebar, bg=THEME['bg_sidebar'])
@@ -298,14 +599,20 @@ class AnnotationApp:
         self.canvas.grid(row=0, column=0, sticky="nsew")
         
         # Scrollbars
-        self.v_scroll = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.v_scroll = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.on_scroll_y)
         self.v_scroll.grid(row=0, column=1, sticky="ns")
         
-        self.h_scroll = tk.Scrollbar(self.canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.h_scroll = tk.Scrollbar(self.canvas_frame, orient=tk.HORIZONTAL, command=self.on_scroll_x)
         self.h_scroll.grid(row=1, column=0, sticky="ew")
         
         self.canvas.configure(yscrollcommand=self.v_scroll.set, xscrollcommand=self.h_scroll.set)
         
+        # Thumbnail navigator below the canvas, shown with the Filmstrip checkbox
+        self.filmstrip = Filmstrip(self.canvas_frame, THUMB_SIZE, self.get_filmstrip_thumbnail, self.get_filmstrip_boxes,
+                                   lambda: {c['id']: c['color'] for c in self.classes}, self.load_image)
+        self.filmstrip.grid(row=2, column=0, columnspan=2, sticky="ew")
+        self.filmstrip.grid_remove()
+        
         self.canvas.bind("<Button-1>", self.on_canvas_click)
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
@@ -325,6 +632,14 @@ class AnnotationApp:
         # Keyboard focus
         self.canvas.bind("<Button-1>", lambda e: self.canvas.focus_set(), add="+")
 
+    def on_scroll_x(self, *args):
+        self.canvas.xview(*args)
+        self.redraw_canvas() # Boxes outside the view are not drawn
+
+    def on_scroll_y(self, *args):
+        self.canvas.yview(*args)
+        self.redraw_canvas()
+
     def bind_events(self):
         self.root.bind(self.config['prev_image'], lambda e: self.prev_image())
         self.root.bind(self.config['next_image'], lambda e: self.next_image())
@@ -334,6 +649,12 @@ class AnnotationApp:
         self.root.bind(self.config['paste'], lambda e: self.paste_boxes())
         self.root.bind(self.config['edit_class'], lambda e: self.edit_selected_box_class())
         self.root.bind(self.config['deselect'], lambda e: self.deselect_class())
+        self.root.bind(self.config['set_keyframe'], lambda e: self.set_keyframe())
+        self.root.bind(self.config['interpolate'], lambda e: self.interpolate_from_keyframe())
+        self.root.bind(self.config['track_forward'], lambda e: self.track_boxes_forward())
+        self.root.bind(self.config['accept_proposals'], lambda e: self.accept_proposals())
+        self.root.bind(self.config['toggle_perf_hud'], lambda e: self.toggle_perf_hud())
+        self.root.bind(self.config['toggle_input_trace'], lambda e: self.toggle_input_trace())
         
         # Keep arrow keys as hardcoded navigation alternatives or add to config?
         # Let's keep them as hardcoded secondary options for now, or just rely on config.
@@ -341,6 +662,14 @@ class AnnotationApp:
         # But Left/Right are standard. Let's leave them.
         self.root.bind("<Left>", lambda e: self.prev_image())
         self.root.bind("<Right>", lambda e: self.next_image())
+        
+        # Releasing a navigation key ends scrubbing (auto-repeat sends release/press pairs,
+        # so the settle is delayed briefly and cancelled by the next press)
+        for sequence in (self.config['prev_image'], self.config['next_image'], "<Left>", "<Right>"):
+            try:
+                self.root.bind(f"<KeyRelease-{sequence.strip('<>')}>", lambda e: self.schedule_scrub_settle(60))
+            except tk.TclError:
+                pass # Modifier combinations have no plain release event
 
     def deselect_class(self):
         if self._is_input_focused(): return
@@ -381,6 +710,18 @@ class AnnotationApp:
         game_presets_tab = DarkFrame(notebook)
         notebook.add(game_presets_tab, text="Game Presets")
         
+        # Tab 6: Auto Annotate
+        auto_annotate_tab = DarkFrame(notebook)
+        notebook.add(auto_annotate_tab, text="Auto Annotate")
+        
+        # Tab 7: Pre-Annotation
+        preannotation_tab = DarkFrame(notebook)
+        notebook.add(preannotation_tab, text="Pre-Annotation")
+        
+        # Tab 8: Statistics
+        statistics_tab = DarkFrame(notebook)
+        notebook.add(statistics_tab, text="Statistics")
+        
         # Setup Keybindings Tab
         self.setup_keybindings_tab(keybindings_tab, top)
         
@@ -395,6 +736,15 @@ class AnnotationApp:
 
         # Setup Game Presets Tab
         self.setup_game_presets_tab(game_presets_tab)
+        
+        # Setup Auto Annotate Tab
+        self.setup_auto_annotate_tab(auto_annotate_tab)
+        
+        # Setup Pre-Annotation Tab
+        self.setup_preannotation_tab(preannotation_tab)
+        
+        # Setup Statistics Tab
+        self.setup_statistics_tab(statistics_tab)
     
     def setup_keybindings_tab(self, parent, window):
         """Setup the keybindings configuration tab"""
@@ -640,6 +990,7 @@ class AnnotationApp:
         if self.current_image_index != -1:
             self.load_image(self.current_image_index)
         
+        self.schedule_statistics_refresh()
         messagebox.showinfo("Success", "Class changes applied successfully!")
 
     def setup_batch_operations_tab(self, parent):
@@ -867,6 +1218,7 @@ class AnnotationApp:
         result_msg += f"Changed from: {old_class_name} (ID {old_class_id})\n"
         result_msg += f"Changed to: {new_class_name} (ID {new_class_id})"
         
+        self.schedule_statistics_refresh()
         messagebox.showinfo("Success", result_msg)
         
         # Reload current image to reflect changes
@@ -1050,9 +1402,533 @@ class AnnotationApp:
             except Exception as e:
                 print(f"Error processing {filename}: {e}")
                 
+        self.schedule_statistics_refresh()
         messagebox.showinfo("Success", f"Batch Resize Complete!\nFiles modified: {files_modified}\nLabels updated: {count}")
         if self.current_image_index != -1: self.load_image(self.current_image_index)
 
+    def setup_auto_annotate_tab(self, parent):
+        """Setup the template matching tab for fixed-position HUD elements"""
+        DarkLabel(parent, text="Auto Annotate by Template", font=("Segoe UI", 12, "bold")).pack(pady=10)
+        
+        # Instructions
+        info_text = ("Find a fixed-position element in every frame and label it automatically.\n"
+                     "1. Select exactly one box on the current frame and click 'Use Selected Box'.\n"
+                     "2. Adjust the search margin and score threshold.\n"
+                     "3. Execute to add a box wherever the element is found near its position.")
+        DarkLabel(parent, text=info_text, wraplength=550, fg=THEME['fg_text'], justify=tk.LEFT).pack(pady=5)
+        
+        # Main container
+        main_frame = DarkFrame(parent)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Exemplar Display
+        exemplar_frame = DarkFrame(main_frame)
+        exemplar_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        DarkLabel(exemplar_frame, text="Current Exemplar:", font=("Segoe UI", 9, "bold")).pack(anchor="w")
+        self.auto_annotate_exemplar_label = DarkLabel(exemplar_frame, text="Exemplar: [Not Set]", 
+                                                      fg=THEME['fg_highlight'], wraplength=550)
+        self.auto_annotate_exemplar_label.pack(anchor="w", padx=10)
+        self.update_auto_annotate_exemplar_label()
+        
+        DarkButton(exemplar_frame, text="Use Selected Box", command=self.grab_auto_annotate_exemplar,
+                  bg=THEME['button_bg'], fg=THEME['fg_highlight']).pack(fill=tk.X, pady=5)
+        
+        # Parameters
+        params_frame = DarkFrame(main_frame)
+        params_frame.pack(fill=tk.X, pady=5)
+        
+        DarkLabel(params_frame, text="Search Margin (fraction of image):").grid(row=0, column=0, sticky="w", pady=3)
+        self.auto_annotate_margin_entry = DarkEntry(params_frame, width=10)
+        self.auto_annotate_margin_entry.insert(0, str(DEFAULT_SEARCH_MARGIN))
+        self.auto_annotate_margin_entry.grid(row=0, column=1, sticky="w", padx=10)
+        
+        DarkLabel(params_frame, text="Score Threshold (0-1):").grid(row=1, column=0, sticky="w", pady=3)
+        self.auto_annotate_threshold_entry = DarkEntry(params_frame, width=10)
+        self.auto_annotate_threshold_entry.insert(0, str(DEFAULT_SCORE_THRESHOLD))
+        self.auto_annotate_threshold_entry.grid(row=1, column=1, sticky="w", padx=10)
+        
+        DarkLabel(params_frame, text="Working Width (px):").grid(row=2, column=0, sticky="w", pady=3)
+        self.auto_annotate_width_entry = DarkEntry(params_frame, width=10)
+        self.auto_annotate_width_entry.insert(0, str(DEFAULT_WORKING_WIDTH))
+        self.auto_annotate_width_entry.grid(row=2, column=1, sticky="w", padx=10)
+        
+        self.auto_annotate_filtered_only = tk.BooleanVar(value=False)
+        tk.Checkbutton(main_frame, text="Only search the current (filtered) image list", variable=self.auto_annotate_filtered_only,
+                       bg=THEME['bg_main'], fg=THEME['fg_text'], selectcolor=THEME['bg_main'], activebackground=THEME['bg_main'], activeforeground=THEME['fg_highlight']).pack(anchor='w', pady=5)
+        
+        # Execute button
+        DarkButton(main_frame, text="Execute Auto Annotate", command=self.execute_auto_annotate,
+                  bg=THEME['accent'], fg=THEME['fg_highlight'], font=("Segoe UI", 10, "bold")).pack(fill=tk.X, pady=15)
+
+    def update_auto_annotate_exemplar_label(self):
+        if not self.auto_annotate_exemplar:
+            return
+        box = self.auto_annotate_exemplar['box']
+        class_info = next((c for c in self.classes if c['id'] == box['class_id']), None)
+        class_name = class_info['name'] if class_info else "Unknown"
+        text = f"Exemplar: {class_name} on {self.auto_annotate_exemplar['filename']} | Pos: ({box['x_center']:.3f}, {box['y_center']:.3f}) | Size: {box['w']:.3f} x {box['h']:.3f}"
+        self.auto_annotate_exemplar_label.config(text=text)
+
+    def grab_auto_annotate_exemplar(self):
+        """Use the single selected box of the current frame as template"""
+        if len(self.selected_indices) != 1 or self.current_image_index == -1:
+            messagebox.showwarning("Warning", "Please select exactly one box on the current image.")
+            return
+        
+        box = self.boxes[list(self.selected_indices)[0]]
+        if box['class_id'] == -1:
+            messagebox.showwarning("Warning", "The exemplar box needs a class.")
+            return
+        
+        self.auto_annotate_exemplar = {
+            'filename': self.image_list[self.current_image_index],
+            'box': box.copy()
+        }
+        self.update_auto_annotate_exemplar_label()
+
+    def execute_auto_annotate(self):
+        """Run template matching over the dataset and merge the proposals into the label files"""
+        if not self.image_dir:
+            messagebox.showerror("Error", "No directory loaded.")
+            return
+        
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Please set Output Directory first.")
+            return
+        
+        if not self.auto_annotate_exemplar:
+            messagebox.showwarning("Warning", "Please select an exemplar box first.")
+            return
+        
+        try:
+            margin = float(self.auto_annotate_margin_entry.get())
+            threshold = float(self.auto_annotate_threshold_entry.get())
+            working_width = int(self.auto_annotate_width_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Search margin, threshold and working width must be numbers.")
+            return
+        
+        filenames = list(self.image_list if self.auto_annotate_filtered_only.get() else self.full_image_list)
+        exemplar = self.auto_annotate_exemplar
+        
+        confirm_msg = f"Auto Annotate\n\n"
+        confirm_msg += f"Exemplar: {exemplar['filename']}\n"
+        confirm_msg += f"Images to search: {len(filenames)}\n"
+        confirm_msg += f"Search margin: {margin} | Threshold: {threshold}\n\n"
+        confirm_msg += "Found boxes are merged into the label files and can be reverted with 'Undo Last Batch'. Continue?"
+        
+        if not messagebox.askyesno("Confirm Auto Annotate", confirm_msg):
+            return
+        
+        # Flush the current frame; it is reloaded from disk once the batch is merged
+        self.save_annotations()
+        
+        dialog = ProgressDialog(self.root, "Auto Annotate", "Matching template...", modal=True)
+        step = max(1, len(filenames) // 100)
+        
+        def on_progress(done, total):
+            if done % step == 0 or done == total:
+                self.root.after(0, dialog.update_progress, done, total)
+        
+        def match_thread():
+            try:
+                proposals = auto_annotate_frames(self.image_dir, filenames, exemplar['filename'], exemplar['box'],
+                                                 margin, threshold, working_width, progress_callback=on_progress)
+            except Exception as e:
+                print(f"Error running auto annotate: {e}")
+                proposals = {}
+            journal = BatchJournal(self.output_dir, f"Auto annotate {len(proposals)} frames from {exemplar['filename']}")
+            files_modified, boxes_added = merge_into_label_files(self.output_dir, proposals, journal)
+            self.root.after(0, lambda: self.finish_auto_annotate(dialog, journal, len(proposals), files_modified, boxes_added))
+        
+        threading.Thread(target=match_thread, daemon=True).start()
+
+    def finish_auto_annotate(self, dialog, journal, matched, files_modified, boxes_added):
+        journal.save()
+        if dialog.winfo_exists():
+            dialog.destroy()
+        
+        # Pick up the proposals for the current frame if the batch touched it
+        if self.current_image_index != -1:
+            current_filename = self.image_list[self.current_image_index]
+            if get_label_path(self.output_dir, current_filename) in journal.entries:
+                self.session.reload()
+        
+        self.schedule_statistics_refresh()
+        messagebox.showinfo("Success", f"Auto Annotate Complete!\nFrames matched: {matched}\nFiles modified: {files_modified}\nBoxes added: {boxes_added}")
+
+    def setup_preannotation_tab(self, parent):
+        """Setup the tab controlling the model pre-annotation worker"""
+        DarkLabel(parent, text="Model Pre-Annotation", font=("Segoe UI", 12, "bold")).pack(pady=10)
+        
+        # Instructions
+        info_text = ("Run a prediction worker in the background. Upcoming frames are sent to it in batches and its "
+                     "predictions appear as dashed ghost boxes. Press Accept Proposals (Enter) to keep them.\n"
+                     "The worker reads JSON requests on stdin and answers on stdout (see src/preannotate.py).")
+        DarkLabel(parent, text=info_text, wraplength=550, fg=THEME['fg_text'], justify=tk.LEFT).pack(pady=5)
+        
+        # Main container
+        main_frame = DarkFrame(parent)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        DarkLabel(main_frame, text="Worker Command:", font=("Segoe UI", 9, "bold")).pack(anchor="w")
+        self.preannotation_command_entry = DarkEntry(main_frame)
+        self.preannotation_command_entry.insert(0, self.preannotation_command)
+        self.preannotation_command_entry.pack(fill=tk.X, pady=(2, 10))
+        
+        params_frame = DarkFrame(main_frame)
+        params_frame.pack(fill=tk.X, pady=5)
+        
+        DarkLabel(params_frame, text="Frames Ahead of Cursor:").grid(row=0, column=0, sticky="w", pady=3)
+        self.preannotation_lookahead_entry = DarkEntry(params_frame, width=10)
+        self.preannotation_lookahead_entry.insert(0, str(self.preannotation_lookahead))
+        self.preannotation_lookahead_entry.grid(row=0, column=1, sticky="w", padx=10)
+        
+        DarkLabel(params_frame, text="Batch Size:").grid(row=1, column=0, sticky="w", pady=3)
+        self.preannotation_batch_entry = DarkEntry(params_frame, width=10)
+        self.preannotation_batch_entry.insert(0, str(self.preannotation_batch_size))
+        self.preannotation_batch_entry.grid(row=1, column=1, sticky="w", padx=10)
+        
+        self.preannotation_status_label = DarkLabel(main_frame, fg="#00ff00", font=("Segoe UI", 9, "bold"))
+        self.preannotation_status_label.pack(anchor="w", pady=10)
+        self.update_preannotation_status()
+        
+        button_frame = DarkFrame(main_frame)
+        button_frame.pack(fill=tk.X, pady=5)
+        
+        DarkButton(button_frame, text="Start Worker", command=self.start_preannotation,
+                  bg=THEME['accent'], fg=THEME['fg_highlight']).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 2))
+        DarkButton(button_frame, text="Stop Worker", command=self.stop_preannotation).pack(side=tk.RIGHT, expand=True, fill=tk.X, padx=(2, 0))
+
+    def setup_statistics_tab(self, parent):
+        """Setup the dataset statistics tab"""
+        DarkLabel(parent, text="Dataset Statistics", font=("Segoe UI", 12, "bold")).pack(pady=10)
+        
+        button_frame = DarkFrame(parent)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        DarkButton(button_frame, text="Refresh", command=self.refresh_statistics).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 2))
+        DarkButton(button_frame, text="Export CSV", command=lambda: self.export_statistics('csv')).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+        DarkButton(button_frame, text="Export JSON", command=lambda: self.export_statistics('json')).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(2, 0))
+        
+        self.statistics_status_label = DarkLabel(parent, fg="#00ff00", font=("Segoe UI", 9, "bold"))
+        self.statistics_status_label.pack(anchor="w", padx=10)
+        
+        self.statistics_text = tk.Text(parent, height=10, bg=THEME['list_bg'], fg=THEME['fg_text'], font=("Consolas", 9),
+                                       relief=tk.FLAT, state=tk.DISABLED)
+        self.statistics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        hist_frame = DarkFrame(parent)
+        hist_frame.pack(fill=tk.X, padx=10)
+        DarkLabel(hist_frame, text="Histogram:").pack(side=tk.LEFT)
+        self.statistics_hist_var = tk.StringVar(value="width")
+        hist_combo = ttk.Combobox(hist_frame, textvariable=self.statistics_hist_var, state="readonly",
+                                  values=["width", "height", "area", "boxes_per_image"])
+        hist_combo.pack(side=tk.LEFT, padx=5)
+        hist_combo.bind("<<ComboboxSelected>>", lambda e: self.draw_statistics_histogram())
+        
+        self.statistics_canvas = tk.Canvas(parent, height=160, bg=THEME['list_bg'], highlightthickness=0)
+        self.statistics_canvas.pack(fill=tk.X, padx=10, pady=(5, 10))
+        self.statistics_canvas.bind("<Configure>", lambda e: self.draw_statistics_histogram())
+        
+        DarkButton(parent, text="Class Heatmap", command=self.open_class_heatmap).pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        if self.statistics_summary is not None:
+            self.show_statistics(self.dataset_stats, self.statistics_summary)
+        self.refresh_statistics()
+
+    def statistics_visible(self):
+        return hasattr(self, 'statistics_text') and self.statistics_text.winfo_exists()
+
+    def refresh_statistics(self, reread=True):
+        """Recompute the statistics in the background, re-reading label files that changed if reread"""
+        if not self.output_dir or not self.full_image_list:
+            return
+        if self.dataset_stats is None or self.dataset_stats.output_dir != self.output_dir:
+            self.dataset_stats = DatasetStatistics(self.output_dir)
+            reread = True
+        stats = self.dataset_stats
+        filenames = list(self.full_image_list)
+        names = {c['id']: c['name'] for c in self.classes}
+        metadata = self.metadata_cache
+        if self.statistics_visible():
+            self.statistics_status_label.config(text="Status: Computing...")
+        
+        def on_progress(done, total):
+            self.root.after(0, lambda: self.statistics_visible() and
+                            self.statistics_status_label.config(text=f"Status: Reading labels {done}/{total}"))
+        
+        def stats_thread():
+            try:
+                if reread:
+                    stats.refresh(filenames, progress_callback=on_progress)
+                with perf.timer("statistics.summary"):
+                    summary = stats.summary(names, metadata.sizes() if metadata else None)
+            except Exception as e:
+                print(f"Error computing statistics: {e}")
+                summary = None
+            self.root.after(0, self.show_statistics, stats, summary)
+        
+        threading.Thread(target=stats_thread, daemon=True).start()
+
+    def schedule_statistics_refresh(self, reread=True):
+        """Debounced refresh_statistics() after labels changed; a no-op until statistics were computed once"""
+        if self.dataset_stats is None:
+            return
+        self.statistics_reread = self.statistics_reread or reread
+        if self.statistics_after_id is not None:
+            self.root.after_cancel(self.statistics_after_id)
+        self.statistics_after_id = self.root.after(500, self.run_scheduled_statistics)
+
+    def run_scheduled_statistics(self):
+        self.statistics_after_id = None
+        reread = self.statistics_reread
+        self.statistics_reread = False
+        if reread or self.statistics_visible():
+            self.refresh_statistics(reread)
+
+    def show_statistics(self, stats, summary):
+        if stats is not self.dataset_stats or summary is None:
+            return
+        self.statistics_summary = summary
+        if not self.statistics_visible():
+            return
+        
+        self.statistics_status_label.config(
+            text=f"Status: {summary['boxes']} boxes in {summary['labeled_images']}/{summary['images']} labeled images ({summary['units']})")
+        lines = [f"{'ID':>4}  {'Class':<24}{'Instances':>10}{'Images':>10}"]
+        for row in summary['classes']:
+            lines.append(f"{row['class_id']:>4}  {row['name'][:23]:<24}{row['instances']:>10}{row['images']:>10}")
+        self.statistics_text.config(state=tk.NORMAL)
+        self.statistics_text.delete("1.0", tk.END)
+        self.statistics_text.insert(tk.END, "\n".join(lines))
+        self.statistics_text.config(state=tk.DISABLED)
+        self.draw_statistics_histogram()
+
+    def draw_statistics_histogram(self):
+        if not self.statistics_visible() or self.statistics_summary is None:
+            return
+        canvas = self.statistics_canvas
+        canvas.delete("all")
+        hist = self.statistics_summary[self.statistics_hist_var.get()]
+        counts = hist['counts']
+        if not counts:
+            return
+        
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        bar_w = (width - 20) / len(counts)
+        peak = max(max(counts), 1)
+        for i, count in enumerate(counts):
+            x = 10 + i * bar_w
+            bar_h = (height - 30) * count / peak
+            canvas.create_rectangle(x + 1, height - 20 - bar_h, x + bar_w - 1, height - 20,
+                                    fill=THEME['button_hover'], outline="")
+        edges = hist['edges']
+        canvas.create_text(10, height - 4, text=f"{edges[0]:g}", anchor=tk.SW, fill=THEME['fg_text'], font=("Segoe UI", 8))
+        canvas.create_text(width - 10, height - 4, text=f"{edges[-1]:g}", anchor=tk.SE, fill=THEME['fg_text'], font=("Segoe UI", 8))
+        canvas.create_text(10, 4, text=f"max {peak}", anchor=tk.NW, fill=THEME['fg_text'], font=("Segoe UI", 8))
+
+    # --- Class Heatmap ---
+    def open_class_heatmap(self):
+        """Window showing where the boxes of one class sit, over a frame of the chosen filename range"""
+        if not self.output_dir or not self.full_image_list:
+            messagebox.showwarning("Warning", "Please open an image folder with labels first.")
+            return
+        top = tk.Toplevel(self.root)
+        top.title("Class Heatmap")
+        top.configure(bg=THEME['bg_main'])
+        self.heatmap_window = top
+        
+        controls = DarkFrame(top)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        
+        DarkLabel(controls, text="Class:").grid(row=0, column=0, sticky="w")
+        self.heatmap_class_var = tk.StringVar()
+        class_values = [f"{c['id']}: {c['name']}" for c in self.classes]
+        class_combo = ttk.Combobox(controls, textvariable=self.heatmap_class_var, values=class_values, state="readonly", width=24)
+        class_combo.grid(row=0, column=1, sticky="w", padx=5)
+        if self.current_class_index != -1:
+            class_combo.current(self.current_class_index)
+        elif class_values:
+            class_combo.current(0)
+        
+        DarkLabel(controls, text="Count:").grid(row=0, column=2, sticky="w", padx=(10, 0))
+        self.heatmap_mode_var = tk.StringVar(value="extents")
+        ttk.Combobox(controls, textvariable=self.heatmap_mode_var, values=["extents", "centers"], state="readonly",
+                     width=10).grid(row=0, column=3, sticky="w", padx=5)
+        
+        # Filename range, e.g. one capture session
+        DarkLabel(controls, text="From:").grid(row=1, column=0, sticky="w", pady=5)
+        self.heatmap_first_entry = DarkEntry(controls, width=28)
+        self.heatmap_first_entry.grid(row=1, column=1, sticky="w", padx=5)
+        DarkButton(controls, text="Current", padx=8, pady=2,
+                   command=lambda: self.set_heatmap_bound(self.heatmap_first_entry)).grid(row=1, column=2, sticky="w", padx=(10, 0))
+        DarkLabel(controls, text="To:").grid(row=2, column=0, sticky="w")
+        self.heatmap_last_entry = DarkEntry(controls, width=28)
+        self.heatmap_last_entry.grid(row=2, column=1, sticky="w", padx=5)
+        DarkButton(controls, text="Current", padx=8, pady=2,
+                   command=lambda: self.set_heatmap_bound(self.heatmap_last_entry)).grid(row=2, column=2, sticky="w", padx=(10, 0))
+        DarkButton(controls, text="Update", command=self.update_class_heatmap).grid(row=1, column=3, rowspan=2, sticky="nsew", padx=5)
+        
+        self.heatmap_status_label = DarkLabel(top, text="Leave From/To empty to use the whole folder.")
+        self.heatmap_status_label.pack(anchor="w", padx=10)
+        self.heatmap_label = tk.Label(top, bg=THEME['bg_main'])
+        self.heatmap_label.pack(padx=10, pady=10)
+        
+        self.update_class_heatmap()
+
+    def set_heatmap_bound(self, entry):
+        if self.current_image_index != -1:
+            entry.delete(0, tk.END)
+            entry.insert(0, self.image_list[self.current_image_index])
+
+    def update_class_heatmap(self):
+        """Accumulate the heatmap in the background (loading changed label files first)"""
+        selection = self.heatmap_class_var.get()
+        if not selection:
+            return
+        class_id = int(selection.split(':')[0])
+        mode = self.heatmap_mode_var.get()
+        first = self.heatmap_first_entry.get().strip() or None
+        last = self.heatmap_last_entry.get().strip() or None
+        for bound in (first, last):
+            if bound is not None and bound not in self.full_image_list:
+                messagebox.showwarning("Warning", f"{bound} is not in the image folder.", parent=self.heatmap_window)
+                return
+        if not self.full_image_list:
+            messagebox.showwarning("Warning", "The image folder is empty.", parent=self.heatmap_window)
+            return
+        
+        # From after To in folder order: swap the bounds instead of showing an empty range
+        if first is not None and last is not None and \
+                self.full_image_list.index(first) > self.full_image_list.index(last):
+            first, last = last, first
+            for entry, bound in ((self.heatmap_first_entry, first), (self.heatmap_last_entry, last)):
+                entry.delete(0, tk.END)
+                entry.insert(0, bound)
+        
+        if self.dataset_stats is None or self.dataset_stats.output_dir != self.output_dir:
+            self.dataset_stats = DatasetStatistics(self.output_dir)
+        stats = self.dataset_stats
+        filenames = list(self.full_image_list)
+        image_dir = self.image_dir
+        self.heatmap_status_label.config(text="Computing...")
+        
+        def heatmap_thread():
+            try:
+                stats.refresh(filenames)
+                with perf.timer("heatmap"):
+                    heat, boxes, files = stats.heatmap(class_id, first, last, mode=mode)
+                # Show it over the middle frame of the range
+                selected = stats.file_range(first, last)
+                if not selected:
+                    self.root.after(0, self.show_class_heatmap, None, "No frames in the selected range.")
+                    return
+                frame = make_thumbnail(os.path.join(image_dir, selected[len(selected) // 2]), (800, 600))
+                image = heatmap_overlay(frame, heat)
+                text = f"{boxes} boxes of {selection} in {files} frames ({selected[0]} .. {selected[-1]})"
+            except Exception as e:
+                print(f"Error computing heatmap: {e}")
+                image = None
+                text = f"Error: {e}"
+            self.root.after(0, self.show_class_heatmap, image, text)
+        
+        threading.Thread(target=heatmap_thread, daemon=True).start()
+
+    def show_class_heatmap(self, image, text):
+        if not self.heatmap_window.winfo_exists():
+            return
+        self.heatmap_status_label.config(text=text)
+        if image is not None:
+            self.heatmap_photo = ImageTk.PhotoImage(image)
+            self.heatmap_label.config(image=self.heatmap_photo)
+
+    def export_statistics(self, fmt):
+        if self.statistics_summary is None:
+            messagebox.showinfo("Info", "Statistics have not been computed yet.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Statistics", defaultextension=f".{fmt}",
+                                            filetypes=[(fmt.upper(), f"*.{fmt}")])
+        if not path:
+            return
+        try:
+            if fmt == 'csv':
+                export_summary_csv(path, self.statistics_summary)
+            else:
+                export_summary_json(path, self.statistics_summary)
+            messagebox.showinfo("Success", f"Exported statistics to {os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export statistics: {e}")
+
+    def update_preannotation_status(self):
+        if not hasattr(self, 'preannotation_status_label') or not self.preannotation_status_label.winfo_exists():
+            return
+        if self.preannotation_queue:
+            text = f"Status: Running ({len(self.preannotation_queue.cache)} cached predictions)"
+        else:
+            text = "Status: Stopped"
+        self.preannotation_status_label.config(text=text)
+
+    def start_preannotation(self):
+        try:
+            lookahead = int(self.preannotation_lookahead_entry.get())
+            batch_size = int(self.preannotation_batch_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Frames ahead and batch size must be whole numbers.")
+            return
+        
+        command = self.preannotation_command_entry.get().strip()
+        if not command:
+            messagebox.showwarning("Warning", "Please enter a worker command.")
+            return
+        
+        self.stop_preannotation()
+        self.preannotation_command = command
+        self.preannotation_lookahead = max(0, lookahead)
+        self.preannotation_batch_size = max(1, batch_size)
+        
+        def on_result(path, boxes):
+            self.root.after(0, self.add_predictions, path, boxes)
+        
+        queue = PreannotationQueue(command, on_result, self.preannotation_batch_size)
+        try:
+            queue.start()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to start the pre-annotation worker: {e}")
+            return
+        
+        self.preannotation_queue = queue
+        if self.current_image_index != -1:
+            self.update_preannotation_order(self.current_image_index)
+        self.update_preannotation_status()
+
+    def stop_preannotation(self):
+        if self.preannotation_queue:
+            self.preannotation_queue.stop()
+            self.preannotation_queue = None
+        self.update_preannotation_status()
+
+    def update_preannotation_order(self, index):
+        """Ask the worker for the current frame and the next frames in prefetch order"""
+        if not self.preannotation_queue or not self.image_list:
+            return
+        n = len(self.image_list)
+        order = [self.image_list[(index + i) % n] for i in range(min(n, self.preannotation_lookahead + 1))]
+        self.preannotation_queue.update_order([os.path.join(self.image_dir, f) for f in order])
+
+    def add_predictions(self, path, boxes):
+        """Store worker predictions for a frame as proposals"""
+        if not boxes or os.path.dirname(path) != self.image_dir:
+            return
+        
+        filename = os.path.basename(path)
+        existing = self.proposals.get(filename, [])
+        self.proposals[filename] = existing + merge_boxes(existing, boxes)
+        
+        if self.current_image_index != -1 and self.image_list[self.current_image_index] == filename:
+            self.redraw_canvas()
+
     def setup_game_presets_tab(self, parent):
         """Setup the game presets tab for switching class files"""
         DarkLabel(parent, text="Switch Game Classes", font=("Segoe UI", 12, "bold")).pack(pady=10)
@@ -1336,25 +2212,30 @@ class AnnotationApp:
         self.dir_label.config(text=text)
 
     def load_images(self):
-        self.image_list = []
-        extensions = ('.jpg', '.jpeg', '.png', '.bmp')
-        for f in os.listdir(self.image_dir):
-            if f.lower().endswith(extensions):
-                self.image_list.append(f)
+        self.session.load_images()
         
-        self.image_list.sort(key=natural_sort_key)
-        self.full_image_list = list(self.image_list) # Keep a copy of full list
+        self.prefetcher.clear()
+        self.scrub_cache.clear()
+        self.proposals = {}
+        self.frame_clusters = {}
+        self.cluster_members = {}
+        self.similarity_index = None
+        self.thumbnail_cache = None
+        self.dataset_stats = None
+        self.statistics_summary = None
+        self.refresh_metadata()
         
-        self.file_listbox.delete(0, tk.END)
-        for f in self.image_list:
-            self.file_listbox.insert(tk.END, f)
+        self.refresh_file_listbox()
             
         if self.image_list:
             self.load_image(0)
+            if self.show_filmstrip.get():
+                self.build_thumbnails()
         else:
             messagebox.showinfo("Info", "No images found in directory.")
 
     # --- Image Loading & Saving ---
+    @perf.timed("load_image")
     def load_image(self, index):
         if 0 <= index < len(self.image_list):
             # Auto save previous
@@ -1370,57 +2251,142 @@ class AnnotationApp:
             path = os.path.join(self.image_dir, filename)
             
             try:
-                self.current_image = Image.open(path)
+                with perf.timer("load_image.decode"):
+                    # First paint from a decode near the display size (JPEG), the full
+                    # resolution follows in the background when zooming in or editing
+                    cw = self.canvas.winfo_width()
+                    ch = self.canvas.winfo_height()
+                    if cw > 1 and ch > 1 and self.zoom_factor <= 1.0:
+                        self.current_image, full_size = self.prefetcher.get_draft(path, (cw * self.zoom_factor, ch * self.zoom_factor))
+                    else:
+                        self.current_image = self.prefetcher.get(path)
+                        full_size = self.current_image.size
+                self.full_resolution = self.current_image.size == full_size
+                if not self.full_resolution:
+                    perf.count("load_image.draft")
                 
                 # RESET CACHE logic when loading new image
                 self.cached_dims = None
                 self.cached_image_obj = None
                 
-                self.load_annotations(filename)
+                with perf.timer("load_image.annotations"):
+                    self.session.load_frame(index, full_size)
                 self.redraw_canvas()
-                self.update_box_list()
+                with perf.timer("update_box_list"):
+                    self.update_box_list()
                 self.root.title(f"AnnotationTool - {filename} [{index+1}/{len(self.image_list)}]")
             except Exception as e:
                 print(f"Error loading image: {e}")
+            
+            if self.show_filmstrip.get():
+                with perf.timer("filmstrip.render"):
+                    self.filmstrip.show_index(index)
+            
+            self.prefetch_neighbors(index)
+            self.update_preannotation_order(index)
 
-    def load_annotations(self, filename):
-        self.boxes = []
-        self.selected_indices = set()
-        if not self.output_dir:
+    def load_full_resolution(self):
+        """Decode the current frame at full resolution in the background and swap it in"""
+        if self.full_resolution or self.current_image_index == -1:
             return
-            
-        name, _ = os.path.splitext(filename)
-        txt_path = os.path.join(self.output_dir, name + ".txt")
+        index = self.current_image_index
+        path = os.path.join(self.image_dir, self.image_list[index])
+        if self.full_resolution_pending == path:
+            return
+        self.full_resolution_pending = path
         
-        if os.path.exists(txt_path):
-            w, h = self.current_image.size
-            self.boxes = parse_yolo(txt_path, w, h) # Returns normalized boxes
+        def decode_thread():
+            try:
+                img = self.prefetcher.get(path)
+            except Exception as e:
+                print(f"Error loading full resolution: {e}")
+                img = None
+            self.root.after(0, lambda: self.finish_full_resolution(index, path, img))
+        
+        threading.Thread(target=decode_thread, daemon=True).start()
 
-    def save_annotations(self):
-        if self.current_image_index == -1 or not self.output_dir:
+    def finish_full_resolution(self, index, path, img):
+        if self.full_resolution_pending == path:
+            self.full_resolution_pending = None
+        if img is None or self.full_resolution or self.current_image_index != index:
             return
+        self.current_image = img
+        self.full_resolution = True
+        self.cached_dims = None # resample from the full-resolution pixels
+        self.redraw_canvas()
+
+    def prefetch_neighbors(self, index):
+        """Decode the next frames (and the previous one) in the background"""
+        order = [index + i for i in range(1, self.prefetch_ahead + 1)] + [index - 1]
+        paths = [os.path.join(self.image_dir, self.image_list[i % len(self.image_list)]) for i in order]
+        self.prefetcher.prefetch(paths)
+
+    @perf.timed("save_annotations")
+    def save_annotations(self):
+        self.session.save()
+
+    def on_session_event(self, event, **details):
+        """Patch only the box list rows and canvas items affected by a session change"""
+        if event == 'boxes':
+            action = details['action']
+            indices = details['indices']
+            # The bitmap layer holds every box, the selection is drawn live on top of it.
+            # An edited selected box is left out of the layer once, so its old outline
+            # does not linger; further edits to it keep the layer valid
+            if action == 'update' and set(indices) <= self.selected_indices:
+                self.overlay_detached.update(indices)
+            else:
+                self.overlay_version += 1
+                self.overlay_detached.clear()
+            if action == 'reset':
+                self.update_box_list()
+                self.redraw_canvas()
+                return
             
-        filename = self.image_list[self.current_image_index]
-        name, _ = os.path.splitext(filename)
-        txt_path = os.path.join(self.output_dir, name + ".txt")
-        
-        # Filter out only unlabeled boxes (class_id == -1), preserve all valid annotations
-        # This preserves labels with class IDs not in predefined_classes.txt
-        final_boxes = [b for b in self.boxes if b['class_id'] != -1]
-        
-        # Save if we have boxes or file exists (to update/clear it)
-        if final_boxes or os.path.exists(txt_path):
-            save_yolo(txt_path, final_boxes)
+            with perf.timer("patch_views"):
+                if action == 'update':
+                    for i in indices:
+                        self.update_box_row(i)
+                else:
+                    # Row numbers after the first changed index shift, rebuild that tail
+                    first = min(indices)
+                    self.update_box_list(first)
+                
+                # Boxes merged into clusters or the bitmap layer cannot be patched one by one
+                if self.overlay_merged:
+                    self.redraw_canvas()
+                elif action == 'update':
+                    for i in indices:
+                        self.redraw_box(i)
+                else:
+                    shift = len(indices) if action == 'remove' else -len(indices)
+                    self.redraw_boxes_from(first, len(self.boxes) + shift)
+        elif event == 'saved':
+            if self.contact_sheet is not None and self.contact_sheet.winfo_exists():
+                self.contact_sheet.refresh(self.session.current_filename)
+            if self.dataset_stats is not None:
+                self.dataset_stats.update(self.session.current_filename)
+                self.schedule_statistics_refresh(reread=False)
+        elif event == 'selection':
+            if self.overlay_merged:
+                self.redraw_canvas()
+                return
+            with perf.timer("patch_views"):
+                for i in set(details['indices']) ^ set(details['previous']):
+                    if i < len(self.boxes):
+                        self.redraw_box(i)
+                self.sync_box_list_selection()
 
     # --- Canvas Drawing ---
-    def redraw_canvas(self):
+    @perf.timed("redraw_canvas")
+    def redraw_canvas(self, preview=False):
         if not self.current_image:
             return
             
         # Calculate ideal dimensions
         cw = self.canvas.winfo_width()
         ch = self.canvas.winfo_height()
-        iw, ih = self.current_image.size
+        iw, ih = self.image_size
         
         if cw == 0 or ch == 0: return # Not ready yet
         
@@ -1433,6 +2399,10 @@ class AnnotationApp:
         nw = int(iw * self.scale)
         nh = int(ih * self.scale)
         
+        # Zoomed past the resolution of a first-paint draft
+        if not self.full_resolution and (nw > self.current_image.width or nh > self.current_image.height):
+            self.load_full_resolution()
+        
         # Update Scrollregion
         self.canvas.configure(scrollregion=(0, 0, nw, nh))
         
@@ -1453,49 +2423,190 @@ class AnnotationApp:
             # We need to resize
             
             # Use NEAREST (fast) if we are interacting (drawing, moving, resizing, panning)
-            # Use LANCZOS (quality) if idle
-            is_interacting = self.is_drawing or self.resize_mode or self.move_mode or self.is_panning
+            # or for a zoom preview, LANCZOS (quality) if idle
+            is_interacting = preview or self.is_drawing or self.resize_mode or self.move_mode or self.is_panning
             resample_method = Image.NEAREST if is_interacting else Image.LANCZOS
             
-            resized = self.current_image.resize((nw, nh), resample_method)
-            self.tk_image = ImageTk.PhotoImage(resized)
+            # A pending refine belongs to the previous view
+            self.refine_generation += 1
+            if resample_method == Image.NEAREST:
+                self.schedule_refine()
+            
+            with perf.timer("redraw.resize"):
+                resized = self.current_image.resize((nw, nh), resample_method)
+            with perf.timer("redraw.photoimage"):
+                self.tk_image = self.display_buffers.show(resized)
             self.cached_image_obj = self.tk_image
             self.cached_dims = (nw, nh)
+            self.display_image = resized
+            self.composited = False
             
-            # Recreate image item
-            self.canvas.delete("image_bg")
-            self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW, image=self.tk_image, tags="image_bg")
-            self.canvas.tag_lower("image_bg")
+            # Update the image item in place (recreate only if it was cleared)
+            if self.canvas.find_withtag("image_bg"):
+                self.canvas.itemconfig("image_bg", image=self.tk_image)
+                self.canvas.coords("image_bg", self.offset_x, self.offset_y)
+            else:
+                self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW, image=self.tk_image, tags="image_bg")
+                self.canvas.tag_lower("image_bg")
+                perf.count("display.item_create")
         else:
             # Dimensions match, just update position
             # If the image item doesn't exist (e.g. cleared elsewhere), recreate it
             if not self.canvas.find_withtag("image_bg"):
                  self.canvas.create_image(self.offset_x, self.offset_y, anchor=tk.NW, image=self.cached_image_obj, tags="image_bg")
                  self.canvas.tag_lower("image_bg")
+                 perf.count("display.item_create")
+                 self.composited = False
             else:
                  self.canvas.coords("image_bg", self.offset_x, self.offset_y)
 
-        # Clear only overlays (boxes, grid lines, etc) - NOT the image
-        # We use strict tags to manage this
-        self.canvas.delete("box")
-        self.canvas.delete("handle")
-        self.canvas.delete("label")
-        self.canvas.delete("temp_rect")
-        self.canvas.delete("grid_line")
+        proposals = self.proposals.get(self.image_list[self.current_image_index], [])
+        use_bitmap = self.bitmap_overlay.get() and len(self.boxes) + len(proposals) >= BITMAP_OVERLAY_MIN_BOXES
+        if use_bitmap:
+            self.update_overlay_layer(proposals)
+        elif self.composited:
+            self.canvas.itemconfig("image_bg", image=self.cached_image_obj)
+            self.composited = False
+
+        with perf.timer("redraw.overlays"):
+            # Clear only overlays (boxes, grid lines, etc) - NOT the image
+            # We use strict tags to manage this
+            self.canvas.delete("box")
+            self.canvas.delete("handle")
+            self.canvas.delete("cluster")
+            self.canvas.delete("temp_rect")
+            self.canvas.delete("grid_line")
+            self.canvas.delete("proposal")
+            
+            if use_bitmap:
+                # Every box is in the image layer, the selection is also drawn live on top
+                self.label_pool.begin()
+                for i in sorted(self.selected_indices):
+                    self.draw_box_on_canvas(self.boxes[i], True, i, True)
+                self.label_pool.end()
+                self.overlay_merged = True
+            else:
+                self.draw_lod_overlay(cw, ch, iw, ih)
+                self.draw_proposals()
         
-        # Draw boxes
-        for i, box in enumerate(self.boxes):
-            self.draw_box_on_canvas(box, i in self.selected_indices, i)
-            
-        # Sync Right Sidebar Selection
-        self.box_listbox.selection_clear(0, tk.END)
-        for i in self.selected_indices:
-            self.box_listbox.selection_set(i)
+        self.draw_perf_hud()
+        self.sync_box_list_selection()
+
+    def schedule_refine(self):
+        """Upgrade the NEAREST display image with LANCZOS once the view has been idle for a moment"""
+        if self.refine_after_id is not None:
+            self.root.after_cancel(self.refine_after_id)
+        self.refine_after_id = self.root.after(self.refine_delay_ms, self.start_refine, self.refine_generation)
 
-    def draw_box_on_canvas(self, box, is_selected, index):
+    def start_refine(self, generation):
+        self.refine_after_id = None
+        if generation != self.refine_generation or not self.current_image:
+            return
+        image = self.current_image
+        size = self.cached_dims
+        
+        def refine_thread():
+            if generation != self.refine_generation:
+                return # superseded while queued
+            try:
+                with perf.timer("refine.resize"):
+                    resized = image.resize(size, Image.LANCZOS)
+            except Exception as e:
+                print(f"Error refining display image: {e}")
+                return
+            self.root.after(0, lambda: self.finish_refine(generation, resized))
+        
+        threading.Thread(target=refine_thread, daemon=True).start()
+
+    def finish_refine(self, generation, resized):
+        # Swap in only if the view has not changed since the preview
+        if generation != self.refine_generation or not self.current_image:
+            perf.count("refine.stale")
+            return
+        self.tk_image = self.display_buffers.show(resized) # same buffer: the canvas item updates
+        self.cached_image_obj = self.tk_image
+        self.display_image = resized
+        if self.composited:
+            self.composited = False
+            proposals = self.proposals.get(self.image_list[self.current_image_index], [])
+            self.update_overlay_layer(proposals)
+        else:
+            self.canvas.itemconfig("image_bg", image=self.tk_image)
+
+    def draw_lod_overlay(self, cw, ch, iw, ih):
+        """Draw the boxes as canvas items with the level-of-detail rules"""
+        # Level of detail: skip boxes outside the view, drop labels of tiny boxes,
+        # merge small boxes of dense frames into per-class clusters
+        view = (self.canvas.canvasx(0), self.canvas.canvasy(0),
+                self.canvas.canvasx(cw), self.canvas.canvasy(ch))
+        with perf.timer("redraw.plan"):
+            plan = plan_overlay(self.boxes, self.selected_indices, (iw, ih), self.scale,
+                                (self.offset_x, self.offset_y), view)
+        self.overlay_merged = bool(plan.clusters)
+        
+        self.label_pool.begin()
+        for i, show_label in plan.boxes:
+            self.draw_box_on_canvas(self.boxes[i], i in self.selected_indices, i, show_label)
+        self.label_pool.end()
+        
+        for cluster in plan.clusters:
+            self.draw_cluster(*cluster)
+
+    def update_overlay_layer(self, proposals):
+        """Composite the boxes and the proposals onto the display image, if they changed"""
+        # Edited boxes that are no longer selected have to go back into the layer
+        self.overlay_detached &= self.selected_indices
+        key = (self.overlay_version, self.cached_dims, frozenset(self.overlay_detached),
+               self.show_labels.get(), id(proposals), len(proposals))
+        if key == self.overlay_layer_key and self.composited:
+            return
+        if self.overlay_base_source is not self.display_image:
+            self.overlay_base = self.display_image.convert('RGBA')
+            self.overlay_base_source = self.display_image
+        
+        colors = {c['id']: c['color'] for c in self.classes}
+        names = {c['id']: c['name'] for c in self.classes}
+        names[-1] = "Unlabeled"
+        with perf.timer("redraw.rasterize"):
+            layer = rasterize_boxes(self.boxes, self.cached_dims, colors, names,
+                                    exclude=self.overlay_detached, show_labels=self.show_labels.get())
+            layer = rasterize_boxes(proposals, self.cached_dims, colors, names, show_labels=False, width=1, layer=layer)
+            composite = Image.alpha_composite(self.overlay_base, layer)
+        with perf.timer("redraw.photoimage"):
+            self.overlay_photo = self.display_buffers.show(composite, slot='overlay')
+        self.canvas.itemconfig("image_bg", image=self.overlay_photo)
+        self.overlay_layer_key = key
+        self.composited = True
+
+    def redraw_box(self, index):
+        """Redraw the canvas items of one box"""
+        if not self.current_image: return
+        self.canvas.delete(f"boxitem_{index}")
+        self.draw_box_on_canvas(self.boxes[index], index in self.selected_indices, index)
+        self.canvas.tag_raise("perf_hud")
+
+    def redraw_boxes_from(self, first, old_count):
+        """Redraw the boxes from index first on, after the ones before it were kept"""
+        if not self.current_image: return
+        for i in range(first, old_count):
+            self.canvas.delete(f"boxitem_{i}")
+            self.label_pool.hide(i)
+        for i in range(first, len(self.boxes)):
+            self.draw_box_on_canvas(self.boxes[i], i in self.selected_indices, i)
+        self.canvas.tag_raise("perf_hud")
+
+    def draw_cluster(self, class_id, x1, y1, x2, y2, count):
+        """Aggregate of small boxes of one class, drawn as one outline with the box count"""
+        class_info = next((c for c in self.classes if c['id'] == class_id), None)
+        color = class_info['color'] if class_info else "#FFFFFF"
+        self.canvas.create_rectangle(x1, y1, x2, y2, outline=color, width=1, dash=(2, 2), tags="cluster")
+        self.canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=str(count), fill=color,
+                                font=("Segoe UI", 8, "bold"), tags="cluster")
+
+    def draw_box_on_canvas(self, box, is_selected, index, show_label=None):
         if not self.current_image: return
         
-        iw, ih = self.current_image.size
+        iw, ih = self.image_size
         x1, y1, x2, y2 = denormalize_box(box, iw, ih)
         
         # Scale to canvas
@@ -1517,16 +2628,20 @@ class AnnotationApp:
         outline = "#FFFFFF" if is_selected else color
         
         # Draw Rect
-        self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline=outline, width=width, tags=("box", f"box_{index}"))
+        self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline=outline, width=width, tags=("box", f"box_{index}", f"boxitem_{index}"))
         
-        # Draw Label
-        if self.show_labels.get():
+        # Draw Label (not for boxes too small on screen to carry one)
+        if show_label is None:
+            show_label = is_selected or label_visible(box, (iw, ih), self.scale)
+        if self.show_labels.get() and show_label:
             # Draw text background
             text_x = cx1
             text_y = cy1 - 15
             if text_y < 0: text_y = cy1 + 5
             
-            self.canvas.create_text(text_x, text_y, text=label_text, fill=color, anchor=tk.SW, font=("Segoe UI", 9, "bold"), tags="label")
+            self.label_pool.show(index, text_x, text_y, label_text, color)
+        else:
+            self.label_pool.hide(index)
 
         # Draw Resize Handles if selected
         if is_selected:
@@ -1539,9 +2654,140 @@ class AnnotationApp:
                 self.canvas.create_rectangle(
                     hx - handle_size/2, hy - handle_size/2,
                     hx + handle_size/2, hy + handle_size/2,
-                    fill="white", outline="black", tags=("handle", f"handle_{index}_{tag}")
+                    fill="white", outline="black", tags=("handle", f"handle_{index}_{tag}", f"boxitem_{index}")
                 )
 
+    def draw_proposals(self):
+        """Draw proposed boxes of the current frame as dashed ghost boxes"""
+        if self.current_image_index == -1: return
+        
+        proposals = self.proposals.get(self.image_list[self.current_image_index], [])
+        iw, ih = self.image_size
+        for box in proposals:
+            x1, y1, x2, y2 = denormalize_box(box, iw, ih)
+            cx1 = x1 * self.scale + self.offset_x
+            cy1 = y1 * self.scale + self.offset_y
+            cx2 = x2 * self.scale + self.offset_x
+            cy2 = y2 * self.scale + self.offset_y
+            
+            class_info = next((c for c in self.classes if c['id'] == box['class_id']), None)
+            color = class_info['color'] if class_info else "#FFFFFF"
+            
+            self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline=color, width=1, dash=(4, 4), tags="proposal")
+            if self.show_labels.get() and 'score' in box:
+                self.canvas.create_text(cx2, cy2 + 2, text=f"{box['score']:.2f}", fill=color, anchor=tk.NE,
+                                        font=("Segoe UI", 8), tags="proposal")
+
+    # --- Performance HUD ---
+    def toggle_perf_hud(self):
+        if self._is_input_focused(): return
+        self.show_perf_hud.set(not self.show_perf_hud.get())
+        self.on_perf_hud_toggle()
+
+    def update_perf_enabled(self):
+        """Instrumentation is only enabled while the HUD is shown or a trace is recorded"""
+        perf.set_enabled(self.show_perf_hud.get() or self.recording_perf.get())
+
+    def on_perf_hud_toggle(self):
+        enabled = self.show_perf_hud.get()
+        self.update_perf_enabled()
+        if self.perf_hud_job:
+            self.root.after_cancel(self.perf_hud_job)
+            self.perf_hud_job = None
+        if enabled:
+            self.refresh_perf_hud()
+        else:
+            self.canvas.delete("perf_hud")
+
+    def on_perf_recording_toggle(self):
+        # A new recording starts from an empty trace
+        if self.recording_perf.get():
+            perf.clear_trace()
+        self.update_perf_enabled()
+
+    def refresh_perf_hud(self):
+        self.draw_perf_hud()
+        self.perf_hud_job = self.root.after(500, self.refresh_perf_hud)
+
+    def draw_perf_hud(self):
+        self.canvas.delete("perf_hud")
+        if not self.show_perf_hud.get():
+            return
+        
+        # Pin to the visible top-left corner regardless of scrolling
+        x = self.canvas.canvasx(0) + 10
+        y = self.canvas.canvasy(0) + 10
+        text = self.canvas.create_text(x, y, text=perf.format_summary(), fill="#00FF00", anchor=tk.NW,
+                                       font=("Consolas", 9), tags="perf_hud")
+        bbox = self.canvas.bbox(text)
+        if bbox:
+            bg = self.canvas.create_rectangle(bbox[0] - 5, bbox[1] - 5, bbox[2] + 5, bbox[3] + 5,
+                                              fill="#000000", outline=THEME['border'], tags="perf_hud")
+            self.canvas.tag_lower(bg, text)
+
+    def export_perf_trace(self):
+        if perf.trace_length() == 0:
+            messagebox.showinfo("Export Perf Trace", "No samples were captured.\n"
+                                "Check 'Record Perf Trace' (or show the Performance HUD) while you work, then export.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Performance Trace", defaultextension=".jsonl",
+                                            filetypes=[("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        try:
+            count = perf.export_trace(path)
+            messagebox.showinfo("Success", f"Exported {count} samples to {os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export trace: {e}")
+
+    # --- Input Trace ---
+    def toggle_input_trace(self):
+        if self._is_input_focused(): return
+        self.recording_input.set(not self.recording_input.get())
+        self.on_input_trace_toggle()
+
+    def on_input_trace_toggle(self):
+        if self.recording_input.get():
+            self.input_recorder.start()
+            return
+        
+        count = self.input_recorder.stop()
+        if count == 0:
+            return
+        path = filedialog.asksaveasfilename(title="Save Input Trace", defaultextension=".jsonl",
+                                            initialfile="input_trace.jsonl", filetypes=[("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        
+        # Enough context for the replayer to reproduce the starting view
+        header = {
+            'image_dir': self.image_dir,
+            'output_dir': self.output_dir,
+            'image': self.image_list[self.current_image_index] if self.current_image_index != -1 else None,
+            'zoom_factor': self.zoom_factor,
+            'geometry': self.root.winfo_geometry()
+        }
+        try:
+            self.input_recorder.save(path, header)
+            messagebox.showinfo("Success", f"Saved {count} input events to {os.path.basename(path)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save input trace: {e}")
+
+    def show_stall_report(self):
+        """Show the top event-loop stall sites of this session"""
+        top = tk.Toplevel(self.root)
+        top.title("Stall Report")
+        top.geometry("700x300")
+        top.configure(bg=THEME['bg_main'])
+        
+        SectionLabel(top, text="EVENT-LOOP STALLS", bg=THEME['bg_main']).pack(pady=(10, 5), padx=15, anchor='w')
+        DarkLabel(top, text=f"Stalls longer than {self.watchdog.threshold:.1f}s. Full stacks are logged to {self.watchdog.log_path}.").pack(padx=15, anchor='w')
+        
+        text = tk.Text(top, bg=THEME['entry_bg'], fg=THEME['entry_fg'], font=("Consolas", 9), relief=tk.FLAT, wrap=tk.NONE)
+        text.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        text.insert(tk.END, self.watchdog.format_summary())
+        text.configure(state=tk.DISABLED)
+
     def on_canvas_resize(self, event):
         if self.current_image:
             self.redraw_canvas()
@@ -1557,7 +2803,8 @@ class AnnotationApp:
         # Clamp zoom
         self.zoom_factor = max(0.1, min(self.zoom_factor, 10.0))
         
-        self.redraw_canvas()
+        # Fast preview now, LANCZOS once the wheel is idle
+        self.redraw_canvas(preview=True)
         
     def start_pan(self, event):
         self.canvas.scan_mark(event.x, event.y)
@@ -1628,7 +2875,10 @@ class AnnotationApp:
 
 
     def on_canvas_click(self, event):
+        if self.scrub_index is not None:
+            self.settle_scrub()
         if not self.current_image: return
+        self.load_full_resolution() # editing: upgrade a first-paint draft
         
         # Adjust coordinates for scroll
         canvas_x = self.canvas.canvasx(event.x)
@@ -1653,9 +2903,6 @@ class AnnotationApp:
         clicked_box_index = self.find_box_at(canvas_x, canvas_y)
         
         if clicked_box_index != -1:
-            # Simple click: Select only this one
-            self.selected_indices = {clicked_box_index}
-            
             # Check if we should start moving (if already selected or just selected)
             # If we clicked inside a box, we prepare for move
             self.move_mode = True
@@ -1663,20 +2910,19 @@ class AnnotationApp:
             self.start_x = canvas_x
             self.start_y = canvas_y
             
-            self.redraw_canvas()
+            # Simple click: Select only this one
+            self.session.select({clicked_box_index})
         else:
             # IDLE CHECK: If no class selected, do nothing (or clear selection)
             if self.current_class_index == -1:
-                self.selected_indices = set()
-                self.redraw_canvas()
+                self.session.select(set())
                 return
 
             # Start drawing
-            self.selected_indices = set()
             self.is_drawing = True
             self.start_x = canvas_x
             self.start_y = canvas_y
-            self.redraw_canvas() # Clear selection
+            self.session.select(set()) # Clear selection
 
     def on_canvas_drag(self, event):
         # Adjust coordinates for scroll
@@ -1685,7 +2931,7 @@ class AnnotationApp:
         
         # Clamp to image boundaries
         if self.current_image:
-            iw, ih = self.current_image.size
+            iw, ih = self.image_size
             # Image boundaries in canvas coords
             min_x = self.offset_x
             min_y = self.offset_y
@@ -1695,78 +2941,17 @@ class AnnotationApp:
             canvas_x = max(min_x, min(max_x, canvas_x))
             canvas_y = max(min_y, min(max_y, canvas_y))
 
-        if self.resize_mode:
-            # Handle resizing
-            box = self.boxes[self.resize_box_index]
-            iw, ih = self.current_image.size
-            x1, y1, x2, y2 = denormalize_box(box, iw, ih)
-            
+        if self.resize_mode or self.move_mode:
             # Convert event delta to image delta
             dx = (canvas_x - self.start_x) / self.scale
             dy = (canvas_y - self.start_y) / self.scale
-            
-            if self.resize_handle == 'nw':
-                x1 += dx; y1 += dy
-            elif self.resize_handle == 'ne':
-                x2 += dx; y1 += dy
-            elif self.resize_handle == 'sw':
-                x1 += dx; y2 += dy
-            elif self.resize_handle == 'se':
-                x2 += dx; y2 += dy
-                
-            # Clamp to [0, iw] and [0, ih]
-            x1 = max(0, min(iw, x1))
-            y1 = max(0, min(ih, y1))
-            x2 = max(0, min(iw, x2))
-            y2 = max(0, min(ih, y2))
-                
-            # Normalize and update
-            # Ensure x1 < x2, y1 < y2 logic handled by normalize_box
-            new_box = normalize_box(x1, y1, x2, y2, iw, ih)
-            new_box['class_id'] = box['class_id'] # Keep class
-            
-            self.boxes[self.resize_box_index] = new_box
-            
             self.start_x = canvas_x
             self.start_y = canvas_y
-            self.redraw_canvas()
-            return
-
-        if self.move_mode:
-            # Handle moving
-            box = self.boxes[self.move_box_index]
-            iw, ih = self.current_image.size
-            x1, y1, x2, y2 = denormalize_box(box, iw, ih)
-            
-            # Convert event delta to image delta
-            dx = (canvas_x - self.start_x) / self.scale
-            dy = (canvas_y - self.start_y) / self.scale
-            
-            # Update coords
-            x1 += dx
-            y1 += dy
-            x2 += dx
-            y2 += dy
-            
-            # Clamp to [0, iw] and [0, ih]
-            # We need to check width/height to ensure we don't collapse or go out
-            w = x2 - x1
-            h = y2 - y1
-            
-            if x1 < 0: x1 = 0; x2 = w
-            if y1 < 0: y1 = 0; y2 = h
-            if x2 > iw: x2 = iw; x1 = iw - w
-            if y2 > ih: y2 = ih; y1 = ih - h
             
-            # Normalize and update
-            new_box = normalize_box(x1, y1, x2, y2, iw, ih)
-            new_box['class_id'] = box['class_id']
-            
-            self.boxes[self.move_box_index] = new_box
-            
-            self.start_x = canvas_x
-            self.start_y = canvas_y
-            self.redraw_canvas()
+            if self.resize_mode:
+                self.session.resize_box(self.resize_box_index, self.resize_handle, dx, dy)
+            else:
+                self.session.move_box(self.move_box_index, dx, dy)
             return
 
         if self.is_drawing:
@@ -1781,7 +2966,7 @@ class AnnotationApp:
         
         # Clamp to image boundaries
         if self.current_image:
-            iw, ih = self.current_image.size
+            iw, ih = self.image_size
             min_x = self.offset_x
             min_y = self.offset_y
             max_x = self.offset_x + (iw * self.scale)
@@ -1805,11 +2990,11 @@ class AnnotationApp:
             self.is_drawing = False
             self.canvas.delete("temp_rect")
             
-            iw, ih = self.current_image.size
+            iw, ih = self.image_size
             
             # Check if box is big enough (Drag operation)
             if abs(canvas_x - self.start_x) > 5 or abs(canvas_y - self.start_y) > 5:
-                # Convert to normalized coords
+                # Convert to image coords
                 x1 = (self.start_x - self.offset_x) / self.scale
                 y1 = (self.start_y - self.offset_y) / self.scale
                 x2 = (canvas_x - self.offset_x) / self.scale
@@ -1837,18 +3022,9 @@ class AnnotationApp:
                     messagebox.showinfo("Template Saved", f"Updated template size for '{self.classes[self.current_class_index]['name']}'")
                     return
 
-                new_box = normalize_box(x1, y1, x2, y2, iw, ih)
-                
                 # Assign class if available, else -1 (Unlabeled)
-                if self.classes:
-                    new_box['class_id'] = self.classes[self.current_class_index]['id']
-                else:
-                    new_box['class_id'] = -1
-
-                self.boxes.append(new_box)
-                self.selected_indices = {len(self.boxes) - 1}
-                self.update_box_list()
-                self.redraw_canvas()
+                class_id = self.classes[self.current_class_index]['id'] if self.classes else -1
+                self.session.add_drawn_box(x1, y1, x2, y2, class_id)
 
             # Click operation (Stamp Template)
             else:
@@ -1868,64 +3044,56 @@ class AnnotationApp:
                 # Top-Left at click
                 click_x = (canvas_x - self.offset_x) / self.scale
                 click_y = (canvas_y - self.offset_y) / self.scale
-                
-                x1 = click_x
-                y1 = click_y
-                x2 = click_x + default_w
-                y2 = click_y + default_h
-                
-                # Clamp stamp to image
-                if x2 > iw: x1 = iw - default_w; x2 = iw
-                if y2 > ih: y1 = ih - default_h; y2 = ih
-                if x1 < 0: x1 = 0
-                if y1 < 0: y1 = 0
-                
-                new_box = normalize_box(x1, y1, x2, y2, iw, ih)
-                new_box['class_id'] = current_class['id']
-                
-                self.boxes.append(new_box)
-                self.selected_indices = {len(self.boxes) - 1}
-                self.update_box_list()
-                self.redraw_canvas()
+                self.session.stamp_box(click_x, click_y, default_w, default_h, current_class['id'])
                 
     def find_box_at(self, x, y):
-        # Reverse search to find top-most
         if not self.current_image: return -1
         
-        iw, ih = self.current_image.size
-        
         # Convert screen x,y to image x,y
         img_x = (x - self.offset_x) / self.scale
         img_y = (y - self.offset_y) / self.scale
-        
-        for i in range(len(self.boxes) - 1, -1, -1):
-            box = self.boxes[i]
-            bx1, by1, bx2, by2 = denormalize_box(box, iw, ih)
-            
-            if bx1 <= img_x <= bx2 and by1 <= img_y <= by2:
-                return i
-        return -1
+        return self.session.box_at(img_x, img_y)
 
     # --- Right Sidebar Logic ---
-    def update_box_list(self):
-        self.box_listbox.delete(0, tk.END)
-        for i, box in enumerate(self.boxes):
-            class_id = box['class_id']
-            if class_id == -1:
-                name = "Unlabeled"
-                color = "#FFFFFF"
-            else:
-                class_info = next((c for c in self.classes if c['id'] == class_id), None)
-                name = class_info['name'] if class_info else "Unknown"
-                color = class_info['color'] if class_info else "#FFFFFF"
-            
-            self.box_listbox.insert(tk.END, f"{i+1}: {name}")
-            self.box_listbox.itemconfig(tk.END, {'bg': color, 'fg': 'black' if self.is_light(color) else 'white'})
+    def box_row(self, index):
+        """Text and color of a box list row"""
+        class_id = self.boxes[index]['class_id']
+        if class_id == -1:
+            name = "Unlabeled"
+            color = "#FFFFFF"
+        else:
+            class_info = next((c for c in self.classes if c['id'] == class_id), None)
+            name = class_info['name'] if class_info else "Unknown"
+            color = class_info['color'] if class_info else "#FFFFFF"
+        return f"{index+1}: {name}", color
+
+    def insert_box_row(self, index):
+        text, color = self.box_row(index)
+        self.box_listbox.insert(index, text)
+        self.box_listbox.itemconfig(index, {'bg': color, 'fg': 'black' if self.is_light(color) else 'white'})
+        if index in self.selected_indices:
+            self.box_listbox.selection_set(index)
+
+    def update_box_list(self, first=0):
+        """Rebuild the box list rows from index first on"""
+        self.box_listbox.delete(first, tk.END)
+        for i in range(first, len(self.boxes)):
+            self.insert_box_row(i)
+
+    def update_box_row(self, index):
+        # Geometry edits keep the row text, only class changes need a new row
+        if self.box_listbox.get(index) == self.box_row(index)[0]:
+            return
+        self.box_listbox.delete(index)
+        self.insert_box_row(index)
+
+    def sync_box_list_selection(self):
+        self.box_listbox.selection_clear(0, tk.END)
+        for i in self.selected_indices:
+            self.box_listbox.selection_set(i)
 
     def on_box_list_select(self, event):
-        sel = self.box_listbox.curselection()
-        self.selected_indices = set(sel)
-        self.redraw_canvas()
+        self.session.select(self.box_listbox.curselection())
 
     # --- Class Management ---
     def enter_template_mode(self):
@@ -1965,11 +3133,7 @@ class AnnotationApp:
         def on_select(event):
             sel = lb.curselection()
             if sel:
-                new_class_id = self.classes[sel[0]]['id']
-                for idx in self.selected_indices:
-                    self.boxes[idx]['class_id'] = new_class_id
-                self.update_box_list()
-                self.redraw_canvas()
+                self.session.set_class(self.selected_indices, self.classes[sel[0]]['id'])
                 top.destroy()
                 
         lb.bind('<<ListboxSelect>>', on_select)
@@ -2034,6 +3198,7 @@ class AnnotationApp:
     # --- Navigation ---
     def next_image(self):
         if self._is_input_focused(): return
+        if self.scrub_step(1): return
         if self.image_list:
             # Warn if auto-save is off and there are boxes
             if not self.auto_save.get() and self.boxes:
@@ -2051,11 +3216,12 @@ class AnnotationApp:
                     return
                 # False (No) = continue without saving
             
-            new_idx = (self.current_image_index + 1) % len(self.image_list)
-            self.load_image(new_idx)
+            self.load_image(self.step_index(1))
+            self.last_navigation = time.perf_counter()
 
     def prev_image(self):
         if self._is_input_focused(): return
+        if self.scrub_step(-1): return
         if self.image_list:
             # Warn if auto-save is off and there are boxes
             if not self.auto_save.get() and self.boxes:
@@ -2073,9 +3239,119 @@ class AnnotationApp:
                     return
                 # False (No) = continue without saving
             
-            new_idx = (self.current_image_index - 1) % len(self.image_list)
-            self.load_image(new_idx)
-            
+            self.load_image(self.step_index(-1))
+            self.last_navigation = time.perf_counter()
+            
+    def step_index(self, direction, start=None):
+        """Index of the next image in direction, skipping near-duplicates of the current frame if enabled"""
+        n = len(self.image_list)
+        idx = self.current_image_index if start is None else start
+        
+        if self.skip_duplicates.get() and self.frame_clusters and idx != -1:
+            current_cluster = self.frame_clusters.get(self.image_list[idx])
+            for step in range(1, n):
+                candidate = (idx + direction * step) % n
+                if self.frame_clusters.get(self.image_list[candidate]) != current_cluster:
+                    return candidate
+        
+        return (idx + direction) % n
+
+    # --- Scrub Mode ---
+    def scrub_step(self, direction):
+        """Show a preview instead of loading when navigation repeats quickly. Returns True if handled."""
+        rapid = time.perf_counter() - self.last_navigation < self.scrub_interval_ms / 1000
+        if self.scrub_index is None:
+            if not rapid or not self.image_list or self.current_image_index == -1:
+                return False
+            # Unsaved boxes would need the Auto-Save prompt on every step
+            if not self.auto_save.get() and self.boxes:
+                return False
+            self.scrub_index = self.current_image_index
+        
+        self.scrub_index = self.step_index(direction, self.scrub_index)
+        with perf.timer("scrub.frame"):
+            self.show_scrub_frame(self.scrub_index, direction)
+        self.schedule_scrub_settle(self.scrub_settle_ms)
+        self.last_navigation = time.perf_counter()
+        return True
+
+    def show_scrub_frame(self, index, direction):
+        """Draw the thumbnail and box outlines of frame index, fitted into the visible canvas"""
+        n = len(self.image_list)
+        filename = self.image_list[index]
+        ahead = [os.path.join(self.image_dir, self.image_list[(index + direction * i) % n])
+                 for i in range(min(self.scrub_ahead, n))]
+        thumb = self.scrub_cache.thumbnail(ahead[0])
+        self.scrub_cache.prefetch(ahead)
+        
+        cw = self.canvas.winfo_width()
+        ch = self.canvas.winfo_height()
+        vx = self.canvas.canvasx(0)
+        vy = self.canvas.canvasy(0)
+        self.canvas.delete("scrub")
+        self.set_frame_items_state('hidden')
+        
+        # Without a thumbnail yet, outline the frame from its cached header size
+        iw, ih = thumb.size if thumb is not None else (self.image_size_of(filename) or self.image_size or (cw, ch))
+        scale = min(cw / iw, ch / ih)
+        w = max(1, int(iw * scale))
+        h = max(1, int(ih * scale))
+        x0 = vx + (cw - w) // 2
+        y0 = vy + (ch - h) // 2
+        if thumb is not None:
+            self.scrub_photo = self.display_buffers.show(thumb.resize((w, h), Image.BILINEAR), slot='scrub')
+            self.canvas.create_image(x0, y0, anchor=tk.NW, image=self.scrub_photo, tags="scrub")
+        else:
+            perf.count("scrub.thumb_miss")
+            self.canvas.create_rectangle(x0, y0, x0 + w, y0 + h, outline=THEME['border'], tags="scrub")
+        
+        colors = {c['id']: c['color'] for c in self.classes}
+        for box in self.scrub_cache.boxes(get_label_path(self.output_dir, filename)):
+            x1, y1, x2, y2 = denormalize_box(box, w, h)
+            self.canvas.create_rectangle(x0 + x1, y0 + y1, x0 + x2, y0 + y2,
+                                         outline=colors.get(box['class_id'], "#FFFFFF"), tags="scrub")
+        
+        self.canvas.tag_raise("perf_hud")
+        
+        self.file_listbox.selection_clear(0, tk.END)
+        self.file_listbox.selection_set(index)
+        self.file_listbox.see(index)
+        self.root.title(f"AnnotationTool - {filename} [{index+1}/{n}] (scrubbing)")
+        if self.show_filmstrip.get():
+            self.filmstrip.show_index(index)
+
+    def set_frame_items_state(self, state):
+        """
+        Hide or show the current frame's canvas items while scrubbing. They are kept,
+        not deleted, so the image item and pooled labels are reused on settle.
+        """
+        for tag in ("image_bg", "box", "handle", "cluster", "proposal", "grid_line"):
+            self.canvas.itemconfigure(tag, state=state)
+        # Labels on the pool's free list stay hidden
+        for item in self.label_pool.items.values():
+            self.canvas.itemconfigure(item, state=state)
+
+    def schedule_scrub_settle(self, delay_ms):
+        if self.scrub_index is None:
+            return
+        if self.scrub_after_id is not None:
+            self.root.after_cancel(self.scrub_after_id)
+        self.scrub_after_id = self.root.after(delay_ms, self.settle_scrub)
+
+    def settle_scrub(self):
+        """Leave scrub mode and load the frame it stopped on in full"""
+        if self.scrub_after_id is not None:
+            self.root.after_cancel(self.scrub_after_id)
+            self.scrub_after_id = None
+        index = self.scrub_index
+        if index is None:
+            return
+        self.scrub_index = None
+        self.canvas.delete("scrub")
+        self.set_frame_items_state('normal')
+        self.load_image(index) # saves the frame scrubbing started from
+        self.last_navigation = time.perf_counter()
+
     def on_file_select(self, event):
         sel = self.file_listbox.curselection()
         if sel:
@@ -2085,33 +3361,439 @@ class AnnotationApp:
     def delete_selected_box(self):
         if self._is_input_focused(): return
         if self.selected_indices:
-            # Delete in reverse order to avoid index shifting issues
-            for idx in sorted(self.selected_indices, reverse=True):
-                del self.boxes[idx]
-            
-            self.selected_indices = set()
-            self.update_box_list()
-            self.redraw_canvas()
+            self.session.remove_boxes(self.selected_indices)
 
     def copy_boxes(self):
         if self._is_input_focused(): return
-        if self.selected_indices:
-            self.clipboard = [self.boxes[i].copy() for i in self.selected_indices]
-        else:
-            # Copy all if none selected? Or nothing?
-            # Let's copy all if none selected, as per original logic, or maybe just nothing?
-            # Original logic: "Copy selected box (or all if none selected)"
-            self.clipboard = [b.copy() for b in self.boxes]
-            
-        messagebox.showinfo("Info", f"Copied {len(self.clipboard)} boxes.")
+        # Copy selected box (or all if none selected)
+        count = self.session.copy()
+        messagebox.showinfo("Info", f"Copied {count} boxes.")
 
     def paste_boxes(self):
         if self._is_input_focused(): return
         if not self.clipboard: return
         
-        for box in self.clipboard:
-            self.boxes.append(box.copy())
+        self.session.paste()
+
+    # --- Bulk Paste ---
+    def paste_boxes_to_range(self):
+        """Paste the clipboard into a range of images from the current list"""
+        if not self.image_list: return
         
-        self.update_box_list()
-        self.redraw_canvas()
+        text = simpledialog.askstring("Paste to Range", 
+                                      f"Enter the frame range to paste into (1-{len(self.image_list)}), e.g. 10-250:")
+        if not text:
+            return
+        
+        try:
+            start, end = [int(p) for p in text.replace(' ', '').split('-')]
+        except ValueError:
+            messagebox.showerror("Error", "Invalid range. Use the format start-end, e.g. 10-250.")
+            return
+        
+        start, end = min(start, end), max(start, end)
+        start = max(1, start)
+        end = min(len(self.image_list), end)
+        if start > end:
+            messagebox.showerror("Error", "The range does not contain any images.")
+            return
+        
+        self.run_bulk_paste(self.image_list[start - 1:end], self.clipboard,
+                            f"Paste {len(self.clipboard)} boxes to frames {start}-{end}")
+
+    def paste_boxes_to_filtered(self):
+        """Paste the clipboard into every image of the current (filtered) list"""
+        if not self.image_list: return
+        
+        if len(self.image_list) == len(self.full_image_list):
+            if not messagebox.askyesno("No Filter Active", 
+                                       f"No filter is active. Paste into all {len(self.image_list)} images?"):
+                return
+        
+        self.run_bulk_paste(list(self.image_list), self.clipboard,
+                            f"Paste {len(self.clipboard)} boxes to filtered images")
+
+    def run_bulk_paste(self, filenames, boxes, description):
+        if not boxes:
+            messagebox.showwarning("Warning", "There are no boxes to paste. Copy boxes first (Ctrl+C).")
+            return
+        
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Please set Output Directory first.")
+            return
+        
+        confirm_msg = f"Bulk Paste\n\n"
+        confirm_msg += f"Boxes to paste: {len(boxes)}\n"
+        confirm_msg += f"Images to process: {len(filenames)}\n\n"
+        confirm_msg += "Boxes that duplicate an existing box of the same class are skipped.\n"
+        confirm_msg += "The batch can be reverted with 'Undo Last Batch'. Continue?"
+        
+        if not messagebox.askyesno("Confirm Bulk Paste", confirm_msg):
+            return
+        
+        boxes = [b.copy() for b in boxes]
+        journal = BatchJournal(self.output_dir, description)
+        
+        # The current frame lives in memory, so merge it here instead of in the background batch
+        current_filename = self.image_list[self.current_image_index] if self.current_image_index != -1 else None
+        if current_filename in filenames:
+            filenames = [f for f in filenames if f != current_filename]
+            self.save_annotations()
+            journal.record(get_label_path(self.output_dir, current_filename))
+            added = merge_boxes(self.boxes, boxes)
+            if added:
+                self.session.add_boxes(added, select=False)
+                self.save_annotations()
+        
+        dialog = ProgressDialog(self.root, "Bulk Paste", description, modal=True)
+        step = max(1, len(filenames) // 100)
+        
+        def on_progress(done, total):
+            if done % step == 0 or done == total:
+                self.root.after(0, dialog.update_progress, done, total)
+        
+        def paste_thread():
+            files_modified, boxes_added = paste_boxes_to_files(self.output_dir, filenames, boxes, journal,
+                                                               progress_callback=on_progress)
+            self.root.after(0, lambda: self.finish_bulk_paste(dialog, journal, files_modified, boxes_added))
+        
+        threading.Thread(target=paste_thread, daemon=True).start()
+
+    def finish_bulk_paste(self, dialog, journal, files_modified, boxes_added):
+        journal.save()
+        if dialog.winfo_exists():
+            dialog.destroy()
+        self.schedule_statistics_refresh()
+        messagebox.showinfo("Success", f"Bulk Paste Complete!\nFiles modified: {files_modified}\nBoxes added: {boxes_added}")
+
+    def undo_last_batch(self):
+        """Revert the most recent journaled batch job"""
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Please set Output Directory first.")
+            return
+        
+        journals = list_journals(self.output_dir)
+        if not journals:
+            messagebox.showinfo("Info", "No batch jobs to undo.")
+            return
+        
+        last = journals[-1]
+        description = read_journal_description(last)
+        if not messagebox.askyesno("Undo Last Batch", f"Undo the following batch job?\n\n{description}"):
+            return
+        
+        # Flush the current frame so the restored files are not overwritten on the next autosave
+        self.save_annotations()
+        restored = undo_journal(last)
+        if restored < 0:
+            messagebox.showerror("Error", "Failed to read the batch journal.")
+            return
+        
+        if self.current_image_index != -1:
+            self.session.reload()
+        
+        self.schedule_statistics_refresh()
+        messagebox.showinfo("Success", f"Undo Complete!\nFiles restored: {restored}")
+
+    # --- Label Lint ---
+    def run_lint(self):
+        """Check every label file of the folder in the background and list the issues"""
+        if not self.full_image_list: return
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Please set Output Directory first.")
+            return
+        
+        # The linter reads the label files
+        if self.current_image_index != -1 and self.auto_save.get():
+            self.save_annotations()
+        
+        filenames = list(self.full_image_list)
+        known_classes = {c['id'] for c in self.classes}
+        dialog = ProgressDialog(self.root, "Lint Labels", "Checking label files...")
+        
+        def on_progress(done, total):
+            self.root.after(0, dialog.update_progress, done, total)
+        
+        def lint_thread():
+            try:
+                with perf.timer("lint.dataset"):
+                    issues = lint_dataset(self.output_dir, filenames, known_classes, progress_callback=on_progress)
+            except Exception as e:
+                print(f"Error linting labels: {e}")
+                issues = None
+            self.root.after(0, lambda: self.finish_lint(dialog, issues))
+        
+        threading.Thread(target=lint_thread, daemon=True).start()
+
+    def finish_lint(self, dialog, issues):
+        if dialog.winfo_exists():
+            dialog.destroy()
+        if issues is None:
+            messagebox.showerror("Error", "Failed to lint the label files.")
+            return
+        
+        if self.lint_window is not None and self.lint_window.winfo_exists():
+            self.lint_window.set_issues(issues)
+            self.lint_window.lift()
+        elif not issues:
+            messagebox.showinfo("Lint Labels", "No issues found.")
+        else:
+            self.lint_window = LintReportWindow(self.root, issues, self.open_lint_issue, self.fix_lint_issues, self.run_lint)
+
+    def open_lint_issue(self, issue):
+        """Jump to the frame of a lint issue and select its box"""
+        if issue['kind'] == 'orphan':
+            messagebox.showinfo("Lint Labels", f"{issue['filename']} has no matching image in the image folder.",
+                                parent=self.lint_window)
+            return
+        filename = issue['filename']
+        if filename not in self.image_list:
+            self.clear_image_filter()
+        if filename not in self.image_list:
+            return
+        self.load_image(self.image_list.index(filename))
+        if issue['box'] is not None and issue['box'] < len(self.boxes):
+            self.session.select({issue['box']})
+
+    def fix_lint_issues(self, issues):
+        """Repair the fixable issues in one batch that 'Undo Last Batch' can revert"""
+        filenames = sorted({i['filename'] for i in issues})
+        if not filenames: return
+        
+        confirm_msg = f"Auto-Fix\n\n"
+        confirm_msg += f"Issues to fix: {len(issues)}\n"
+        confirm_msg += f"Label files to rewrite: {len(filenames)}\n\n"
+        confirm_msg += "Malformed and zero-area lines are removed, boxes outside the image are clipped.\n"
+        confirm_msg += "The batch can be reverted with 'Undo Last Batch'. Continue?"
+        if not messagebox.askyesno("Confirm Auto-Fix", confirm_msg, parent=self.lint_window):
+            return
+        
+        # Flush the current frame so the fixed file is not overwritten on the next autosave.
+        # Snapshot it first: the undo has to restore the file as it was before the flush.
+        journal = BatchJournal(self.output_dir, f"Lint auto-fix of {len(filenames)} label files")
+        current_filename = self.session.current_filename if self.current_image_index != -1 else None
+        if current_filename in filenames:
+            journal.record(get_label_path(self.output_dir, current_filename))
+        self.save_annotations()
+        dialog = ProgressDialog(self.root, "Auto-Fix", "Fixing label files...", modal=True)
+        
+        def fix_thread():
+            try:
+                changed = fix_label_files(self.output_dir, filenames, journal)
+            except Exception as e:
+                print(f"Error fixing label files: {e}")
+                changed = 0
+            self.root.after(0, lambda: self.finish_lint_fix(dialog, journal, changed))
+        
+        threading.Thread(target=fix_thread, daemon=True).start()
+
+    def finish_lint_fix(self, dialog, journal, changed):
+        journal.save()
+        if dialog.winfo_exists():
+            dialog.destroy()
+        if self.current_image_index != -1:
+            self.session.reload()
+        if self.contact_sheet is not None and self.contact_sheet.winfo_exists():
+            self.contact_sheet.refresh()
+        self.schedule_statistics_refresh()
+        messagebox.showinfo("Success", f"Auto-Fix Complete!\nFiles modified: {changed}")
+        self.run_lint()
+
+    # --- Near-Duplicate Frames ---
+    def build_duplicate_index(self, on_done=None):
+        """Hash every frame in the background and cluster near-duplicates"""
+        if not self.full_image_list:
+            return
+        
+        filenames = list(self.full_image_list)
+        dialog = ProgressDialog(self.root, "Duplicate Frames", "Hashing frames...")
+        step = max(1, len(filenames) // 100)
+        
+        def on_progress(done, total):
+            if done % step == 0 or done == total:
+                self.root.after(0, dialog.update_progress, done, total)
+        
+        def hash_thread():
+            try:
+                hashes, valid = compute_hashes(self.image_dir, filenames, progress_callback=on_progress)
+                labels = cluster_hashes(hashes, valid=valid)
+            except Exception as e:
+                print(f"Error building duplicate index: {e}")
+                labels = None
+            self.root.after(0, lambda: self.finish_duplicate_index(dialog, filenames, labels, on_done))
+        
+        threading.Thread(target=hash_thread, daemon=True).start()
+
+    def finish_duplicate_index(self, dialog, filenames, labels, on_done):
+        if dialog.winfo_exists():
+            dialog.destroy()
+        
+        # Ignore results for a directory that is no longer loaded
+        if labels is None or filenames != self.full_image_list:
+            return
+        
+        self.frame_clusters = {}
+        self.cluster_members = {}
+        for filename, label in zip(filenames, labels.tolist()):
+            representative = filenames[label]
+            self.frame_clusters[filename] = representative
+            self.cluster_members.setdefault(representative, []).append(filename)
+        
+        if on_done:
+            on_done()
+
+    def on_skip_duplicates_toggle(self):
+        if self.skip_duplicates.get() and not self.frame_clusters:
+            def report():
+                messagebox.showinfo("Duplicate Frames", f"Found {len(self.cluster_members)} distinct scenes in {len(self.frame_clusters)} frames.")
+            self.build_duplicate_index(report)
+
+    def propagate_to_cluster(self):
+        """Paste the boxes of the current frame into all of its near-duplicates"""
+        if self.current_image_index == -1: return
+        
+        if not self.frame_clusters:
+            self.build_duplicate_index(self.propagate_to_cluster)
+            return
+        
+        filename = self.image_list[self.current_image_index]
+        members = self.cluster_members.get(self.frame_clusters.get(filename), [])
+        targets = [f for f in members if f != filename]
+        if not targets:
+            messagebox.showinfo("Info", "The current frame has no near-duplicates.")
+            return
+        
+        boxes = [b for b in self.boxes if b['class_id'] != -1]
+        self.run_bulk_paste(targets, boxes, f"Propagate {len(boxes)} boxes from {filename} to {len(targets)} duplicates")
+
+    # --- Tracking & Proposals ---
+    def track_boxes_forward(self):
+        """Track the selected boxes (or all boxes) through the next frames in the background"""
+        if self._is_input_focused(): return
+        if self.current_image_index == -1: return
+        
+        if self.selected_indices:
+            boxes = [self.boxes[i].copy() for i in sorted(self.selected_indices)]
+        else:
+            boxes = [b.copy() for b in self.boxes]
+        if not boxes:
+            return
+        
+        start = self.current_image_index
+        end = min(len(self.image_list), start + self.track_frames_ahead + 1)
+        filenames = self.image_list[start:end]
+        if len(filenames) < 2:
+            return
+        
+        paths = [os.path.join(self.image_dir, f) for f in filenames]
+        self.prefetcher.prefetch(paths)
+        
+        def track_thread():
+            try:
+                images = [self.prefetcher.get(p) for p in paths]
+                results = track_forward(images, boxes)
+            except Exception as e:
+                print(f"Error tracking boxes: {e}")
+                results = []
+            self.root.after(0, lambda: self.finish_track(filenames[1:], results))
+        
+        threading.Thread(target=track_thread, daemon=True).start()
+
+    def finish_track(self, filenames, results):
+        for filename, proposals in zip(filenames, results):
+            if proposals:
+                self.proposals[filename] = proposals
+            else:
+                self.proposals.pop(filename, None)
+        
+        if self.current_image_index != -1 and self.image_list[self.current_image_index] in filenames:
+            self.redraw_canvas()
+
+    def accept_proposals(self):
+        """Turn the ghost boxes of the current frame into real boxes"""
+        if self._is_input_focused(): return
+        if self.current_image_index == -1: return
+        
+        filename = self.image_list[self.current_image_index]
+        proposals = self.proposals.pop(filename, None)
+        if not proposals:
+            return
+        
+        boxes = [{k: b[k] for k in ('class_id', 'x_center', 'y_center', 'w', 'h')} for b in proposals]
+        self.session.add_boxes(merge_boxes(self.boxes, boxes))
+
+    # --- Keyframe Interpolation ---
+    def set_keyframe(self):
+        if self._is_input_focused(): return
+        if self.current_image_index == -1: return
+        
+        filename = self.image_list[self.current_image_index]
+        self.keyframe = {
+            'filename': filename,
+            'boxes': [b.copy() for b in self.boxes if b['class_id'] != -1]
+        }
+        messagebox.showinfo("Keyframe", f"Keyframe set on {filename} ({len(self.keyframe['boxes'])} boxes).\n\n"
+                                        "Label another frame and press Interpolate to fill the frames in between.")
+
+    def interpolate_from_keyframe(self):
+        """Interpolate boxes for every frame between the stored keyframe and the current frame"""
+        if self._is_input_focused(): return
+        if self.current_image_index == -1: return
+        
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Please set Output Directory first.")
+            return
+        
+        if not self.keyframe:
+            messagebox.showwarning("Warning", "No keyframe set. Press 'Set Keyframe' on the first frame of the range.")
+            return
+        
+        if self.keyframe['filename'] not in self.image_list:
+            messagebox.showwarning("Warning", "The keyframe is not part of the current image list.")
+            return
+        
+        key_index = self.image_list.index(self.keyframe['filename'])
+        cur_index = self.current_image_index
+        if abs(cur_index - key_index) < 2:
+            messagebox.showinfo("Info", "There are no frames between the keyframe and the current frame.")
+            return
+        
+        current_boxes = [b.copy() for b in self.boxes if b['class_id'] != -1]
+        if key_index < cur_index:
+            boxes_a, boxes_b = self.keyframe['boxes'], current_boxes
+            lo, hi = key_index, cur_index
+        else:
+            boxes_a, boxes_b = current_boxes, self.keyframe['boxes']
+            lo, hi = cur_index, key_index
+        
+        filenames = self.image_list[lo + 1:hi]
+        method = "order" if self.interpolate_by_order.get() else "iou"
+        frame_boxes = interpolate_boxes(boxes_a, boxes_b, len(filenames), method)
+        
+        num_tracks = len(frame_boxes[0]) if frame_boxes else 0
+        if num_tracks == 0:
+            messagebox.showwarning("Warning", "No boxes of the same class were found on both keyframes.")
+            return
+        
+        confirm_msg = f"Interpolate Keyframes\n\n"
+        confirm_msg += f"From: {self.image_list[lo]}\n"
+        confirm_msg += f"To: {self.image_list[hi]}\n\n"
+        confirm_msg += f"Frames to write: {len(filenames)}\n"
+        confirm_msg += f"Matched boxes: {num_tracks} (by {method})\n\n"
+        confirm_msg += "Existing boxes of the matched classes in these frames will be replaced.\n"
+        confirm_msg += "The batch can be reverted with 'Undo Last Batch'. Continue?"
+        
+        if not messagebox.askyesno("Confirm Interpolation", confirm_msg):
+            return
+        
+        # Persist the current keyframe before writing the range
+        self.save_annotations()
+        
+        journal = BatchJournal(self.output_dir, f"Interpolate {len(filenames)} frames from {self.image_list[lo]} to {self.image_list[hi]}")
+        count = write_interpolated_labels(self.output_dir, filenames, frame_boxes, journal)
+        journal_path = journal.save()
+        self.schedule_statistics_refresh()
+        messagebox.showinfo("Success", f"Interpolation Complete!\nFiles written: {count}\n"
+                                       f"Journal: {os.path.basename(journal_path)}\n"
+                                       "Use 'Undo Last Batch' to revert.")
 
@@ -0,0 +1,184 @@
+import os
+import concurrent.futures
+import numpy as np
+from PIL import Image
+
+DEFAULT_WORKING_WIDTH = 640
+DEFAULT_SEARCH_MARGIN = 0.05
+DEFAULT_SCORE_THRESHOLD = 0.8
+
+def load_gray(path, working_width=DEFAULT_WORKING_WIDTH):
+    """
+    Loads an image as a downscaled grayscale float32 array.
+    JPEG sources are decoded at reduced resolution via Image.draft.
+
+    Returns:
+        np.ndarray: (H, W) array scaled so that W == working_width (or smaller if the image is smaller).
+    """
+    img = Image.open(path)
+    iw, ih = img.size
+    width = min(working_width, iw)
+    height = max(1, int(round(ih * width / iw)))
+    img.draft('L', (width, height))
+    img = img.convert('L')
+    if img.size != (width, height):
+        img = img.resize((width, height), Image.BILINEAR)
+    return np.asarray(img, dtype=np.float32)
+
+def box_to_pixels(box, width, height):
+    """Converts a normalized box to integer pixel bounds (x1, y1, x2, y2) clipped to the image."""
+    x1 = int(round((box['x_center'] - box['w'] / 2) * width))
+    y1 = int(round((box['y_center'] - box['h'] / 2) * height))
+    x2 = int(round((box['x_center'] + box['w'] / 2) * width))
+    y2 = int(round((box['y_center'] + box['h'] / 2) * height))
+    return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+def _window_sums(values, h, w):
+    """Sums of every h x w window using an integral image. Output shape (H-h+1, W-w+1)."""
+    ii = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    ii[1:, 1:] = values.cumsum(0).cumsum(1)
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+def match_template(search, template):
+    """
+    Normalized cross-correlation of a template over every position of a search image.
+
+    Args:
+        search (np.ndarray): (H, W) grayscale search region.
+        template (np.ndarray): (h, w) grayscale template, h <= H and w <= W.
+
+    Returns:
+        np.ndarray: (H-h+1, W-w+1) NCC scores in [-1, 1], or None if the template is flat
+                    or larger than the search region.
+    """
+    H, W = search.shape
+    h, w = template.shape
+    if h > H or w > W or h == 0 or w == 0:
+        return None
+
+    t = template.astype(np.float64)
+    t = t - t.mean()
+    t_norm = np.sqrt((t * t).sum())
+    if t_norm < 1e-6:
+        return None
+
+    s = search.astype(np.float64)
+
+    # Cross-correlation via FFT: convolve with the flipped template and keep the valid part
+    fh, fw = H + h - 1, W + w - 1
+    spectrum = np.fft.rfft2(s, (fh, fw)) * np.fft.rfft2(t[::-1, ::-1], (fh, fw))
+    numerator = np.fft.irfft2(spectrum, (fh, fw))[h - 1:H, w - 1:W]
+
+    n = h * w
+    sums = _window_sums(s, h, w)
+    sq_sums = _window_sums(s * s, h, w)
+    variance = np.maximum(sq_sums - sums * sums / n, 0)
+    denominator = np.sqrt(variance) * t_norm
+
+    scores = np.zeros_like(numerator)
+    valid = denominator > 1e-6
+    scores[valid] = numerator[valid] / denominator[valid]
+    return np.clip(scores, -1.0, 1.0)
+
+def find_template(gray, template, region):
+    """
+    Finds the best template position inside a region of a grayscale image.
+
+    Args:
+        gray (np.ndarray): (H, W) grayscale image.
+        template (np.ndarray): (h, w) template.
+        region (tuple): (x1, y1, x2, y2) pixel bounds of the search region.
+
+    Returns:
+        tuple: (score, x, y) with (x, y) the top-left of the best match in image pixels,
+               or None if no match could be computed.
+    """
+    x1, y1, x2, y2 = region
+    scores = match_template(gray[y1:y2, x1:x2], template)
+    if scores is None:
+        return None
+    row, col = np.unravel_index(np.argmax(scores), scores.shape)
+    return float(scores[row, col]), x1 + int(col), y1 + int(row)
+
+# Per-process state set by the pool initializer so the template is only pickled once per worker
+_worker_state = {}
+
+def _init_worker(template, region, working_width):
+    _worker_state['template'] = template
+    _worker_state['region'] = region
+    _worker_state['working_width'] = working_width
+
+def _match_file(path):
+    try:
+        gray = load_gray(path, _worker_state['working_width'])
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return None
+
+    height, width = gray.shape
+    rx1, ry1, rx2, ry2 = _worker_state['region']
+    region = (int(rx1 * width), int(ry1 * height), int(np.ceil(rx2 * width)), int(np.ceil(ry2 * height)))
+    match = find_template(gray, _worker_state['template'], region)
+    if match is None:
+        return None
+    score, x, y = match
+    th, tw = _worker_state['template'].shape
+    return score, (x + tw / 2) / width, (y + th / 2) / height
+
+def auto_annotate_frames(image_dir, filenames, exemplar_filename, exemplar_box,
+                         search_margin=DEFAULT_SEARCH_MARGIN, score_threshold=DEFAULT_SCORE_THRESHOLD,
+                         working_width=DEFAULT_WORKING_WIDTH, progress_callback=None, max_workers=None):
+    """
+    Proposes a box of the exemplar's class in every frame where the exemplar's
+    appearance is found near its original position.
+
+    Args:
+        image_dir (str): Directory containing the images.
+        filenames (list): Image filenames to search.
+        exemplar_filename (str): Image the exemplar box was labeled on.
+        exemplar_box (dict): Normalized box used as template. Its class is given to proposals.
+        search_margin (float): Margin added around the exemplar box on every side,
+                               as a fraction of the image size.
+        score_threshold (float): Minimum NCC score for a proposal.
+        working_width (int): Width the frames are downscaled to before matching.
+        progress_callback (callable): Called as progress_callback(done, total).
+        max_workers (int): Process count.
+
+    Returns:
+        dict: Image filename -> [proposed box dict] for every frame above the threshold.
+    """
+    gray = load_gray(os.path.join(image_dir, exemplar_filename), working_width)
+    height, width = gray.shape
+    x1, y1, x2, y2 = box_to_pixels(exemplar_box, width, height)
+    template = gray[y1:y2, x1:x2].copy()
+    if template.size == 0:
+        return {}
+
+    region = (
+        max(0.0, exemplar_box['x_center'] - exemplar_box['w'] / 2 - search_margin),
+        max(0.0, exemplar_box['y_center'] - exemplar_box['h'] / 2 - search_margin),
+        min(1.0, exemplar_box['x_center'] + exemplar_box['w'] / 2 + search_margin),
+        min(1.0, exemplar_box['y_center'] + exemplar_box['h'] / 2 + search_margin),
+    )
+
+    paths = [os.path.join(image_dir, f) for f in filenames]
+    proposals = {}
+    total = len(paths)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                initargs=(template, region, working_width)) as executor:
+        results = executor.map(_match_file, paths, chunksize=16)
+        for done, (filename, result) in enumerate(zip(filenames, results), 1):
+            if result is not None and result[0] >= score_threshold:
+                _, cx, cy = result
+                proposals[filename] = [{
+                    'class_id': exemplar_box['class_id'],
+                    'x_center': cx,
+                    'y_center': cy,
+                    'w': exemplar_box['w'],
+                    'h': exemplar_box['h']
+                }]
+            if progress_callback:
+                progress_callback(done, total)
+
+    return proposals
@@ -0,0 +1,207 @@
+import os
+import json
+import threading
+import concurrent.futures
+from datetime import datetime
+from src.utils import iou_matrix, get_label_path, parse_yolo, save_yolo
+
+DUPLICATE_IOU_THRESHOLD = 0.5
+JOURNAL_DIR_NAME = "annotation_journal"
+
+class BatchJournal:
+    """
+    Records the previous content of every label file touched by a batch job
+    so the whole batch can be undone later.
+
+    Snapshots are appended to the journal file as they are taken, before the
+    label file is rewritten, so a batch interrupted by a crash can still be
+    undone. The file is JSON lines: a {"description"} header, then one
+    {"path", "content"} entry per label file.
+    """
+    def __init__(self, output_dir, description):
+        self.output_dir = output_dir
+        self.description = description
+        self.entries = {} # txt_path -> previous content (None if the file did not exist)
+        self.path = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, txt_path):
+        """Snapshot a label file before it is modified. Only the first snapshot is kept."""
+        with self._lock:
+            if txt_path in self.entries:
+                return
+        content = None
+        if os.path.exists(txt_path):
+            with open(txt_path, 'r') as f:
+                content = f.read()
+        with self._lock:
+            if txt_path in self.entries:
+                return
+            self.entries[txt_path] = content
+            if self._file is None:
+                self._open()
+            self._file.write(json.dumps({'path': txt_path, 'content': content}) + "\n")
+            self._file.flush()
+
+    def _open(self):
+        journal_dir = os.path.join(self.output_dir, JOURNAL_DIR_NAME)
+        os.makedirs(journal_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = os.path.join(journal_dir, f"batch_{timestamp}.jsonl")
+        self._file = open(self.path, 'w')
+        self._file.write(json.dumps({'description': self.description}) + "\n")
+
+    def save(self):
+        """
+        Closes the journal file once the batch is done.
+
+        Returns:
+            str: Path of the journal file, or None if nothing was recorded.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return self.path
+
+def list_journals(output_dir):
+    """Returns journal file paths in the output directory, newest last."""
+    journal_dir = os.path.join(output_dir, JOURNAL_DIR_NAME)
+    if not os.path.isdir(journal_dir):
+        return []
+    return sorted(os.path.join(journal_dir, f) for f in os.listdir(journal_dir) if f.endswith(('.json', '.jsonl')))
+
+def read_journal(journal_path):
+    """
+    Reads a journal written by BatchJournal (or a .json journal of older versions).
+
+    Returns:
+        tuple: (description, entries as txt_path -> previous content)
+    """
+    with open(journal_path, 'r') as f:
+        if not journal_path.endswith('.jsonl'):
+            data = json.load(f)
+            return data.get('description', ''), data['entries']
+        description = json.loads(f.readline()).get('description', '')
+        entries = {}
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # torn last line of an interrupted batch
+            entries.setdefault(entry['path'], entry['content'])
+    return description, entries
+
+def read_journal_description(journal_path):
+    try:
+        return read_journal(journal_path)[0]
+    except Exception as e:
+        print(f"Error reading journal {journal_path}: {e}")
+        return ''
+
+def undo_journal(journal_path):
+    """
+    Restores every file recorded in a journal and removes the journal.
+
+    Returns:
+        int: Number of files restored, or -1 if the journal could not be read.
+    """
+    try:
+        entries = read_journal(journal_path)[1]
+    except Exception as e:
+        print(f"Error reading journal {journal_path}: {e}")
+        return -1
+
+    restored = 0
+    for txt_path, content in entries.items():
+        try:
+            if content is None:
+                if os.path.exists(txt_path):
+                    os.remove(txt_path)
+            else:
+                with open(txt_path, 'w') as f:
+                    f.write(content)
+            restored += 1
+        except Exception as e:
+            print(f"Error restoring {txt_path}: {e}")
+
+    os.remove(journal_path)
+    return restored
+
+def merge_boxes(existing, new_boxes, iou_threshold=DUPLICATE_IOU_THRESHOLD):
+    """
+    Returns the boxes from new_boxes that do not duplicate an existing box.
+    A box is a duplicate if an existing box of the same class overlaps it with
+    IoU >= iou_threshold.
+    """
+    if not existing:
+        return [b.copy() for b in new_boxes]
+
+    ious = iou_matrix(new_boxes, existing)
+    added = []
+    for i, box in enumerate(new_boxes):
+        same_class = [j for j, e in enumerate(existing) if e['class_id'] == box['class_id']]
+        if same_class and ious[i, same_class].max() >= iou_threshold:
+            continue
+        added.append(box.copy())
+    return added
+
+def merge_into_label_files(output_dir, boxes_by_filename, journal, iou_threshold=DUPLICATE_IOU_THRESHOLD,
+                           progress_callback=None, max_workers=None):
+    """
+    Merges boxes into the label files of many images in parallel.
+
+    Args:
+        output_dir (str): Directory holding the YOLO .txt files.
+        boxes_by_filename (dict): Image filename -> list of normalized box dicts to add.
+        journal (BatchJournal): Receives a snapshot of every modified file.
+        iou_threshold (float): Boxes overlapping an existing box of the same class
+                               at or above this IoU are skipped.
+        progress_callback (callable): Called as progress_callback(done, total).
+        max_workers (int): Thread count.
+
+    Returns:
+        tuple: (files_modified, boxes_added)
+    """
+    def merge_one(item):
+        filename, boxes = item
+        txt_path = get_label_path(output_dir, filename)
+        skipped = []
+        existing = parse_yolo(txt_path, 0, 0, skipped)
+        added = merge_boxes(existing, boxes, iou_threshold)
+        if not added:
+            return 0
+        journal.record(txt_path)
+        save_yolo(txt_path, existing + added, skipped)
+        return len(added)
+
+    os.makedirs(output_dir, exist_ok=True)
+    total = len(boxes_by_filename)
+    files_modified = 0
+    boxes_added = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(merge_one, item) for item in boxes_by_filename.items()]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            try:
+                added = future.result()
+            except Exception as e:
+                print(f"Error merging boxes: {e}")
+                added = 0
+            if added:
+                files_modified += 1
+                boxes_added += added
+            if progress_callback:
+                progress_callback(done, total)
+
+    return files_modified, boxes_added
+
+def paste_boxes_to_files(output_dir, filenames, boxes, journal, iou_threshold=DUPLICATE_IOU_THRESHOLD,
+                         progress_callback=None, max_workers=None):
+    """
+    Pastes the same boxes into the label files of many images.
+    See merge_into_label_files for the arguments and return value.
+    """
+    return merge_into_label_files(output_dir, {f: boxes for f in filenames}, journal, iou_threshold,
+                                  progress_callback, max_workers)
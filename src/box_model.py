@@ -0,0 +1,115 @@
+import bisect
+from collections.abc import MutableSequence
+
+class BoxModel(MutableSequence):
+    """
+    The boxes of one frame plus their selection, as an observable list.
+
+    Every change is reported to subscribers as callback(event, indices, previous):
+        'add'     indices of the inserted boxes (new positions)
+        'remove'  indices of the deleted boxes (old positions)
+        'update'  indices of boxes replaced or edited through update()
+        'reset'   all indices; the whole list was replaced
+        'select'  the new selection; previous is the old selection
+    Inserts and deletes shift the selection with the boxes without a 'select' event.
+    Boxes are dicts: edit them through update() (or item assignment) so views hear about it.
+    """
+    def __init__(self, boxes=None):
+        self._boxes = list(boxes or [])
+        self.selection = set()
+        self._listeners = []
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event, indices, previous=None):
+        for callback in list(self._listeners):
+            callback(event, indices, previous)
+
+    # --- Sequence protocol ---
+    def __len__(self):
+        return len(self._boxes)
+
+    def __getitem__(self, index):
+        return self._boxes[index]
+
+    def __setitem__(self, index, box):
+        if isinstance(index, slice):
+            raise TypeError("BoxModel does not support slice assignment, use reset()")
+        index = range(len(self._boxes))[index]
+        self._boxes[index] = box
+        self._emit('update', [index])
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            indices = list(range(len(self._boxes)))[index]
+        else:
+            indices = [range(len(self._boxes))[index]]
+        self._delete(indices)
+
+    def insert(self, index, box):
+        index = max(0, min(len(self._boxes), index if index >= 0 else len(self._boxes) + index))
+        self._boxes.insert(index, box)
+        self.selection = {i + 1 if i >= index else i for i in self.selection}
+        self._emit('add', [index])
+
+    def __repr__(self):
+        return f"BoxModel({self._boxes!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, BoxModel):
+            other = other._boxes
+        return self._boxes == other
+
+    # --- Batched operations (one event each) ---
+    def extend(self, boxes):
+        boxes = list(boxes)
+        if not boxes:
+            return
+        first = len(self._boxes)
+        self._boxes.extend(boxes)
+        self._emit('add', list(range(first, len(self._boxes))))
+
+    def remove_indices(self, indices):
+        self._delete(indices)
+
+    def _delete(self, indices):
+        indices = sorted(set(indices), reverse=True)
+        if not indices:
+            return
+        # Delete in reverse order to avoid index shifting issues
+        for idx in indices:
+            del self._boxes[idx]
+        removed = sorted(indices)
+        removed_set = set(indices)
+        self.selection = {i - bisect.bisect_left(removed, i) for i in self.selection if i not in removed_set}
+        self._emit('remove', indices)
+
+    def clear(self):
+        self.reset([])
+
+    def update(self, indices, **fields):
+        """Sets fields (e.g. class_id=3) on the boxes at indices."""
+        indices = sorted(set(indices))
+        for idx in indices:
+            self._boxes[idx].update(fields)
+        if indices:
+            self._emit('update', indices)
+
+    def reset(self, boxes, notify=True):
+        """Replaces all boxes and clears the selection."""
+        self._boxes = list(boxes)
+        self.selection = set()
+        if notify:
+            self._emit('reset', list(range(len(self._boxes))))
+
+    def select(self, indices):
+        indices = set(indices)
+        if indices != self.selection:
+            previous = self.selection
+            self.selection = indices
+            self._emit('select', sorted(indices), sorted(previous))
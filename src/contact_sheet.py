@@ -0,0 +1,248 @@
+"""
+Contact-sheet review: pages of columns x rows frames with their boxes drawn,
+for checking labels many frames at a time.
+
+render_page() composites one page with PIL; PageRenderer runs it in a process
+pool and keeps the pages around the one on screen rendered ahead.
+ContactSheetWindow shows the pages: click a tile to open the frame in the
+editor, right-click (or F over it) to flag it. Flags are stored per folder in
+.review_flags.json by ReviewFlags.
+"""
+import os
+import json
+import concurrent.futures
+import tkinter as tk
+from PIL import Image, ImageDraw
+
+from src.display_buffers import DisplayBufferPool
+from src.overlay import rasterize_boxes
+from src.ui_components import DarkButton, DarkFrame, DarkLabel, THEME
+from src.utils import make_thumbnail, parse_yolo, get_label_path
+
+FLAGS_NAME = ".review_flags.json"
+
+SHEET_COLUMNS = 4
+SHEET_ROWS = 3
+TILE_SIZE = (320, 180)
+TILE_GAP = 4
+CAPTION_HEIGHT = 16
+PAGES_AHEAD = 2
+
+def page_size(columns=SHEET_COLUMNS, rows=SHEET_ROWS, tile_size=TILE_SIZE):
+    """(width, height) of a rendered page"""
+    return (columns * (tile_size[0] + TILE_GAP) + TILE_GAP,
+            rows * (tile_size[1] + CAPTION_HEIGHT + TILE_GAP) + TILE_GAP)
+
+def tile_origin(slot, columns=SHEET_COLUMNS, tile_size=TILE_SIZE):
+    """Top-left corner of the slot-th tile of a page"""
+    row, column = divmod(slot, columns)
+    return (TILE_GAP + column * (tile_size[0] + TILE_GAP),
+            TILE_GAP + row * (tile_size[1] + CAPTION_HEIGHT + TILE_GAP))
+
+def render_page(image_dir, output_dir, filenames, colors, columns=SHEET_COLUMNS, rows=SHEET_ROWS, tile_size=TILE_SIZE):
+    """
+    Composites the frames of one page (up to columns * rows filenames) with their boxes.
+
+    Returns:
+        Image: RGB page of page_size(columns, rows, tile_size).
+    """
+    page = Image.new('RGB', page_size(columns, rows, tile_size), THEME['bg_main'])
+    draw = ImageDraw.Draw(page)
+    for slot, filename in enumerate(filenames[:columns * rows]):
+        x, y = tile_origin(slot, columns, tile_size)
+        try:
+            thumb = make_thumbnail(os.path.join(image_dir, filename), tile_size).convert('RGBA')
+        except Exception as e:
+            print(f"Error rendering {filename}: {e}")
+            draw.rectangle([x, y, x + tile_size[0] - 1, y + tile_size[1] - 1], outline=THEME['border'])
+        else:
+            boxes = parse_yolo(get_label_path(output_dir, filename), 0, 0)
+            rasterize_boxes(boxes, thumb.size, colors, {}, show_labels=False, width=1, layer=thumb)
+            page.paste(thumb.convert('RGB'), (x + (tile_size[0] - thumb.width) // 2, y + (tile_size[1] - thumb.height) // 2))
+            draw.text((x + 2, y + tile_size[1] + 2), f"{filename} ({len(boxes)})", fill=THEME['fg_text'])
+    return page
+
+class ReviewFlags:
+    """Flagged filenames of one folder, saved as JSON next to the images."""
+    def __init__(self, image_dir):
+        self.path = os.path.join(image_dir, FLAGS_NAME)
+        self.flagged = set()
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.flagged = set(json.load(f).get('flagged', []))
+            except Exception as e:
+                print(f"Error loading review flags: {e}")
+        return self.flagged
+
+    def toggle(self, filename):
+        if filename in self.flagged:
+            self.flagged.discard(filename)
+        else:
+            self.flagged.add(filename)
+        self.save()
+        return filename in self.flagged
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'flagged': sorted(self.flagged)}, f, indent=2)
+
+class PageRenderer:
+    """Renders pages in a process pool and keeps those near the current page."""
+    def __init__(self, image_dir, output_dir, filenames, colors, max_workers=None):
+        self.image_dir = image_dir
+        self.output_dir = output_dir
+        self.filenames = filenames
+        self.colors = colors
+        self.per_page = SHEET_COLUMNS * SHEET_ROWS
+        self.pages = {} # page -> Future of the rendered Image
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.filenames) // self.per_page))
+
+    def page_filenames(self, page):
+        return self.filenames[page * self.per_page:(page + 1) * self.per_page]
+
+    def request(self, page):
+        """Future of the rendered page; also schedules the pages ahead and drops distant ones."""
+        for p in list(self.pages):
+            if not page - 1 <= p <= page + PAGES_AHEAD:
+                self.pages.pop(p).cancel()
+        for p in range(page, min(self.page_count, page + PAGES_AHEAD + 1)):
+            if p not in self.pages:
+                self.pages[p] = self._executor.submit(render_page, self.image_dir, self.output_dir,
+                                                      self.page_filenames(p), self.colors)
+        return self.pages[page]
+
+    def invalidate(self, filename=None):
+        """Drops the rendered page holding filename (or all pages)."""
+        if filename is None:
+            pages = list(self.pages)
+        elif filename in self.filenames:
+            pages = [self.filenames.index(filename) // self.per_page]
+        else:
+            pages = []
+        for p in pages:
+            future = self.pages.pop(p, None)
+            if future is not None:
+                future.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class ContactSheetWindow(tk.Toplevel):
+    """
+    Pages through the given frames as contact sheets. on_open(filename) opens a
+    frame in the editor, on_filter(filenames) narrows the editor to the flagged
+    frames. Flags are drawn as canvas items, so toggling one does not re-render
+    the page.
+    """
+    def __init__(self, master, image_dir, output_dir, filenames, colors, on_open, on_filter):
+        super().__init__(master)
+        self.title("Review Sheet")
+        self.configure(bg=THEME['bg_main'])
+        self.on_open = on_open
+        self.on_filter = on_filter
+        self.renderer = PageRenderer(image_dir, output_dir, list(filenames), colors)
+        self.flags = ReviewFlags(image_dir)
+        self.flags.load()
+        self.page = 0
+        self.buffers = DisplayBufferPool(max_buffers=2)
+        self.photo = None
+
+        width, height = page_size()
+        self.canvas = tk.Canvas(self, width=width, height=height, bg=THEME['bg_main'], highlightthickness=0)
+        self.canvas.pack(side=tk.TOP)
+
+        bar = DarkFrame(self)
+        bar.pack(fill=tk.X, side=tk.TOP, pady=5)
+        DarkButton(bar, text="< Prev", command=lambda: self.show_page(self.page - 1)).pack(side=tk.LEFT, padx=5)
+        DarkButton(bar, text="Next >", command=lambda: self.show_page(self.page + 1)).pack(side=tk.LEFT, padx=5)
+        self.status = DarkLabel(bar, text="")
+        self.status.pack(side=tk.LEFT, padx=10)
+        DarkButton(bar, text="Filter Flagged", command=lambda: self.on_filter(sorted(self.flags.flagged))).pack(side=tk.LEFT, padx=5)
+        DarkLabel(bar, text="Click: open   Right-click / F: flag").pack(side=tk.RIGHT, padx=10)
+
+        self.canvas.bind("<Button-1>", lambda e: self.open_tile(self.tile_at(e.x, e.y)))
+        self.canvas.bind("<Button-3>", lambda e: self.toggle_flag(self.tile_at(e.x, e.y)))
+        self.bind("<f>", lambda e: self.toggle_flag(self.tile_at(self.canvas.winfo_pointerx() - self.canvas.winfo_rootx(),
+                                                                  self.canvas.winfo_pointery() - self.canvas.winfo_rooty())))
+        for key in ("<Right>", "<Next>", "<space>"):
+            self.bind(key, lambda e: self.show_page(self.page + 1))
+        for key in ("<Left>", "<Prior>"):
+            self.bind(key, lambda e: self.show_page(self.page - 1))
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.show_page(0)
+
+    def show_page(self, page):
+        self.page = max(0, min(page, self.renderer.page_count - 1))
+        self.update_status()
+        future = self.renderer.request(self.page)
+        if future.done():
+            self.display(self.page, future)
+        else:
+            future.add_done_callback(lambda f, page=self.page: self.after(0, self.display, page, f))
+
+    def display(self, page, future):
+        if page != self.page or future.cancelled() or not self.winfo_exists():
+            return
+        try:
+            image = future.result()
+        except Exception as e:
+            print(f"Error rendering review page: {e}")
+            return
+        self.photo = self.buffers.show(image)
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        self.draw_flags()
+
+    def draw_flags(self):
+        self.canvas.delete("flag")
+        tw, th = TILE_SIZE
+        for slot, filename in enumerate(self.renderer.page_filenames(self.page)):
+            if filename in self.flags.flagged:
+                x, y = tile_origin(slot)
+                self.canvas.create_rectangle(x - 2, y - 2, x + tw + 1, y + th + 1, outline="#ff4757", width=3, tags="flag")
+                self.canvas.create_text(x + tw - 4, y + 4, text="FLAG", anchor=tk.NE, fill="#ff4757",
+                                        font=("Segoe UI", 9, "bold"), tags="flag")
+
+    def update_status(self):
+        self.status.config(text=f"Page {self.page + 1}/{self.renderer.page_count}   "
+                                f"{len(self.flags.flagged)} flagged")
+
+    def tile_at(self, x, y):
+        """Filename of the tile under (x, y), or None"""
+        tw, th = TILE_SIZE
+        column = (x - TILE_GAP) // (tw + TILE_GAP)
+        row = (y - TILE_GAP) // (th + CAPTION_HEIGHT + TILE_GAP)
+        if not (0 <= column < SHEET_COLUMNS and 0 <= row < SHEET_ROWS):
+            return None
+        filenames = self.renderer.page_filenames(self.page)
+        slot = row * SHEET_COLUMNS + column
+        return filenames[slot] if slot < len(filenames) else None
+
+    def open_tile(self, filename):
+        if filename is not None:
+            self.on_open(filename)
+
+    def toggle_flag(self, filename):
+        if filename is None:
+            return
+        self.flags.toggle(filename)
+        self.draw_flags()
+        self.update_status()
+
+    def refresh(self, filename=None):
+        """Re-render the page holding filename (or all pages) after its labels changed."""
+        self.renderer.invalidate(filename)
+        if filename is None or filename in self.renderer.page_filenames(self.page):
+            self.show_page(self.page)
+
+    def close(self):
+        self.renderer.shutdown()
+        self.destroy()
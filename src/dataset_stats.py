@@ -0,0 +1,244 @@
+"""
+Dataset statistics over the YOLO label files of a folder.
+
+DatasetStatistics bulk-loads every label file into a (n, 5) NumPy array of
+class_id, x_center, y_center, w, h and keeps them per file, so statistics are
+updated incrementally: update() re-reads one file (e.g. after a save) and
+refresh() re-reads only the files whose mtime changed (e.g. after a batch job).
+summary() computes all statistics with vectorized NumPy over the whole set;
+heatmap() accumulates where the boxes of one class sit in the frame.
+"""
+import os
+import csv
+import json
+import threading
+import concurrent.futures
+import numpy as np
+from PIL import Image, ImageOps
+
+from src.utils import get_label_path
+
+HIST_BINS = 20
+HEATMAP_GRID = (128, 72) # (columns, rows) of the box position histogram
+
+def read_label_array(path):
+    """The boxes of a label file as a float64 (n, 5) array; malformed lines are skipped like parse_yolo does."""
+    rows = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 5:
+                    try:
+                        rows.append([float(v) for v in parts[:5]])
+                    except ValueError:
+                        continue
+    except OSError:
+        pass
+    return np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+class DatasetStatistics:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.filenames = []
+        self.arrays = {} # image filename -> (n, 5) array
+        self.mtimes = {} # image filename -> label mtime (None if there is no label file)
+        self._lock = threading.Lock()
+
+    def _label_mtime(self, filename):
+        try:
+            return os.path.getmtime(get_label_path(self.output_dir, filename))
+        except OSError:
+            return None
+
+    def _read(self, filename):
+        mtime = self._label_mtime(filename)
+        array = read_label_array(get_label_path(self.output_dir, filename)) if mtime is not None else np.zeros((0, 5))
+        return filename, mtime, array
+
+    def refresh(self, filenames, progress_callback=None, max_workers=None):
+        """
+        Loads the label files of filenames, re-reading only new files and files whose
+        mtime changed since the last refresh. Returns the number of files read.
+        """
+        filenames = list(filenames)
+        todo = [f for f in filenames if f not in self.mtimes or self.mtimes[f] != self._label_mtime(f)]
+        total = len(todo)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for done, (filename, mtime, array) in enumerate(executor.map(self._read, todo), 1):
+                with self._lock:
+                    self.arrays[filename] = array
+                    self.mtimes[filename] = mtime
+                if progress_callback and (done % 1000 == 0 or done == total):
+                    progress_callback(done, total)
+
+        with self._lock:
+            self.filenames = filenames
+            for filename in set(self.arrays) - set(filenames):
+                del self.arrays[filename]
+                del self.mtimes[filename]
+        return total
+
+    def update(self, filename):
+        """Re-reads one file (e.g. after its labels were saved)."""
+        filename, mtime, array = self._read(filename)
+        with self._lock:
+            if filename not in self.arrays:
+                self.filenames.append(filename)
+            self.arrays[filename] = array
+            self.mtimes[filename] = mtime
+
+    def file_range(self, first=None, last=None):
+        """The filenames from first to last (inclusive; None or an unknown name leaves that end open)"""
+        with self._lock:
+            filenames = list(self.filenames)
+        start = filenames.index(first) if first in filenames else 0
+        end = filenames.index(last) + 1 if last in filenames else len(filenames)
+        return filenames[start:end]
+
+    def heatmap(self, class_id, first=None, last=None, grid=HEATMAP_GRID, mode='extents'):
+        """
+        Box position heatmap of one class over the files from first to last (filenames,
+        inclusive, in the order of refresh(); None leaves that end open).
+
+        Returns:
+            tuple: (heat (rows, columns) array, number of boxes, number of files)
+        """
+        filenames = self.file_range(first, last)
+        with self._lock:
+            arrays = [self.arrays.get(f, np.zeros((0, 5))) for f in filenames]
+        boxes = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+        boxes = boxes[boxes[:, 0] == class_id]
+        return box_heatmap(boxes, grid, mode), len(boxes), len(arrays)
+
+    def summary(self, class_names=None, sizes=None, bins=HIST_BINS):
+        """
+        Computes the statistics.
+
+        Args:
+            class_names (dict): class_id -> name, for the per-class table.
+            sizes (dict): filename -> (width, height). If every labeled image has a
+                size, box geometry is in pixels, otherwise in normalized units.
+
+        Returns:
+            dict: images, labeled_images, boxes, units, classes (list of dicts with
+            class_id, name, instances, images), and histograms of width, height,
+            area and boxes_per_image (each {'edges': [...], 'counts': [...]}).
+        """
+        class_names = class_names or {}
+        with self._lock:
+            filenames = list(self.filenames)
+            arrays = [self.arrays.get(f, np.zeros((0, 5))) for f in filenames]
+
+        counts = np.array([len(a) for a in arrays], dtype=np.int64)
+        boxes = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+        file_index = np.repeat(np.arange(len(filenames)), counts)
+        classes = boxes[:, 0].astype(np.int64)
+
+        width = boxes[:, 3]
+        height = boxes[:, 4]
+        units = "normalized"
+        if sizes is not None and len(boxes):
+            labeled = [f for f, n in zip(filenames, counts) if n]
+            if all(f in sizes for f in labeled):
+                dims = np.array([sizes.get(f, (0, 0)) for f in filenames], dtype=np.float64).reshape(-1, 2)
+                width = width * dims[file_index, 0]
+                height = height * dims[file_index, 1]
+                units = "pixels"
+        area = width * height
+
+        class_rows = []
+        if len(boxes):
+            ids, instances = np.unique(classes, return_counts=True)
+            # Images per class: unique (file, class) pairs
+            pairs = np.unique(np.stack([file_index, classes], axis=1), axis=0)
+            pair_ids, images = np.unique(pairs[:, 1], return_counts=True)
+            images_by_class = dict(zip(pair_ids.tolist(), images.tolist()))
+            for class_id, n in zip(ids.tolist(), instances.tolist()):
+                class_rows.append({
+                    'class_id': class_id,
+                    'name': class_names.get(class_id, "Unknown"),
+                    'instances': n,
+                    'images': images_by_class.get(class_id, 0)
+                })
+
+        def histogram(values, hist_bins=bins):
+            if len(values) == 0:
+                return {'edges': [], 'counts': []}
+            hist, edges = np.histogram(values, bins=hist_bins)
+            return {'edges': edges.tolist(), 'counts': hist.tolist()}
+
+        # One bin per box count unless there are many distinct counts
+        most = int(counts.max(initial=0))
+        count_bins = np.arange(most + 2) if most < 4 * bins else bins
+
+        return {
+            'images': len(filenames),
+            'labeled_images': int((counts > 0).sum()),
+            'boxes': int(len(boxes)),
+            'units': units,
+            'classes': class_rows,
+            'width': histogram(width),
+            'height': histogram(height),
+            'area': histogram(area),
+            'boxes_per_image': histogram(counts, count_bins)
+        }
+
+def box_heatmap(boxes, grid=HEATMAP_GRID, mode='extents'):
+    """
+    2D histogram of box positions in normalized image space.
+
+    Args:
+        boxes (np.ndarray): (n, 5) rows of class_id, x_center, y_center, w, h.
+        mode (str): 'centers' counts box centres; 'extents' counts every cell each box covers.
+
+    Returns:
+        np.ndarray: float64 (rows, columns) counts.
+    """
+    cols, rows = grid
+    if len(boxes) == 0:
+        return np.zeros((rows, cols))
+    if mode == 'centers':
+        heat, _, _ = np.histogram2d(boxes[:, 2], boxes[:, 1], bins=(rows, cols), range=((0, 1), (0, 1)))
+        return heat
+
+    # Coverage through a 2D difference array: +1/-1 at the corners of every box, then prefix sums
+    # First and last covered cell; a right/bottom edge on a cell boundary does not cover the next cell
+    x1 = np.clip(np.floor((boxes[:, 1] - boxes[:, 3] / 2) * cols).astype(np.int64), 0, cols - 1)
+    y1 = np.clip(np.floor((boxes[:, 2] - boxes[:, 4] / 2) * rows).astype(np.int64), 0, rows - 1)
+    x2 = np.clip(np.ceil((boxes[:, 1] + boxes[:, 3] / 2) * cols).astype(np.int64) - 1, x1, cols - 1)
+    y2 = np.clip(np.ceil((boxes[:, 2] + boxes[:, 4] / 2) * rows).astype(np.int64) - 1, y1, rows - 1)
+    diff = np.zeros((rows + 1, cols + 1))
+    np.add.at(diff, (y1, x1), 1)
+    np.add.at(diff, (y1, x2 + 1), -1)
+    np.add.at(diff, (y2 + 1, x1), -1)
+    np.add.at(diff, (y2 + 1, x2 + 1), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols]
+
+def heatmap_overlay(frame, heat, opacity=0.7):
+    """Blends heat (scaled to its maximum) over frame as a blue-yellow-red map. Returns an RGB image."""
+    frame = frame.convert('RGB')
+    peak = heat.max()
+    level = np.zeros(heat.shape, dtype=np.uint8) if peak <= 0 else (heat / peak * 255).astype(np.uint8)
+    gray = Image.fromarray(level, 'L').resize(frame.size, Image.BILINEAR)
+    colored = ImageOps.colorize(gray, black="#000080", white="#ff0000", mid="#ffff00")
+    alpha = gray.point(lambda v: int(v * opacity))
+    return Image.composite(colored, frame, alpha)
+
+def export_summary_json(path, summary):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+def export_summary_csv(path, summary):
+    """Writes the per-class table followed by the histograms as (statistic, bin_start, bin_end, count) rows."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['class_id', 'name', 'instances', 'images'])
+        for row in summary['classes']:
+            writer.writerow([row['class_id'], row['name'], row['instances'], row['images']])
+        writer.writerow([])
+        writer.writerow(['statistic', 'bin_start', 'bin_end', 'count'])
+        for key in ('width', 'height', 'area', 'boxes_per_image'):
+            hist = summary[key]
+            for start, end, count in zip(hist['edges'], hist['edges'][1:], hist['counts']):
+                writer.writerow([key, start, end, count])
@@ -0,0 +1,168 @@
+import os
+import json
+import concurrent.futures
+import numpy as np
+from PIL import Image
+
+HASH_CACHE_NAME = ".dhash_cache.json"
+DEFAULT_MAX_DISTANCE = 4
+
+def dhash(path, hash_size=8):
+    """
+    Computes the difference hash of an image.
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and each bit
+    records whether a pixel is brighter than its right neighbour.
+
+    Returns:
+        int: hash_size * hash_size bit hash.
+    """
+    img = Image.open(path)
+    img.draft('L', (hash_size * 8, hash_size * 8))
+    img = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(img, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def _hash_file(path):
+    try:
+        return dhash(path)
+    except Exception as e:
+        print(f"Error hashing {path}: {e}")
+        return None
+
+def load_hash_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading hash cache: {e}")
+        return {}
+
+def save_hash_cache(cache_path, cache):
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f)
+    except Exception as e:
+        print(f"Error saving hash cache: {e}")
+
+def compute_hashes(image_dir, filenames, progress_callback=None, max_workers=None):
+    """
+    Returns the dHash of every image, reusing cached values whose mtime still matches.
+    Missing hashes are computed in a process pool and written back to the cache.
+
+    Args:
+        image_dir (str): Directory containing the images.
+        filenames (list): Image filenames.
+        progress_callback (callable): Called as progress_callback(done, total).
+        max_workers (int): Process count.
+
+    Returns:
+        tuple: (uint64 hashes, bool valid mask), both aligned with filenames.
+               Unreadable images are False in the mask; their hash is meaningless
+               (0 is also the hash of a blank frame).
+    """
+    cache_path = os.path.join(image_dir, HASH_CACHE_NAME)
+    cache = load_hash_cache(cache_path)
+
+    hashes = np.zeros(len(filenames), dtype=np.uint64)
+    valid = np.zeros(len(filenames), dtype=bool)
+    todo = []
+    for i, filename in enumerate(filenames):
+        try:
+            mtime = os.path.getmtime(os.path.join(image_dir, filename))
+        except OSError:
+            continue
+        entry = cache.get(filename)
+        if entry and entry[0] == mtime:
+            hashes[i] = int(entry[1], 16)
+            valid[i] = True
+        else:
+            todo.append((i, filename, mtime))
+
+    total = len(todo)
+    if todo:
+        paths = [os.path.join(image_dir, f) for _, f, _ in todo]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_hash_file, paths, chunksize=32)
+            for done, ((i, filename, mtime), value) in enumerate(zip(todo, results), 1):
+                if value is not None:
+                    hashes[i] = value
+                    valid[i] = True
+                    cache[filename] = [mtime, f"{value:016x}"]
+                if progress_callback:
+                    progress_callback(done, total)
+        save_hash_cache(cache_path, cache)
+
+    return hashes, valid
+
+def hamming_distance(hash_a, hashes):
+    """Hamming distances between one uint64 hash and an array of uint64 hashes."""
+    xor = np.bitwise_xor(np.asarray(hashes, dtype=np.uint64), np.uint64(hash_a))
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def cluster_hashes(hashes, max_distance=DEFAULT_MAX_DISTANCE, valid=None):
+    """
+    Groups hashes whose Hamming distance is at most max_distance (transitively).
+    Hashes that are False in the valid mask (unreadable images) each get a
+    cluster of their own.
+
+    Identical hashes are collapsed first. Candidate pairs among the unique hashes are
+    found by splitting the 64 bits into max_distance + 1 bands: two hashes within
+    max_distance must agree exactly on at least one band.
+
+    Returns:
+        np.ndarray: Cluster label per hash. Labels are the index of the first member.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    if len(hashes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if valid is not None:
+        valid = np.asarray(valid, dtype=bool)
+        labels = np.arange(len(hashes), dtype=np.int64)
+        kept = np.flatnonzero(valid)
+        labels[kept] = kept[cluster_hashes(hashes[kept], max_distance)]
+        return labels
+
+    unique, inverse = np.unique(hashes, return_inverse=True)
+    parent = np.arange(len(unique))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    num_bands = min(max_distance + 1, 64)
+    band_bits = int(np.ceil(64 / num_bands))
+    for band in range(num_bands):
+        shift = np.uint64(band * band_bits)
+        mask = np.uint64((1 << min(band_bits, 64 - band * band_bits)) - 1)
+        keys = (unique >> shift) & mask
+
+        buckets = {}
+        for idx, key in enumerate(keys.tolist()):
+            buckets.setdefault(key, []).append(idx)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            members = np.array(members)
+            for pos, idx in enumerate(members[:-1]):
+                others = members[pos + 1:]
+                close = others[hamming_distance(unique[idx], unique[others]) <= max_distance]
+                root = find(idx)
+                for other in close.tolist():
+                    other_root = find(other)
+                    if other_root != root:
+                        parent[other_root] = root
+
+    roots = np.array([find(i) for i in range(len(unique))])
+    labels = roots[inverse]
+
+    # Relabel every cluster by the index of its first member
+    first_index = {}
+    for i, label in enumerate(labels.tolist()):
+        first_index.setdefault(label, i)
+    return np.array([first_index[label] for label in labels.tolist()], dtype=np.int64)
@@ -0,0 +1,49 @@
+"""
+Reusable ImageTk.PhotoImage buffers for the canvas background.
+
+Creating a PhotoImage allocates a new Tk image (and its pixel block) every time;
+pasting into an existing one of the same size only copies the pixels. The pool
+keeps the most recently used buffers per (slot, size, mode), so navigating
+between frames of equal size, or zooming back and forth between the same steps,
+reuses them instead of allocating.
+
+Slots keep buffers that are shown alternately apart (e.g. the plain display
+image and the composited overlay), so filling one never overwrites the other.
+"""
+from collections import OrderedDict
+from PIL import ImageTk
+
+from src import perf
+
+DEFAULT_POOL_SIZE = 4
+
+class DisplayBufferPool:
+    def __init__(self, max_buffers=DEFAULT_POOL_SIZE):
+        self.max_buffers = max_buffers
+        self.buffers = OrderedDict() # (slot, size, mode) -> PhotoImage
+
+    def show(self, image, slot='image'):
+        """
+        Returns a PhotoImage holding image, reusing a pooled buffer of the same size.
+
+        Canvas items showing the returned buffer update when it is filled again,
+        so callers only need itemconfig() when they switch to a different buffer.
+        Keep a reference to the buffer on display: an evicted buffer is freed by
+        Tk as soon as nothing references it.
+        """
+        key = (slot, image.size, image.mode)
+        photo = self.buffers.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(image)
+            perf.count("display.photo_alloc")
+            self.buffers[key] = photo
+            while len(self.buffers) > self.max_buffers:
+                self.buffers.popitem(last=False)
+        else:
+            photo.paste(image)
+            perf.count("display.photo_reuse")
+            self.buffers.move_to_end(key)
+        return photo
+
+    def clear(self):
+        self.buffers.clear()
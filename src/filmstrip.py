@@ -0,0 +1,117 @@
+import tkinter as tk
+
+from src.display_buffers import DisplayBufferPool
+from src.overlay import rasterize_boxes
+from src.ui_components import THEME
+
+SLOT_PAD = 4
+CAPTION_HEIGHT = 14
+
+class Filmstrip(tk.Frame):
+    """
+    Horizontal strip of frame thumbnails with their box outlines.
+
+    The strip is virtualized: it keeps no widget per frame, only the slots in
+    view get canvas items and PhotoImages, so scrolling costs the same for 50
+    frames and for 500k. Thumbnails and boxes come from the callbacks:
+        get_thumbnail(index) -> PIL Image or None (drawn as a placeholder)
+        get_boxes(index)     -> normalized box dicts
+        get_colors()         -> class_id -> '#RRGGBB'
+        on_select(index)     called when a slot is clicked
+    """
+    def __init__(self, master, thumb_size, get_thumbnail, get_boxes, get_colors, on_select):
+        super().__init__(master, bg=THEME['bg_sidebar'])
+        self.thumb_size = thumb_size
+        self.get_thumbnail = get_thumbnail
+        self.get_boxes = get_boxes
+        self.get_colors = get_colors
+        self.on_select = on_select
+        self.count = 0
+        self.first = 0 # index of the left-most slot
+        self.current = -1
+        self.status = ""
+        self.buffers = DisplayBufferPool(max_buffers=64)
+        self.photos = {} # slot -> PhotoImage on display
+
+        self.canvas = tk.Canvas(self, height=thumb_size[1] + 2 * SLOT_PAD + CAPTION_HEIGHT,
+                                bg=THEME['bg_sidebar'], highlightthickness=0)
+        self.canvas.pack(fill=tk.X, side=tk.TOP)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.on_scroll)
+        self.scrollbar.pack(fill=tk.X, side=tk.TOP)
+
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll_to(self.first - (3 if e.delta > 0 else -3)))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_to(self.first - 3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_to(self.first + 3))
+
+    @property
+    def slot_width(self):
+        return self.thumb_size[0] + SLOT_PAD
+
+    def visible_count(self):
+        return max(1, self.canvas.winfo_width() // self.slot_width + 1)
+
+    def set_count(self, count):
+        self.count = count
+        self.current = min(self.current, count - 1)
+        self.scroll_to(self.first)
+
+    def show_index(self, index):
+        """Marks index as the current frame, scrolling it into view if needed."""
+        self.current = index
+        visible = self.visible_count()
+        if not self.first <= index < self.first + visible - 1:
+            self.first = index - visible // 2
+        self.scroll_to(self.first)
+
+    def scroll_to(self, first):
+        self.first = max(0, min(first, self.count - self.visible_count() + 1))
+        self.render()
+
+    def on_scroll(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.visible_count() - 1 if args[2] == 'pages' else 1)
+            self.scroll_to(self.first + step)
+
+    def on_click(self, event):
+        index = self.first + int(self.canvas.canvasx(event.x)) // self.slot_width
+        if 0 <= index < self.count:
+            self.on_select(index)
+
+    def render(self):
+        """Redraw the slots in view."""
+        self.canvas.delete("all")
+        tw, th = self.thumb_size
+        visible = self.visible_count()
+        colors = self.get_colors()
+
+        for slot, index in enumerate(range(self.first, min(self.count, self.first + visible))):
+            x = slot * self.slot_width + SLOT_PAD // 2
+            thumb = self.get_thumbnail(index)
+            if thumb is not None:
+                layer = rasterize_boxes(self.get_boxes(index), thumb.size, colors, {},
+                                        show_labels=False, width=1, layer=thumb.convert('RGBA'))
+                self.photos[slot] = self.buffers.show(layer, slot=slot)
+                self.canvas.create_image(x + (tw - thumb.width) // 2, SLOT_PAD + (th - thumb.height) // 2,
+                                         anchor=tk.NW, image=self.photos[slot])
+            else:
+                self.photos.pop(slot, None)
+                self.canvas.create_rectangle(x, SLOT_PAD, x + tw, SLOT_PAD + th, fill=THEME['list_bg'], outline="")
+
+            if index == self.current:
+                self.canvas.create_rectangle(x - 1, SLOT_PAD - 1, x + tw + 1, SLOT_PAD + th + 1,
+                                             outline=THEME['button_highlight'], width=2)
+            self.canvas.create_text(x + 2, SLOT_PAD + th + 1, text=str(index + 1), anchor=tk.NW,
+                                    fill=THEME['fg_text'], font=("Segoe UI", 7))
+
+        if self.status:
+            self.canvas.create_text(self.canvas.winfo_width() - 4, SLOT_PAD + th + 1, text=self.status,
+                                    anchor=tk.NE, fill=THEME['fg_text'], font=("Segoe UI", 7))
+
+        if self.count:
+            self.scrollbar.set(self.first / self.count, min(1.0, (self.first + visible) / self.count))
+        else:
+            self.scrollbar.set(0, 1)
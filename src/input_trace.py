@@ -0,0 +1,104 @@
+import json
+import time
+
+TRACE_VERSION = 1
+
+# Sequence bound with bind_all -> recorded event type
+RECORDED_SEQUENCES = {
+    '<KeyPress>': 'KeyPress',
+    '<KeyRelease>': 'KeyRelease',
+    '<ButtonPress>': 'ButtonPress',
+    '<ButtonRelease>': 'ButtonRelease',
+    '<Motion>': 'Motion', # includes drags; the held buttons are in state
+    '<MouseWheel>': 'MouseWheel'
+}
+
+def _int_or_none(value):
+    return value if isinstance(value, int) else None
+
+class InputRecorder:
+    """
+    Records the Tk input event stream of a labeling session.
+
+    Events are captured with bind_all(add="+"), so the application's own bindings
+    are untouched. Each event keeps its time offset, target widget path and the
+    fields needed to regenerate it with event_generate() (see benchmarks/replay.py).
+    """
+    def __init__(self, root, ignore_keysyms=()):
+        self.root = root
+        self.ignore_keysyms = set(ignore_keysyms)
+        self.events = []
+        self.recording = False
+        self._start = 0.0
+        self._bound = False
+
+    def start(self):
+        if not self._bound:
+            for sequence, event_type in RECORDED_SEQUENCES.items():
+                self.root.bind_all(sequence, lambda e, t=event_type: self._record(t, e), add="+")
+            self._bound = True
+        self.events = []
+        self._start = time.perf_counter()
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+        return len(self.events)
+
+    def _record(self, event_type, event):
+        if not self.recording:
+            return
+        keysym = getattr(event, 'keysym', None)
+        if event_type.startswith('Key') and keysym in self.ignore_keysyms:
+            return
+
+        entry = {
+            't': round(time.perf_counter() - self._start, 4),
+            'type': event_type,
+            'widget': str(event.widget),
+            'x': _int_or_none(event.x),
+            'y': _int_or_none(event.y),
+            'state': _int_or_none(event.state)
+        }
+        if event_type.startswith('Key'):
+            entry['keysym'] = keysym
+        elif event_type.startswith('Button'):
+            entry['num'] = _int_or_none(event.num)
+        elif event_type == 'MouseWheel':
+            entry['delta'] = _int_or_none(event.delta)
+        self.events.append(entry)
+
+    def save(self, path, header=None):
+        """
+        Writes the trace as JSONL: a header object (session context such as the image
+        folder, current frame and window geometry) followed by one object per event.
+
+        Returns:
+            int: Number of events written.
+        """
+        with open(path, 'w') as f:
+            f.write(json.dumps(dict(header or {}, version=TRACE_VERSION, kind='header')) + "\n")
+            for entry in self.events:
+                f.write(json.dumps(entry) + "\n")
+        return len(self.events)
+
+def load_trace(path):
+    """
+    Reads a trace written by InputRecorder.save().
+
+    Returns:
+        tuple: (header dict, list of event dicts)
+    """
+    header = {}
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get('kind') == 'header':
+                header = entry
+            else:
+                events.append(entry)
+    return header, events
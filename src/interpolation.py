@@ -0,0 +1,111 @@
+import os
+import concurrent.futures
+import numpy as np
+from src.utils import boxes_to_array, iou_matrix, get_label_path, parse_yolo, save_yolo
+
+def match_boxes(boxes_a, boxes_b, method="iou"):
+    """
+    Pairs boxes of two keyframes class by class.
+
+    Args:
+        boxes_a (list): Boxes of the first keyframe (normalized dicts).
+        boxes_b (list): Boxes of the second keyframe (normalized dicts).
+        method (str): 'iou' pairs the most overlapping boxes first and falls back to
+                      order of appearance for the rest; 'order' pairs purely by order.
+
+    Returns:
+        list: (index_a, index_b) pairs. Boxes without a partner are left out.
+    """
+    pairs = []
+    class_ids = sorted({b['class_id'] for b in boxes_a} & {b['class_id'] for b in boxes_b})
+
+    for class_id in class_ids:
+        idx_a = [i for i, b in enumerate(boxes_a) if b['class_id'] == class_id]
+        idx_b = [i for i, b in enumerate(boxes_b) if b['class_id'] == class_id]
+
+        matched_a = []
+        matched_b = []
+        if method == "iou":
+            ious = iou_matrix([boxes_a[i] for i in idx_a], [boxes_b[i] for i in idx_b])
+            # Greedy assignment: take the best remaining overlap each round
+            while ious.size and ious.max() > 0:
+                r, c = np.unravel_index(np.argmax(ious), ious.shape)
+                matched_a.append(r)
+                matched_b.append(c)
+                ious[r, :] = -1
+                ious[:, c] = -1
+
+        # Remaining boxes are paired in order of appearance
+        rest_a = [r for r in range(len(idx_a)) if r not in matched_a]
+        rest_b = [c for c in range(len(idx_b)) if c not in matched_b]
+        matched_a.extend(rest_a[:len(rest_b)])
+        matched_b.extend(rest_b[:len(rest_a)])
+
+        pairs.extend((idx_a[r], idx_b[c]) for r, c in zip(matched_a, matched_b))
+
+    return pairs
+
+def interpolate_boxes(boxes_a, boxes_b, num_frames, method="iou"):
+    """
+    Linearly interpolates matched boxes for the frames strictly between two keyframes.
+
+    Args:
+        boxes_a (list): Boxes of the first keyframe.
+        boxes_b (list): Boxes of the second keyframe.
+        num_frames (int): Number of in-between frames.
+        method (str): Matching method passed to match_boxes.
+
+    Returns:
+        list: One list of box dicts per in-between frame.
+    """
+    pairs = match_boxes(boxes_a, boxes_b, method)
+    if num_frames <= 0:
+        return []
+    if not pairs:
+        return [[] for _ in range(num_frames)]
+
+    start = boxes_to_array([boxes_a[i] for i, _ in pairs])
+    end = boxes_to_array([boxes_b[j] for _, j in pairs])
+    class_ids = [boxes_a[i]['class_id'] for i, _ in pairs]
+
+    # (num_frames, 1, 1) weights against (K, 4) boxes -> (num_frames, K, 4) in one go
+    t = (np.arange(1, num_frames + 1, dtype=np.float64) / (num_frames + 1))[:, None, None]
+    frames = start[None, :, :] + t * (end - start)[None, :, :]
+    frames = np.clip(frames, 0.0, 1.0)
+
+    return [
+        [{'class_id': cid, 'x_center': x, 'y_center': y, 'w': w, 'h': h}
+         for cid, (x, y, w, h) in zip(class_ids, frame.tolist())]
+        for frame in frames
+    ]
+
+def write_interpolated_labels(output_dir, filenames, frame_boxes, journal, max_workers=None):
+    """
+    Writes interpolated boxes into the label files of a frame range.
+
+    Existing boxes of the interpolated classes are replaced; boxes of other
+    classes already present in a file are kept.
+
+    Args:
+        output_dir (str): Directory holding the YOLO .txt files.
+        filenames (list): Image filenames, one per in-between frame.
+        frame_boxes (list): Output of interpolate_boxes, aligned with filenames.
+        journal (BatchJournal): Receives a snapshot of every written file.
+        max_workers (int): Thread count for the batch write.
+
+    Returns:
+        int: Number of label files written.
+    """
+    def write_one(item):
+        filename, boxes = item
+        txt_path = get_label_path(output_dir, filename)
+        replaced = {b['class_id'] for b in boxes}
+        skipped = []
+        kept = [b for b in parse_yolo(txt_path, 0, 0, skipped) if b['class_id'] not in replaced]
+        journal.record(txt_path)
+        save_yolo(txt_path, kept + boxes, skipped)
+        return 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(write_one, zip(filenames, frame_boxes)))
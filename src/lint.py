@@ -0,0 +1,343 @@
+"""
+Integrity checks for the YOLO label files of a dataset.
+
+lint_dataset() streams over the label files in a process pool and reports:
+    malformed      lines with fewer than 5 values, non-numeric or non-finite values
+    out_of_range   boxes reaching outside the image (normalized coords outside [0, 1])
+    zero_area      boxes with a width or height of zero (or less)
+    unknown_class  class IDs missing from predefined_classes.txt
+    orphan         .txt files without a matching image
+    size_outlier   boxes whose area is far from the usual size of their class
+                   (robust z-score of the log area, median/MAD per class)
+
+Every issue is a dict with filename (the image, or the .txt for orphans), line
+(1-based, or None), box (index of the box in the editor, or None), kind,
+message and fixable. fix_label_files() repairs the
+fixable kinds (drops malformed and zero-area lines, clips out-of-range boxes)
+in one journaled batch. LintReportWindow lists the issues; clicking one opens
+the frame in the editor.
+"""
+import os
+import math
+import concurrent.futures
+from collections import Counter
+import tkinter as tk
+import numpy as np
+
+from src.ui_components import DarkButton, DarkFrame, DarkLabel, DarkListbox, THEME
+from src.utils import get_label_path
+
+OUT_OF_RANGE_TOLERANCE = 1e-3
+OUTLIER_Z = 3.5
+OUTLIER_MIN_BOXES = 20 # classes with fewer boxes are not checked for size outliers
+FIXABLE_KINDS = ('malformed', 'out_of_range', 'zero_area')
+IGNORED_LABEL_FILES = ('classes.txt',)
+
+def _parse_line(line):
+    """
+    (class_id, x, y, w, h) of a label line, or None if it is malformed.
+    A class ID written as an integral float ("3.0") is accepted here, but
+    parse_yolo() skips that line, so it is still reported and rewritten by the fix.
+    """
+    parts = line.split()
+    if len(parts) < 5:
+        return None
+    try:
+        class_value = float(parts[0])
+        values = [float(v) for v in parts[1:5]]
+    except ValueError:
+        return None
+    if not class_value.is_integer() or not all(math.isfinite(v) for v in values):
+        return None
+    return (int(class_value),) + tuple(values)
+
+def _is_int(token):
+    try:
+        int(token)
+        return True
+    except ValueError:
+        return False
+
+def _editor_keeps(parts):
+    """True if parse_yolo() loads the line split into parts as a box"""
+    if len(parts) < 5 or not _is_int(parts[0]):
+        return False
+    try:
+        [float(v) for v in parts[1:5]]
+    except ValueError:
+        return False
+    return True
+
+def _out_of_range(x, y, w, h, tolerance=OUT_OF_RANGE_TOLERANCE):
+    return (x - w / 2 < -tolerance or y - h / 2 < -tolerance or
+            x + w / 2 > 1 + tolerance or y + h / 2 > 1 + tolerance)
+
+def lint_label_file(txt_path, known_classes):
+    """
+    Checks one label file (process pool worker).
+
+    Lines are numbered from 1. box is the index the line's box gets in the
+    editor, or None if parse_yolo() skips the line.
+
+    Returns:
+        tuple: (issues as (line, box, kind, message) tuples, geometry as (line, box, class_id, w, h) tuples)
+    """
+    issues = []
+    geometry = []
+    try:
+        with open(txt_path, 'r') as f:
+            lines = f.readlines()
+    except OSError as e:
+        return [(None, None, 'malformed', f"Cannot read file: {e}")], []
+
+    loaded = 0
+    for number, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts:
+            continue
+        box = None
+        if _editor_keeps(parts):
+            box = loaded
+            loaded += 1
+        parsed = _parse_line(line)
+        if parsed is None:
+            issues.append((number, box, 'malformed', f"Malformed line: {line.strip()[:60]!r}"))
+            continue
+        if not _is_int(parts[0]):
+            issues.append((number, None, 'malformed', f"Class ID {parts[0]!r} is not an integer"))
+        class_id, x, y, w, h = parsed
+        if w <= 0 or h <= 0:
+            issues.append((number, box, 'zero_area', f"Zero-area box (w={w:g}, h={h:g})"))
+            continue
+        if _out_of_range(x, y, w, h):
+            issues.append((number, box, 'out_of_range', f"Box outside the image (x={x:g}, y={y:g}, w={w:g}, h={h:g})"))
+        if known_classes is not None and class_id not in known_classes:
+            issues.append((number, box, 'unknown_class', f"Unknown class ID {class_id}"))
+        geometry.append((number, box, class_id, w, h))
+    return issues, geometry
+
+def _lint_item(item):
+    filename, txt_path, known_classes = item
+    if not os.path.exists(txt_path):
+        return filename, [], []
+    issues, geometry = lint_label_file(txt_path, known_classes)
+    return filename, issues, geometry
+
+def size_outliers(filenames, lines, boxes, classes, areas, z_threshold=OUTLIER_Z, min_boxes=OUTLIER_MIN_BOXES):
+    """
+    Flags boxes whose log area has a robust z-score (0.6745 * (x - median) / MAD)
+    above z_threshold within their class. Arguments are aligned per box.
+
+    Returns:
+        list: Issue dicts.
+    """
+    issues = []
+    classes = np.asarray(classes)
+    log_area = np.log(np.asarray(areas, dtype=np.float64))
+    for class_id in np.unique(classes):
+        members = np.flatnonzero(classes == class_id)
+        if len(members) < min_boxes:
+            continue
+        values = log_area[members]
+        median = np.median(values)
+        mad = np.median(np.abs(values - median))
+        if mad == 0:
+            continue
+        z = 0.6745 * (values - median) / mad
+        for i in np.flatnonzero(np.abs(z) > z_threshold):
+            j = members[i]
+            size = "large" if z[i] > 0 else "small"
+            issues.append({
+                'filename': filenames[j],
+                'line': lines[j],
+                'box': boxes[j],
+                'kind': 'size_outlier',
+                'message': f"Unusually {size} box for class {int(class_id)} "
+                           f"(area {np.exp(values[i]):.2e} of the image, z={z[i]:.1f})",
+                'fixable': False
+            })
+    return issues
+
+def find_orphans(output_dir, filenames):
+    """Label files in output_dir without an image in filenames"""
+    stems = {os.path.splitext(f)[0] for f in filenames}
+    try:
+        names = os.listdir(output_dir)
+    except OSError:
+        return []
+    return sorted(n for n in names if n.endswith('.txt') and n not in IGNORED_LABEL_FILES
+                  and os.path.splitext(n)[0] not in stems)
+
+def lint_dataset(output_dir, filenames, known_classes=None, progress_callback=None, max_workers=None):
+    """
+    Lints the label files of filenames (image filenames) in a process pool.
+
+    Args:
+        output_dir (str): Directory holding the YOLO .txt files.
+        filenames (list): Image filenames; issues are reported in this order.
+        known_classes (set): Valid class IDs (None skips the unknown class check).
+        progress_callback (callable): Called as progress_callback(done, total).
+        max_workers (int): Process count.
+
+    Returns:
+        list: Issue dicts.
+    """
+    issues = []
+    outlier_input = ([], [], [], [], []) # filename, line, box, class_id, area per box
+    total = len(filenames)
+    known = set(known_classes) if known_classes is not None else None
+    items = [(f, get_label_path(output_dir, f), known) for f in filenames]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_lint_item, items, chunksize=256)
+        for done, (filename, file_issues, geometry) in enumerate(results, 1):
+            for line, box, kind, message in file_issues:
+                issues.append({'filename': filename, 'line': line, 'box': box, 'kind': kind,
+                               'message': message, 'fixable': kind in FIXABLE_KINDS})
+            for values in geometry:
+                for column, value in zip(outlier_input, (filename,) + values[:3] + (values[3] * values[4],)):
+                    column.append(value)
+            if progress_callback and (done % 1000 == 0 or done == total):
+                progress_callback(done, total)
+
+    if outlier_input[0]:
+        issues.extend(size_outliers(*outlier_input))
+    for name in find_orphans(output_dir, filenames):
+        issues.append({'filename': name, 'line': None, 'box': None, 'kind': 'orphan',
+                       'message': "Label file without an image", 'fixable': False})
+    return issues
+
+def fix_label_file(txt_path, journal=None):
+    """
+    Drops malformed and zero-area lines, clips out-of-range boxes to the image and
+    rewrites float class IDs as integers. Other lines are kept as they are.
+    The file is recorded in journal (a BatchJournal) before it is rewritten.
+
+    Returns:
+        bool: True if the file changed.
+    """
+    with open(txt_path, 'r') as f:
+        lines = f.readlines()
+
+    fixed = []
+    for line in lines:
+        if not line.strip():
+            continue
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        class_id, x, y, w, h = parsed
+        if w <= 0 or h <= 0:
+            continue
+        if _out_of_range(x, y, w, h, 0):
+            x1 = min(max(x - w / 2, 0.0), 1.0)
+            y1 = min(max(y - h / 2, 0.0), 1.0)
+            x2 = min(max(x + w / 2, 0.0), 1.0)
+            y2 = min(max(y + h / 2, 0.0), 1.0)
+            if x2 <= x1 or y2 <= y1:
+                continue # entirely outside the image
+            line = f"{class_id} {(x1 + x2) / 2:.6f} {(y1 + y2) / 2:.6f} {x2 - x1:.6f} {y2 - y1:.6f}\n"
+        elif not _is_int(line.split()[0]):
+            line = f"{class_id} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n"
+        elif not line.endswith("\n"):
+            line += "\n"
+        fixed.append(line)
+
+    if fixed == lines:
+        return False
+    if journal is not None:
+        journal.record(txt_path)
+    with open(txt_path, 'w') as f:
+        f.writelines(fixed)
+    return True
+
+def fix_label_files(output_dir, filenames, journal, max_workers=None):
+    """
+    Applies fix_label_file() to the label files of filenames in parallel,
+    recording every modified file in journal (a BatchJournal) before it is written.
+
+    Returns:
+        int: Number of files changed.
+    """
+    def fix_one(filename):
+        txt_path = get_label_path(output_dir, filename)
+        try:
+            return fix_label_file(txt_path, journal)
+        except Exception as e:
+            print(f"Error fixing {txt_path}: {e}")
+            return False
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(fix_one, filenames))
+
+class LintReportWindow(tk.Toplevel):
+    """
+    Lists lint issues, one per row. on_open(issue) jumps to the offending frame,
+    on_fix(issues) repairs the fixable ones and on_rerun() lints again.
+    """
+    def __init__(self, master, issues, on_open, on_fix, on_rerun):
+        super().__init__(master)
+        self.title("Label Lint")
+        self.configure(bg=THEME['bg_main'])
+        self.geometry("760x480")
+        self.on_open = on_open
+        self.on_fix = on_fix
+        self.on_rerun = on_rerun
+        self.issues = []
+        self.shown = [] # issues in listbox order
+        self.kind_filter = tk.StringVar(value="all")
+
+        bar = DarkFrame(self)
+        bar.pack(fill=tk.X, side=tk.TOP, pady=5)
+        self.kind_menu = tk.OptionMenu(bar, self.kind_filter, "all")
+        self.kind_menu.config(bg=THEME['bg_sidebar'], fg=THEME['fg_text'], highlightthickness=0)
+        self.kind_menu.pack(side=tk.LEFT, padx=5)
+        self.fix_button = DarkButton(bar, text="Auto-Fix", command=self.fix)
+        self.fix_button.pack(side=tk.LEFT, padx=5)
+        DarkButton(bar, text="Re-run", command=self.on_rerun).pack(side=tk.LEFT, padx=5)
+        self.status = DarkLabel(bar, text="")
+        self.status.pack(side=tk.LEFT, padx=10)
+
+        list_frame = DarkFrame(self)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = DarkListbox(list_frame, yscrollcommand=scrollbar.set, font=("Consolas", 9))
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.listbox.yview)
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+
+        self.kind_filter.trace_add('write', lambda *args: self.show_issues())
+        self.set_issues(issues)
+
+    def set_issues(self, issues):
+        self.issues = issues
+        counts = Counter(i['kind'] for i in issues)
+        menu = self.kind_menu['menu']
+        menu.delete(0, tk.END)
+        for kind in ["all"] + sorted(counts):
+            label = kind if kind == "all" else f"{kind} ({counts[kind]})"
+            menu.add_command(label=label, command=lambda k=kind: self.kind_filter.set(k))
+        if self.kind_filter.get() not in counts:
+            self.kind_filter.set("all") # also redraws through the trace
+        else:
+            self.show_issues()
+
+    def show_issues(self):
+        kind = self.kind_filter.get()
+        self.shown = [i for i in self.issues if kind == "all" or i['kind'] == kind]
+        self.listbox.delete(0, tk.END)
+        for issue in self.shown:
+            where = issue['filename'] if issue['line'] is None else f"{issue['filename']}:{issue['line']}"
+            self.listbox.insert(tk.END, f"{where}  [{issue['kind']}]  {issue['message']}")
+        fixable = sum(1 for i in self.issues if i['fixable'])
+        self.status.config(text=f"{len(self.issues)} issues, {fixable} auto-fixable")
+        self.fix_button.config(state=tk.NORMAL if fixable else tk.DISABLED)
+
+    def on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.on_open(self.shown[selection[0]])
+
+    def fix(self):
+        self.on_fix([i for i in self.issues if i['fixable']])
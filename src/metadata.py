@@ -0,0 +1,183 @@
+"""
+Per-folder image metadata cache (width, height, format, mtime, file size and an
+optional SHA-1 content hash) in an SQLite file next to the images.
+
+Sizes come from header-only reads: Image.open() parses the header and never
+decodes pixels unless load() is called. refresh() re-reads only the files whose
+mtime or size changed, so keeping the cache current is cheap on large folders:
+
+    cache = MetadataCache(image_dir)
+    cache.refresh(filenames)
+    sizes = cache.sizes() # filename -> (width, height)
+
+Run it from the command line to fill the cache ahead of time:
+
+    python -m src.metadata <image_dir> [--hash]
+"""
+import os
+import sys
+import sqlite3
+import argparse
+import threading
+import concurrent.futures
+from PIL import Image
+
+from src.preannotate import content_hash
+
+DB_NAME = ".image_metadata.sqlite"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+COMMIT_EVERY = 1000
+
+def read_header(path, with_hash=False):
+    """
+    Reads the image size and format from the file header (no pixel decode).
+
+    Returns:
+        tuple: (width, height, format, hash or None)
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        fmt = img.format
+    return width, height, fmt, content_hash(path) if with_hash else None
+
+class MetadataCache:
+    def __init__(self, image_dir):
+        self.image_dir = image_dir
+        self.db_path = os.path.join(image_dir, DB_NAME)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._sizes = {} # filename -> (width, height), read without touching SQLite
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS images (
+                filename TEXT PRIMARY KEY,
+                width INTEGER, height INTEGER, format TEXT,
+                mtime REAL, size INTEGER, hash TEXT)""")
+            self._conn.commit()
+
+    def refresh(self, filenames, with_hash=False, progress_callback=None, max_workers=None, prune=True):
+        """
+        Brings the rows of filenames up to date with parallel header reads.
+
+        Args:
+            filenames (list): Image filenames in image_dir.
+            with_hash (bool): Also compute content hashes (reads every changed file in full).
+            progress_callback (callable): Called as progress_callback(done, total).
+            prune (bool): Delete rows of files not in filenames.
+
+        Returns:
+            int: Number of rows written.
+        """
+        with self._lock:
+            if self._closed:
+                return 0
+            rows = self._conn.execute("SELECT filename, mtime, size, hash, width, height FROM images").fetchall()
+        known = {row[0]: row[1:4] for row in rows}
+        self._sizes.update({row[0]: (row[4], row[5]) for row in rows})
+
+        todo = []
+        for filename in filenames:
+            try:
+                st = os.stat(os.path.join(self.image_dir, filename))
+            except OSError:
+                continue
+            row = known.get(filename)
+            if row is None or row[0] != st.st_mtime or row[1] != st.st_size or (with_hash and row[2] is None):
+                todo.append((filename, st.st_mtime, st.st_size))
+
+        def read(item):
+            filename, mtime, size = item
+            try:
+                width, height, fmt, digest = read_header(os.path.join(self.image_dir, filename), with_hash)
+                return (filename, width, height, fmt, mtime, size, digest)
+            except Exception as e:
+                print(f"Error reading header of {filename}: {e}")
+                return None
+
+        total = len(todo)
+        written = 0
+        rows = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for done, row in enumerate(executor.map(read, todo), 1):
+                if row is not None:
+                    rows.append(row)
+                if len(rows) >= COMMIT_EVERY or done == total:
+                    written += self._write(rows)
+                    rows = []
+                if progress_callback:
+                    progress_callback(done, total)
+
+        if prune:
+            gone = set(known) - set(filenames)
+            if gone:
+                with self._lock:
+                    if self._closed:
+                        return written
+                    self._conn.executemany("DELETE FROM images WHERE filename = ?", [(f,) for f in gone])
+                    self._conn.commit()
+                for f in gone:
+                    self._sizes.pop(f, None)
+        return written
+
+    def _write(self, rows):
+        if not rows:
+            return 0
+        with self._lock:
+            if self._closed:
+                return 0
+            self._conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        self._sizes.update({row[0]: (row[1], row[2]) for row in rows})
+        return len(rows)
+
+    def get(self, filename):
+        """The row of filename as a dict, or None"""
+        with self._lock:
+            if self._closed:
+                return None
+            row = self._conn.execute("SELECT width, height, format, mtime, size, hash FROM images WHERE filename = ?",
+                                     (filename,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('width', 'height', 'format', 'mtime', 'size', 'hash'), row))
+
+    def size(self, filename):
+        """
+        (width, height) of filename, or None until a refresh has read it.
+        A dict lookup: it never waits on disk or on a running refresh, so the UI thread can call it.
+        """
+        return self._sizes.get(filename)
+
+    def sizes(self, filenames=None):
+        """Cached (width, height) per filename, for all rows or the given filenames"""
+        with self._lock:
+            if self._closed:
+                return {}
+            rows = self._conn.execute("SELECT filename, width, height FROM images").fetchall()
+        sizes = {f: (w, h) for f, w, h in rows}
+        if filenames is not None:
+            sizes = {f: sizes[f] for f in filenames if f in sizes}
+        return sizes
+
+    def close(self):
+        """Closes the connection; a refresh still running stops writing."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the image metadata cache of a folder")
+    parser.add_argument("image_dir")
+    parser.add_argument("--hash", action="store_true", help="also store SHA-1 content hashes")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    filenames = [f for f in os.listdir(args.image_dir) if f.lower().endswith(IMAGE_EXTENSIONS)]
+    cache = MetadataCache(args.image_dir)
+    written = cache.refresh(filenames, with_hash=args.hash, max_workers=args.workers)
+    cache.close()
+    print(f"{written} of {len(filenames)} images (re)read", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Level-of-detail rules for the box overlay.
+
+plan_overlay() decides, for one view transform, which boxes are drawn, which of
+them get a text label and which small boxes are merged into per-class cluster
+aggregates. It works on all boxes at once with NumPy, so planning stays cheap
+on frames with thousands of boxes; only the planned items reach the Tk canvas.
+
+LabelPool keeps the canvas text items of the box labels alive between redraws
+and moves/reconfigures them instead of deleting and recreating them.
+
+For frames with thousands of boxes, rasterize_boxes() draws them into one RGBA
+layer with PIL instead, which the GUI composites onto the display image.
+"""
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src.utils import boxes_to_array
+
+LABEL_MIN_PIXELS = 16 # boxes whose smaller on-screen side is below this get no label
+CLUSTER_MIN_BOXES = 300 # clustering starts when more boxes than this are visible
+CLUSTER_CELL_PIXELS = 48 # grid cell (on screen) in which small boxes of one class merge
+CLUSTER_MAX_PIXELS = 24 # only boxes whose larger on-screen side is below this are merged
+BITMAP_OVERLAY_MIN_BOXES = 1000 # boxes + proposals from which the bitmap layer takes over
+
+_label_font = None
+_label_sprites = {} # (text, color) -> rendered RGBA label
+
+class OverlayPlan:
+    def __init__(self):
+        self.boxes = [] # (index, show_label) of the boxes to draw in full
+        self.clusters = [] # (class_id, x1, y1, x2, y2, count) in canvas coords
+        self.culled = 0 # boxes outside the view
+
+def plan_overlay(boxes, selected, image_size, scale, offset, view,
+                 label_min=LABEL_MIN_PIXELS, cluster_min=CLUSTER_MIN_BOXES,
+                 cell=CLUSTER_CELL_PIXELS, cluster_max=CLUSTER_MAX_PIXELS):
+    """
+    Plans the overlay of one frame.
+
+    Args:
+        boxes (list): Normalized box dicts.
+        selected (set): Selected indices; these are always drawn in full with a label.
+        image_size (tuple): (width, height) of the image in pixels.
+        scale (float): Canvas pixels per image pixel.
+        offset (tuple): Canvas position of the image's top-left corner.
+        view (tuple): Visible canvas region (x1, y1, x2, y2).
+
+    Returns:
+        OverlayPlan
+    """
+    plan = OverlayPlan()
+    if len(boxes) == 0:
+        return plan
+
+    iw, ih = image_size
+    arr = boxes_to_array(boxes)
+    w = arr[:, 2] * iw * scale
+    h = arr[:, 3] * ih * scale
+    x1 = (arr[:, 0] - arr[:, 2] / 2) * iw * scale + offset[0]
+    y1 = (arr[:, 1] - arr[:, 3] / 2) * ih * scale + offset[1]
+    x2 = x1 + w
+    y2 = y1 + h
+
+    is_selected = np.zeros(len(boxes), dtype=bool)
+    if selected:
+        is_selected[list(selected)] = True
+
+    visible = (x2 >= view[0]) & (x1 <= view[2]) & (y2 >= view[1]) & (y1 <= view[3])
+    plan.culled = int((~visible).sum())
+    show_label = (np.minimum(w, h) >= label_min) | is_selected
+
+    full = visible.copy()
+    if visible.sum() > cluster_min:
+        small = visible & ~is_selected & (np.maximum(w, h) < cluster_max)
+        members = np.flatnonzero(small)
+        if len(members):
+            classes = np.array([boxes[i]['class_id'] for i in members], dtype=np.int64)
+            cx = ((x1[members] + x2[members]) / 2 // cell).astype(np.int64)
+            cy = ((y1[members] + y2[members]) / 2 // cell).astype(np.int64)
+            keys = np.stack([classes, cx, cy], axis=1)
+            _, group, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+            group = group.reshape(-1)
+
+            # Singletons stay ordinary (unlabeled) boxes
+            clustered = counts[group] > 1
+            full[members[clustered]] = False
+
+            n = len(counts)
+            gx1 = np.full(n, np.inf); gy1 = np.full(n, np.inf)
+            gx2 = np.full(n, -np.inf); gy2 = np.full(n, -np.inf)
+            np.minimum.at(gx1, group, x1[members]); np.minimum.at(gy1, group, y1[members])
+            np.maximum.at(gx2, group, x2[members]); np.maximum.at(gy2, group, y2[members])
+            group_class = np.zeros(n, dtype=np.int64)
+            group_class[group] = classes
+            for g in np.flatnonzero(counts > 1):
+                plan.clusters.append((int(group_class[g]), float(gx1[g]), float(gy1[g]),
+                                      float(gx2[g]), float(gy2[g]), int(counts[g])))
+
+    plan.boxes = [(int(i), bool(show_label[i])) for i in np.flatnonzero(full)]
+    return plan
+
+def label_visible(box, image_size, scale, label_min=LABEL_MIN_PIXELS):
+    """The label rule of plan_overlay() for a single box."""
+    iw, ih = image_size
+    return min(box['w'] * iw, box['h'] * ih) * scale >= label_min
+
+def _get_label_font():
+    global _label_font
+    if _label_font is None:
+        try:
+            _label_font = ImageFont.truetype("segoeuib.ttf", 12)
+        except OSError:
+            _label_font = ImageFont.load_default()
+    return _label_font
+
+def _label_sprite(text, color):
+    """Renders a label once; drawing text per box is far slower than pasting the bitmap."""
+    sprite = _label_sprites.get((text, color))
+    if sprite is None:
+        font = _get_label_font()
+        left, top, right, bottom = font.getbbox(text)
+        sprite = Image.new('RGBA', (max(1, right), max(1, bottom)), (0, 0, 0, 0))
+        ImageDraw.Draw(sprite).text((0, 0), text, fill=color, font=font)
+        _label_sprites[(text, color)] = sprite
+    return sprite
+
+def rasterize_boxes(boxes, size, colors, names, exclude=(), show_labels=True,
+                    label_min=LABEL_MIN_PIXELS, width=2, layer=None):
+    """
+    Draws box outlines (and labels) into a transparent RGBA layer covering the
+    displayed image.
+
+    Args:
+        boxes (list): Normalized box dicts.
+        size (tuple): (width, height) of the displayed image in canvas pixels.
+        colors (dict): class_id -> '#RRGGBB'; unknown classes are drawn white.
+        names (dict): class_id -> label text.
+        exclude (set): Indices left out (e.g. the selection, drawn as live canvas items).
+        layer (Image): Existing layer to draw into (default: a new one).
+
+    Returns:
+        Image: The RGBA layer.
+    """
+    if layer is None:
+        layer = Image.new('RGBA', size, (0, 0, 0, 0))
+    if len(boxes) == 0:
+        return layer
+
+    draw = ImageDraw.Draw(layer)
+    nw, nh = size
+    arr = boxes_to_array(boxes)
+    x1 = (arr[:, 0] - arr[:, 2] / 2) * nw
+    y1 = (arr[:, 1] - arr[:, 3] / 2) * nh
+    x2 = x1 + arr[:, 2] * nw
+    y2 = y1 + arr[:, 3] * nh
+    labeled = np.minimum(x2 - x1, y2 - y1) >= label_min
+
+    for i, box in enumerate(boxes):
+        if i in exclude:
+            continue
+        class_id = box['class_id']
+        color = colors.get(class_id, "#FFFFFF")
+        draw.rectangle([x1[i], y1[i], max(x1[i], x2[i] - 1), max(y1[i], y2[i] - 1)], outline=color, width=width)
+        if show_labels and labeled[i]:
+            # Same placement as the canvas labels: bottom-left corner above the box
+            # (or inside it at the top edge)
+            sprite = _label_sprite(names.get(class_id, "Unknown"), color)
+            text_y = y1[i] - 15
+            if text_y < 0: text_y = y1[i] + 5
+            layer.paste(sprite, (int(x1[i]), int(text_y) - sprite.height), sprite)
+    return layer
+
+class LabelPool:
+    """
+    Reusable canvas text items for box labels, keyed by box index.
+
+    show() moves an existing item (reconfiguring text/colour only when they
+    changed) or takes one from the free list; hide() returns it to the free list.
+    Between begin() and end(), every label not shown again is hidden.
+    """
+    TAG = "label_pool"
+
+    def __init__(self, canvas, font, anchor='sw'):
+        self.canvas = canvas
+        self.font = font
+        self.anchor = anchor
+        self.items = {} # box index -> item id
+        self.config = {} # item id -> (text, fill)
+        self.free = []
+        self._shown = None
+
+    def _validate(self):
+        # Items vanish when the canvas is cleared with delete("all")
+        if len(self.canvas.find_withtag(self.TAG)) != len(self.config):
+            self.items = {}
+            self.config = {}
+            self.free = []
+
+    def begin(self):
+        self._validate()
+        self._shown = set()
+
+    def end(self):
+        for index in list(self.items):
+            if index not in self._shown:
+                self.hide(index)
+        self._shown = None
+        self.canvas.tag_raise(self.TAG)
+
+    def show(self, index, x, y, text, fill):
+        if self._shown is not None:
+            self._shown.add(index)
+        item = self.items.get(index)
+        if item is None:
+            if self.free:
+                item = self.free.pop()
+                self.canvas.itemconfigure(item, state='normal')
+            else:
+                item = self.canvas.create_text(x, y, text=text, fill=fill, anchor=self.anchor, font=self.font, tags=self.TAG)
+                self.config[item] = (text, fill)
+            self.items[index] = item
+        if self.config[item] != (text, fill):
+            self.canvas.itemconfigure(item, text=text, fill=fill)
+            self.config[item] = (text, fill)
+        self.canvas.coords(item, x, y)
+
+    def hide(self, index):
+        item = self.items.pop(index, None)
+        if item is not None:
+            self.canvas.itemconfigure(item, state='hidden')
+            self.free.append(item)
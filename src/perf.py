@@ -0,0 +1,174 @@
+"""
+Lightweight timing instrumentation for hot paths.
+
+Usage:
+    from src import perf
+    with perf.timer("redraw.resize"):
+        ...
+
+While perf.enabled is False, timer() returns a shared no-op context manager,
+so instrumented code only pays for one function call and a global lookup.
+"""
+import json
+import time
+import threading
+from collections import deque
+import numpy as np
+
+enabled = False
+
+RING_SIZE = 1024
+TRACE_SIZE = 100000
+
+_lock = threading.Lock()
+_buffers = {} # name -> RingBuffer
+_counters = {} # name -> int
+_trace = deque(maxlen=TRACE_SIZE) # (timestamp, name, seconds)
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent samples of one operation."""
+    def __init__(self, size=RING_SIZE):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.count += 1
+
+    def samples(self):
+        return self.values[:min(self.count, len(self.values))]
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+def timer(name):
+    """Context manager timing a block under name. A no-op while disabled."""
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+def timed(name):
+    """Decorator form of timer()."""
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+def record(name, seconds):
+    """Adds one sample for name."""
+    with _lock:
+        buffer = _buffers.get(name)
+        if buffer is None:
+            buffer = _buffers[name] = RingBuffer()
+        buffer.append(seconds)
+        _trace.append((time.time(), name, seconds))
+
+def count(name, amount=1):
+    """Increments a counter (e.g. allocations). A no-op while disabled."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+def set_enabled(value):
+    global enabled
+    enabled = bool(value)
+
+def reset():
+    with _lock:
+        _buffers.clear()
+        _counters.clear()
+        _trace.clear()
+
+def clear_trace():
+    """Drops the samples kept for export_trace(); the HUD buffers are kept."""
+    with _lock:
+        _trace.clear()
+
+def trace_length():
+    with _lock:
+        return len(_trace)
+
+def summary():
+    """
+    Returns per-operation statistics over the ring buffers.
+
+    Returns:
+        list: Dicts with name, count, p50_ms, p95_ms, p99_ms and max_ms, sorted by name.
+    """
+    with _lock:
+        items = [(name, buffer.count, buffer.samples().copy()) for name, buffer in _buffers.items()]
+
+    rows = []
+    for name, total, samples in sorted(items):
+        if len(samples) == 0:
+            continue
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        rows.append({
+            'name': name,
+            'count': total,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(samples.max() * 1000)
+        })
+    return rows
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+def format_summary():
+    """Multi-line text table of summary() and counters() for the on-canvas HUD."""
+    lines = [f"{'operation':<24}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+    for row in summary():
+        lines.append(f"{row['name']:<24}{row['count']:>6}{row['p50_ms']:>8.1f}{row['p95_ms']:>8.1f}{row['p99_ms']:>8.1f}")
+    for name, value in sorted(counters().items()):
+        lines.append(f"{name:<24}{value:>6}")
+    return "\n".join(lines)
+
+def export_trace(path):
+    """
+    Writes the recorded samples as JSONL, one {"ts", "op", "ms"} object per line.
+
+    Returns:
+        int: Number of samples written.
+    """
+    with _lock:
+        events = list(_trace)
+    with open(path, 'w') as f:
+        for ts, name, seconds in events:
+            f.write(json.dumps({'ts': ts, 'op': name, 'ms': seconds * 1000}) + "\n")
+    return len(events)
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+import subprocess
+
+DEFAULT_LOOKAHEAD = 8
+DEFAULT_BATCH_SIZE = 4
+DEFAULT_WORKER_COMMAND = f'"{sys.executable}" -m src.preannotate_worker'
+
+def content_hash(path):
+    """SHA-1 of the file bytes, used to key cached predictions."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _file_key(path):
+    """(mtime, size) of path, or None if it cannot be read; changes when the file is replaced or edited."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+class PreannotationClient:
+    """
+    Talks to a pre-annotation worker subprocess over stdin/stdout.
+
+    Protocol (one JSON object per line):
+        request:  {"id": int, "images": [path, ...]}
+        response: {"id": int, "predictions": [[box, ...], ...]}
+    Each box is {"class_id", "x_center", "y_center", "w", "h"} (normalized) with an
+    optional "score". predictions is aligned with images.
+    """
+    def __init__(self, command):
+        self.command = command
+        self._next_id = 0
+        self.process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1)
+
+    def predict(self, paths):
+        """Sends one batch and blocks until its predictions arrive. Call from a worker thread only."""
+        self._next_id += 1
+        request = {'id': self._next_id, 'images': list(paths)}
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("Pre-annotation worker exited")
+            response = json.loads(line)
+            if response.get('id') == self._next_id:
+                return response.get('predictions', [[] for _ in paths])
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except Exception:
+            self.process.kill()
+
+class PreannotationQueue:
+    """
+    Keeps predictions a fixed number of frames ahead of the cursor.
+
+    The GUI calls update_order() with the upcoming frame paths whenever the cursor
+    moves; a background thread batches the paths without predictions, sends them
+    to the worker and reports each result through on_result(path, boxes).
+    Predictions are cached by image content hash, so renamed or copied frames are
+    not predicted twice. Hashes are remembered per (path, mtime, size), so a
+    frame edited or replaced on disk is hashed and predicted again.
+    """
+    def __init__(self, command, on_result, batch_size=DEFAULT_BATCH_SIZE):
+        self.command = command
+        self.on_result = on_result
+        self.batch_size = batch_size
+        self.cache = {} # content hash -> boxes
+        self._path_hashes = {} # path -> ((mtime, size), content hash)
+        self._order = []
+        self._done = {} # path -> (mtime, size) when it was queued
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.client = None
+
+    def start(self):
+        self.client = PreannotationClient(self.command)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self.client:
+            self.client.close()
+
+    def update_order(self, paths):
+        """Replace the list of frames to predict, nearest to the cursor first."""
+        with self._cond:
+            self._order = list(paths)
+            self._cond.notify_all()
+
+    def _next_batch(self):
+        with self._cond:
+            while self._running:
+                batch = []
+                for path in self._order:
+                    key = _file_key(path)
+                    if key is not None and self._done.get(path) != key:
+                        self._done[path] = key
+                        batch.append(path)
+                        if len(batch) == self.batch_size:
+                            break
+                if batch:
+                    return batch
+                self._cond.wait()
+            return None
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            todo = []
+            for path in batch:
+                key = _file_key(path)
+                known = self._path_hashes.get(path)
+                if known is not None and known[0] == key:
+                    digest = known[1]
+                else:
+                    try:
+                        digest = content_hash(path)
+                    except OSError as e:
+                        print(f"Error hashing {path}: {e}")
+                        continue
+                    self._path_hashes[path] = (key, digest)
+                if digest in self.cache:
+                    self.on_result(path, self.cache[digest])
+                else:
+                    todo.append((path, digest))
+
+            if not todo:
+                continue
+
+            try:
+                predictions = self.client.predict([p for p, _ in todo])
+            except Exception as e:
+                print(f"Pre-annotation worker failed: {e}")
+                with self._cond:
+                    self._running = False
+                return
+
+            for (path, digest), boxes in zip(todo, predictions):
+                self.cache[digest] = boxes
+                self.on_result(path, boxes)
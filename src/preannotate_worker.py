@@ -0,0 +1,38 @@
+"""
+Stand-in pre-annotation worker.
+
+Speaks the protocol of src.preannotate.PreannotationClient and proposes one box
+in the centre of every image. Replace it with a worker wrapping a real model by
+pointing the Pre-Annotation command in Settings at it.
+
+Usage: python -m src.preannotate_worker [class_id]
+"""
+import sys
+import json
+
+def predict(path, class_id):
+    return [{
+        'class_id': class_id,
+        'x_center': 0.5,
+        'y_center': 0.5,
+        'w': 0.2,
+        'h': 0.2,
+        'score': 0.5
+    }]
+
+def main():
+    class_id = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        response = {
+            'id': request['id'],
+            'predictions': [predict(path, class_id) for path in request['images']]
+        }
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import math
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from PIL import Image
+
+class ImagePrefetcher:
+    """
+    Decodes upcoming images in background threads and keeps the most recently
+    used ones in a small LRU buffer so navigation does not wait on disk and decode.
+    """
+    def __init__(self, max_items=8, max_workers=2):
+        self.max_items = max_items
+        self._cache = OrderedDict() # path -> decoded PIL Image
+        self._pending = {} # path -> Future
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    def _decode(self, path):
+        img = Image.open(path)
+        img.load()
+        return img
+
+    def _store(self, path, img):
+        with self._lock:
+            self._cache[path] = img
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+            self._pending.pop(path, None)
+
+    def _decode_and_store(self, path):
+        try:
+            img = self._decode(path)
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(path, None)
+            print(f"Error prefetching {path}: {e}")
+            return None
+        self._store(path, img)
+        return img
+
+    def get_cached(self, path):
+        """Returns the decoded image if it is already buffered, else None. Never blocks."""
+        with self._lock:
+            img = self._cache.get(path)
+            if img is not None:
+                self._cache.move_to_end(path)
+            return img
+
+    def get(self, path):
+        """Returns the decoded image, waiting for an in-flight prefetch or decoding it now."""
+        with self._lock:
+            img = self._cache.get(path)
+            if img is not None:
+                self._cache.move_to_end(path)
+                return img
+            future = self._pending.get(path)
+
+        if future is not None:
+            img = future.result()
+            if img is not None:
+                return img
+
+        img = self._decode(path)
+        self._store(path, img)
+        return img
+
+    def get_draft(self, path, box):
+        """
+        Returns (image, full_size) for a first paint that fits into box (width, height).
+
+        A buffered full-resolution image is returned as is. Otherwise JPEGs are
+        decoded with DCT scaling (Image.draft) at the smallest scale still covering
+        the fit size, which is several times cheaper than a full decode; such drafts
+        are not buffered. Other formats are decoded (and buffered) in full.
+        """
+        img = self.get_cached(path)
+        if img is not None:
+            return img, img.size
+
+        img = Image.open(path)
+        full_size = img.size
+        if img.format != 'JPEG':
+            img.load()
+            self._store(path, img)
+            return img, full_size
+
+        scale = min(box[0] / full_size[0], box[1] / full_size[1])
+        if scale < 0.5: # draft() only scales by 1/2, 1/4 or 1/8
+            img.draft(img.mode, (math.ceil(full_size[0] * scale), math.ceil(full_size[1] * scale)))
+        img.load()
+        if img.size == full_size:
+            self._store(path, img)
+        return img, full_size
+
+    def prefetch(self, paths):
+        """Schedules background decoding of paths that are neither buffered nor in flight."""
+        with self._lock:
+            todo = [p for p in paths if p not in self._cache and p not in self._pending]
+            for path in todo:
+                self._pending[path] = self._executor.submit(self._decode_and_store, path)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
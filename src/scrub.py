@@ -0,0 +1,83 @@
+"""
+Frame previews for scrubbing through a folder with held navigation keys.
+
+While a navigation key repeats, the GUI shows a thumbnail of each frame with its
+box outlines instead of decoding, resizing and parsing the frame in full.
+ScrubCache supplies both without blocking the Tk thread: thumbnails are decoded
+in background threads around the scrub position, and label files are parsed
+once per modification time into a small annotation index.
+"""
+import os
+import threading
+import concurrent.futures
+from collections import OrderedDict
+
+from src.utils import make_thumbnail, parse_yolo
+
+SCRUB_THUMB_SIZE = (320, 320)
+
+class ScrubCache:
+    def __init__(self, max_thumbnails=256, max_workers=2, size=SCRUB_THUMB_SIZE):
+        self.max_thumbnails = max_thumbnails
+        self.size = size
+        self._thumbnails = OrderedDict() # path -> PIL Image
+        self._pending = set()
+        self._wanted = set() # paths of the latest prefetch window
+        self._boxes = {} # label path -> (mtime, boxes)
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    def _make(self, path):
+        with self._lock:
+            if path not in self._wanted:
+                # The scrub position moved on before this job started
+                self._pending.discard(path)
+                return
+        try:
+            thumb = make_thumbnail(path, self.size)
+        except Exception as e:
+            print(f"Error creating thumbnail {path}: {e}")
+            thumb = None
+        with self._lock:
+            self._pending.discard(path)
+            if thumb is not None:
+                self._thumbnails[path] = thumb
+                while len(self._thumbnails) > self.max_thumbnails:
+                    self._thumbnails.popitem(last=False)
+
+    def thumbnail(self, path):
+        """Returns the thumbnail if it is ready, else None (and schedules it). Never blocks."""
+        with self._lock:
+            thumb = self._thumbnails.get(path)
+            if thumb is not None:
+                self._thumbnails.move_to_end(path)
+                return thumb
+        self.prefetch([path])
+        return None
+
+    def prefetch(self, paths):
+        """Schedules thumbnails of paths, nearest first. Queued jobs for other paths are dropped."""
+        with self._lock:
+            self._wanted = set(paths)
+            todo = [p for p in paths if p not in self._thumbnails and p not in self._pending]
+            self._pending.update(todo)
+        for path in todo:
+            self._executor.submit(self._make, path)
+
+    def boxes(self, label_path):
+        """The normalized boxes of a label file, re-read only when the file changed."""
+        try:
+            mtime = os.path.getmtime(label_path)
+        except OSError:
+            return []
+        entry = self._boxes.get(label_path)
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, parse_yolo(label_path, 0, 0))
+            self._boxes[label_path] = entry
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._thumbnails.clear()
+            self._wanted = set()
+        self._boxes.clear()
@@ -0,0 +1,283 @@
+"""
+Tk-free annotation session: the frame list, the boxes of the current frame,
+selection, clipboard and the box editing maths.
+
+The GUI (src/app.py) drives one session and redraws when it emits change events;
+scripts, batch jobs and worker processes can drive sessions without a display:
+
+    session = AnnotationSession(image_dir, output_dir)
+    session.load_images()
+    session.open(0)
+    index = session.add_drawn_box(100, 100, 300, 200, class_id=3)
+    session.move_box(index, 10, 0)
+    session.save()
+
+All coordinates passed to the editing methods are image pixels; boxes are
+stored as normalized YOLO dicts (class_id, x_center, y_center, w, h).
+
+Events (subscribe(callback), called as callback(event, **details)):
+    'frame'     index, filename          a frame was loaded
+    'boxes'     action, indices          action is 'add', 'remove', 'update' or 'reset'
+                                         (see src.box_model.BoxModel for the indices)
+    'selection' indices, previous        the selection changed
+    'saved'     path                     the current frame was written
+"""
+import os
+from PIL import Image
+
+from src.box_model import BoxModel
+from src.utils import parse_yolo, save_yolo, normalize_box, denormalize_box, natural_sort_key, get_label_path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+DEFAULT_STAMP_SIZE = 100
+
+class AnnotationSession:
+    def __init__(self, image_dir="", output_dir=""):
+        self.image_dir = image_dir
+        self.output_dir = output_dir
+        self.image_list = []
+        self.full_image_list = [] # Store full list for filtering
+        self.current_index = -1
+        self.image_size = None # (width, height) of the current frame
+        self.skipped_lines = [] # Malformed label lines of the current frame, written back on save
+        self.clipboard = []
+        self._listeners = []
+        self._model = BoxModel()
+        self._model.subscribe(self._on_model_change)
+
+    @property
+    def boxes(self):
+        """The current frame's boxes (normalized dicts) as an observable BoxModel"""
+        return self._model
+
+    @boxes.setter
+    def boxes(self, boxes):
+        self._model.reset(boxes)
+
+    @property
+    def selected(self):
+        """Set of selected box indices"""
+        return self._model.selection
+
+    @selected.setter
+    def selected(self, indices):
+        self._model.select(indices)
+
+    # --- Events ---
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def emit(self, event, **details):
+        for callback in list(self._listeners):
+            callback(event, **details)
+
+    def _on_model_change(self, event, indices, previous):
+        if event == 'select':
+            self.emit('selection', indices=indices, previous=previous)
+        else:
+            self.emit('boxes', action=event, indices=indices)
+
+    # --- Frames ---
+    @property
+    def current_filename(self):
+        if 0 <= self.current_index < len(self.image_list):
+            return self.image_list[self.current_index]
+        return None
+
+    def load_images(self):
+        """Lists the images of image_dir in natural order. Returns the list."""
+        self.image_list = [f for f in os.listdir(self.image_dir) if f.lower().endswith(IMAGE_EXTENSIONS)]
+        self.image_list.sort(key=natural_sort_key)
+        self.full_image_list = list(self.image_list) # Keep a copy of full list
+        self.current_index = -1
+        return self.image_list
+
+    def label_path(self, filename=None):
+        return get_label_path(self.output_dir, filename or self.current_filename)
+
+    def load_frame(self, index, image_size):
+        """Makes index the current frame and reads its labels. image_size is (width, height)."""
+        self.current_index = index
+        self.image_size = image_size
+        self.skipped_lines = []
+        boxes = parse_yolo(self.label_path(), *image_size, self.skipped_lines) if self.output_dir else [] # Returns normalized boxes
+        self._model.reset(boxes, notify=False) # listeners refresh on 'frame'
+        self.emit('frame', index=index, filename=self.current_filename)
+
+    def open(self, index, save=True):
+        """
+        Headless counterpart of the GUI's load_image: saves the current frame (if save)
+        and loads frame index, reading its size from the image header only.
+        """
+        if save and self.current_index != -1:
+            self.save()
+        path = os.path.join(self.image_dir, self.image_list[index])
+        with Image.open(path) as img:
+            size = img.size
+        self.load_frame(index, size)
+
+    def reload(self):
+        """Re-reads the labels of the current frame (e.g. after a batch job wrote them)."""
+        if self.current_index == -1:
+            return
+        self.skipped_lines = []
+        self._model.reset(parse_yolo(self.label_path(), *self.image_size, self.skipped_lines) if self.output_dir else [])
+
+    def step(self, direction):
+        """Index of the frame direction steps away, wrapping around."""
+        return (self.current_index + direction) % len(self.image_list)
+
+    def navigate(self, direction, save=True):
+        if self.image_list:
+            self.open(self.step(direction), save)
+
+    def save(self):
+        """Writes the current frame's labels. Returns the label path, or None if nothing was written."""
+        if self.current_index == -1 or not self.output_dir:
+            return None
+        txt_path = self.label_path()
+
+        # Filter out only unlabeled boxes (class_id == -1), preserve all valid annotations
+        # This preserves labels with class IDs not in predefined_classes.txt
+        final_boxes = [b for b in self.boxes if b['class_id'] != -1]
+
+        # Save if we have boxes or file exists (to update/clear it)
+        if final_boxes or os.path.exists(txt_path):
+            save_yolo(txt_path, final_boxes, self.skipped_lines)
+            self.emit('saved', path=txt_path)
+            return txt_path
+        return None
+
+    # --- Selection & Clipboard ---
+    def select(self, indices):
+        self._model.select(indices)
+
+    def copy(self, indices=None):
+        """Copies the given boxes (default: the selection, or all boxes if nothing is selected)."""
+        indices = self.selected if indices is None else indices
+        if indices:
+            self.clipboard = [self.boxes[i].copy() for i in indices]
+        else:
+            self.clipboard = [b.copy() for b in self.boxes]
+        return len(self.clipboard)
+
+    def paste(self):
+        """Appends copies of the clipboard boxes. Returns their indices."""
+        return self.add_boxes(self.clipboard, select=False)
+
+    # --- Box Mutations ---
+    def add_boxes(self, boxes, select=True):
+        """Appends copies of boxes, optionally selecting them. Returns their indices."""
+        if not boxes:
+            return []
+        first = len(self._model)
+        self._model.extend(b.copy() for b in boxes)
+        indices = list(range(first, len(self._model)))
+        if select:
+            self._model.select(indices)
+        return indices
+
+    def remove_boxes(self, indices):
+        """Deletes the boxes at indices and clears the selection."""
+        self._model.remove_indices(indices)
+        self._model.select(set())
+
+    def set_class(self, indices, class_id):
+        self._model.update(indices, class_id=class_id)
+
+    def set_geometry(self, index, x1, y1, x2, y2):
+        """Replaces the box's coordinates with the pixel rectangle, keeping its class."""
+        iw, ih = self.image_size
+        # Ensure x1 < x2, y1 < y2 logic handled by normalize_box
+        new_box = normalize_box(x1, y1, x2, y2, iw, ih)
+        new_box['class_id'] = self._model[index]['class_id'] # Keep class
+        self._model[index] = new_box
+
+    # --- Box Editing Maths (image pixels) ---
+    def box_at(self, x, y):
+        """Index of the top-most box containing the point, or -1."""
+        if self.image_size is None:
+            return -1
+        iw, ih = self.image_size
+        # Reverse search to find top-most
+        for i in range(len(self.boxes) - 1, -1, -1):
+            bx1, by1, bx2, by2 = denormalize_box(self.boxes[i], iw, ih)
+            if bx1 <= x <= bx2 and by1 <= y <= by2:
+                return i
+        return -1
+
+    def move_box(self, index, dx, dy):
+        """Moves a box by (dx, dy), keeping its size and keeping it inside the image."""
+        iw, ih = self.image_size
+        x1, y1, x2, y2 = denormalize_box(self.boxes[index], iw, ih)
+        x1 += dx
+        y1 += dy
+        x2 += dx
+        y2 += dy
+
+        # We need to check width/height to ensure we don't collapse or go out
+        w = x2 - x1
+        h = y2 - y1
+
+        if x1 < 0: x1 = 0; x2 = w
+        if y1 < 0: y1 = 0; y2 = h
+        if x2 > iw: x2 = iw; x1 = iw - w
+        if y2 > ih: y2 = ih; y1 = ih - h
+
+        self.set_geometry(index, x1, y1, x2, y2)
+
+    def resize_box(self, index, handle, dx, dy):
+        """Moves the corner handle ('nw', 'ne', 'sw' or 'se') of a box by (dx, dy)."""
+        iw, ih = self.image_size
+        x1, y1, x2, y2 = denormalize_box(self.boxes[index], iw, ih)
+
+        if handle == 'nw':
+            x1 += dx; y1 += dy
+        elif handle == 'ne':
+            x2 += dx; y1 += dy
+        elif handle == 'sw':
+            x1 += dx; y2 += dy
+        elif handle == 'se':
+            x2 += dx; y2 += dy
+
+        # Clamp to [0, iw] and [0, ih]
+        x1 = max(0, min(iw, x1))
+        y1 = max(0, min(ih, y1))
+        x2 = max(0, min(iw, x2))
+        y2 = max(0, min(ih, y2))
+
+        self.set_geometry(index, x1, y1, x2, y2)
+
+    def add_drawn_box(self, x1, y1, x2, y2, class_id):
+        """Adds (and selects) a box dragged from (x1, y1) to (x2, y2). Returns its index."""
+        iw, ih = self.image_size
+        x1 = max(0, min(iw, x1))
+        y1 = max(0, min(ih, y1))
+        x2 = max(0, min(iw, x2))
+        y2 = max(0, min(ih, y2))
+
+        new_box = normalize_box(x1, y1, x2, y2, iw, ih)
+        new_box['class_id'] = class_id
+        return self.add_boxes([new_box])[0]
+
+    def stamp_box(self, x, y, width=DEFAULT_STAMP_SIZE, height=DEFAULT_STAMP_SIZE, class_id=-1):
+        """Adds (and selects) a width x height box with its top-left corner at (x, y). Returns its index."""
+        iw, ih = self.image_size
+        x1 = x
+        y1 = y
+        x2 = x + width
+        y2 = y + height
+
+        # Clamp stamp to image
+        if x2 > iw: x1 = iw - width; x2 = iw
+        if y2 > ih: y1 = ih - height; y2 = ih
+        if x1 < 0: x1 = 0
+        if y1 < 0: y1 = 0
+
+        new_box = normalize_box(x1, y1, x2, y2, iw, ih)
+        new_box['class_id'] = class_id
+        return self.add_boxes([new_box])[0]
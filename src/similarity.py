@@ -0,0 +1,153 @@
+import os
+import json
+import concurrent.futures
+import numpy as np
+from PIL import Image
+
+INDEX_DATA_NAME = ".similarity_index.npy"
+INDEX_META_NAME = ".similarity_index.json"
+
+HIST_BINS = 4 # per RGB channel -> 64 bins
+THUMB_SIZE = (16, 16) # gray thumbnail -> 256 values
+DESCRIPTOR_DIM = HIST_BINS ** 3 + THUMB_SIZE[0] * THUMB_SIZE[1]
+DEFAULT_K = 50
+
+def compute_descriptor(path):
+    """
+    Computes a compact appearance descriptor for an image: a coarse RGB colour
+    histogram followed by a mean-centred 16x16 gray thumbnail. Both parts are
+    L2-normalized, so the dot product of two descriptors is a cosine similarity in [-1, 1].
+
+    Returns:
+        np.ndarray: float32 vector of length DESCRIPTOR_DIM.
+    """
+    img = Image.open(path)
+    img.draft('RGB', (THUMB_SIZE[0] * 8, THUMB_SIZE[1] * 8))
+    img = img.convert('RGB')
+    small = np.asarray(img.resize((64, 64), Image.BILINEAR), dtype=np.uint8)
+
+    quantized = (small // (256 // HIST_BINS)).reshape(-1, 3).astype(np.int32)
+    codes = (quantized[:, 0] * HIST_BINS + quantized[:, 1]) * HIST_BINS + quantized[:, 2]
+    hist = np.bincount(codes, minlength=HIST_BINS ** 3).astype(np.float32)
+    hist = np.sqrt(hist) # damp dominant colours
+    hist /= max(np.linalg.norm(hist), 1e-6)
+
+    thumb = np.asarray(img.convert('L').resize(THUMB_SIZE, Image.BILINEAR), dtype=np.float32).flatten()
+    thumb -= thumb.mean()
+    thumb /= max(np.linalg.norm(thumb), 1e-6)
+
+    descriptor = np.concatenate([hist, thumb])
+    return descriptor / np.sqrt(2.0)
+
+def _descriptor_file(path):
+    try:
+        return compute_descriptor(path)
+    except Exception as e:
+        print(f"Error describing {path}: {e}")
+        return None
+
+class SimilarityIndex:
+    """
+    Per-folder descriptor index stored as one memory-mapped float16 matrix
+    (one row per image) next to a JSON file listing the filenames and mtimes.
+    """
+    def __init__(self, image_dir):
+        self.image_dir = image_dir
+        self.data_path = os.path.join(image_dir, INDEX_DATA_NAME)
+        self.meta_path = os.path.join(image_dir, INDEX_META_NAME)
+        self.filenames = []
+        self.mtimes = []
+        self.rows = {} # filename -> row
+        self.matrix = None
+
+    def load(self):
+        """Opens an existing index. Returns True if one was found."""
+        if not (os.path.exists(self.data_path) and os.path.exists(self.meta_path)):
+            return False
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            matrix = np.load(self.data_path, mmap_mode='r')
+        except Exception as e:
+            print(f"Error loading similarity index: {e}")
+            return False
+        if matrix.shape != (len(meta['filenames']), DESCRIPTOR_DIM):
+            return False
+        self.filenames = meta['filenames']
+        self.mtimes = meta['mtimes']
+        self.rows = {f: i for i, f in enumerate(self.filenames)}
+        self.matrix = matrix
+        return True
+
+    def build(self, filenames, progress_callback=None, max_workers=None):
+        """
+        (Re)builds the index for filenames. Rows of unchanged images are copied from
+        the previous index; the others are computed in a process pool.
+        """
+        old_rows = {}
+        if self.load():
+            old_rows = {f: (i, self.mtimes[i]) for i, f in enumerate(self.filenames)}
+
+        mtimes = []
+        for f in filenames:
+            try:
+                mtimes.append(os.path.getmtime(os.path.join(self.image_dir, f)))
+            except OSError:
+                mtimes.append(0)
+
+        tmp_path = self.data_path + ".tmp.npy"
+        matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float16,
+                                           shape=(len(filenames), DESCRIPTOR_DIM))
+        todo = []
+        for i, (f, mtime) in enumerate(zip(filenames, mtimes)):
+            old = old_rows.get(f)
+            if old and old[1] == mtime:
+                matrix[i] = self.matrix[old[0]]
+            else:
+                todo.append(i)
+
+        total = len(todo)
+        if todo:
+            paths = [os.path.join(self.image_dir, filenames[i]) for i in todo]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(_descriptor_file, paths, chunksize=32)
+                for done, (i, vector) in enumerate(zip(todo, results), 1):
+                    matrix[i] = vector if vector is not None else 0
+                    if progress_callback:
+                        progress_callback(done, total)
+
+        matrix.flush()
+        del matrix
+        self.matrix = None
+        os.replace(tmp_path, self.data_path)
+        with open(self.meta_path, 'w') as f:
+            json.dump({'filenames': list(filenames), 'mtimes': mtimes}, f)
+        self.load()
+
+    def descriptor(self, filename):
+        """Returns the stored descriptor of filename, computing it if it is not indexed."""
+        row = self.rows.get(filename)
+        if row is not None:
+            return np.asarray(self.matrix[row], dtype=np.float32)
+        return compute_descriptor(os.path.join(self.image_dir, filename))
+
+    def query(self, vector, k=DEFAULT_K, chunk_size=65536):
+        """
+        Returns the k most similar indexed images.
+
+        Returns:
+            list: (filename, similarity) pairs, most similar first.
+        """
+        if self.matrix is None or len(self.filenames) == 0:
+            return []
+
+        vector = np.asarray(vector, dtype=np.float32)
+        scores = np.empty(len(self.filenames), dtype=np.float32)
+        for start in range(0, len(self.filenames), chunk_size):
+            chunk = np.asarray(self.matrix[start:start + chunk_size], dtype=np.float32)
+            scores[start:start + len(chunk)] = chunk @ vector
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.filenames[i], float(scores[i])) for i in top]
@@ -0,0 +1,253 @@
+import io
+import os
+import json
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from PIL import Image
+
+from src.utils import make_thumbnail
+
+PACK_NAME = ".thumbnails.pack"
+INDEX_NAME = ".thumbnails.idx"
+
+THUMB_SIZE = (160, 90)
+THUMB_QUALITY = 80
+BATCH_SIZE = 256
+COMPACT_MIN_DEAD_BYTES = 8 * 1024 * 1024
+COMPACT_DEAD_RATIO = 0.5 # compact once superseded blobs are this share of the pack
+
+class _PackState:
+    """Locks shared by every ThumbnailCache of one pack file."""
+    def __init__(self):
+        self.build_lock = threading.RLock() # one build (and compaction) at a time
+        self.io_lock = threading.Lock() # reads vs. the pack swap of compact()
+        self.generation = 0 # bumped by compact(): offsets read before it are stale
+
+_packs = {} # real pack path -> _PackState
+_packs_lock = threading.Lock()
+
+def _pack_state(pack_path):
+    with _packs_lock:
+        return _packs.setdefault(os.path.realpath(pack_path), _PackState())
+
+def _thumbnail_file(path, size=THUMB_SIZE):
+    """Process pool worker: the JPEG bytes of the thumbnail of path, or None."""
+    try:
+        img = make_thumbnail(path, size)
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=THUMB_QUALITY)
+        return buffer.getvalue()
+    except Exception as e:
+        print(f"Error creating thumbnail {path}: {e}")
+        return None
+
+class ThumbnailCache:
+    """
+    Per-folder thumbnail store: JPEG thumbnails appended to one packed file next to
+    an append-only JSONL index of [filename, mtime, size, offset, length] entries.
+    An entry is valid while the image's mtime and file size are unchanged; a newer
+    entry for the same filename supersedes the older one. build() compacts the
+    pack once the superseded and outdated blobs take up too much of it.
+
+    Builds of the same pack are serialized, also across instances (e.g. when a
+    folder is reopened while the previous build is still finishing its batch).
+    """
+    def __init__(self, image_dir, size=THUMB_SIZE, max_decoded=512):
+        self.image_dir = image_dir
+        self.size = size
+        self.pack_path = os.path.join(image_dir, PACK_NAME)
+        self.index_path = os.path.join(image_dir, INDEX_NAME)
+        self.entries = {} # filename -> (mtime, size, offset, length)
+        self.max_decoded = max_decoded
+        self._decoded = OrderedDict() # filename -> PIL Image
+        self._lock = threading.Lock()
+        self._pack = _pack_state(self.pack_path)
+        self._generation = -1 # pack generation the entries were loaded at
+
+    def load(self):
+        """Reads the index. Returns the number of entries."""
+        generation = self._pack.generation
+        entries = {}
+        if os.path.exists(self.index_path) and os.path.exists(self.pack_path):
+            pack_size = os.path.getsize(self.pack_path)
+            try:
+                with open(self.index_path, 'r') as f:
+                    for line in f:
+                        try:
+                            name, mtime, size, offset, length = json.loads(line)
+                        except ValueError:
+                            continue # torn last line of an interrupted build
+                        if offset + length <= pack_size:
+                            entries[name] = (mtime, size, offset, length)
+            except Exception as e:
+                print(f"Error loading thumbnail index: {e}")
+        with self._lock:
+            self.entries = entries
+            self._generation = generation
+            self._decoded.clear()
+        return len(entries)
+
+    def _stat(self, filename):
+        try:
+            st = os.stat(os.path.join(self.image_dir, filename))
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def is_current(self, filename, stat=None):
+        entry = self.entries.get(filename)
+        if entry is None:
+            return False
+        stat = stat or self._stat(filename)
+        return stat is not None and (entry[0], entry[1]) == stat
+
+    def get(self, filename):
+        """Returns the cached thumbnail of filename, or None if it is missing or outdated."""
+        if self._generation != self._pack.generation and self._generation != -1:
+            with self._pack.io_lock:
+                self.load() # another instance compacted the pack
+        with self._lock:
+            img = self._decoded.get(filename)
+            if img is not None:
+                self._decoded.move_to_end(filename)
+                return img
+            entry = self.entries.get(filename)
+        if entry is None or not self.is_current(filename):
+            return None
+
+        try:
+            # compact() may swap the pack and the offsets, also from another instance
+            with self._pack.io_lock:
+                with self._lock:
+                    entry = self.entries.get(filename) if self._generation == self._pack.generation else None
+                if entry is None:
+                    return None # compacted meanwhile, picked up by the next get()
+                with open(self.pack_path, 'rb') as f:
+                    f.seek(entry[2])
+                    data = f.read(entry[3])
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except Exception as e:
+            print(f"Error reading thumbnail {filename}: {e}")
+            return None
+
+        with self._lock:
+            self._decoded[filename] = img
+            while len(self._decoded) > self.max_decoded:
+                self._decoded.popitem(last=False)
+        return img
+
+    def dead_bytes(self):
+        """Bytes of the pack not referenced by a current entry"""
+        if not os.path.exists(self.pack_path):
+            return 0
+        with self._lock:
+            entries = dict(self.entries)
+        live = sum(e[3] for name, e in entries.items() if self.is_current(name))
+        return os.path.getsize(self.pack_path) - live
+
+    def compact(self):
+        """
+        Rewrites the pack and the index with only the current entries.
+        Waits for a build of the same pack to finish.
+
+        Returns:
+            int: Bytes reclaimed.
+        """
+        with self._pack.build_lock:
+            return self._compact()
+
+    def _compact(self):
+        if not os.path.exists(self.pack_path):
+            return 0
+        before = os.path.getsize(self.pack_path)
+        with self._lock:
+            entries = dict(self.entries)
+        live = {name: e for name, e in entries.items() if self.is_current(name)}
+
+        new_entries = {}
+        with open(self.pack_path, 'rb') as old, open(self.pack_path + ".tmp", 'wb') as pack, \
+                open(self.index_path + ".tmp", 'w') as index:
+            for name, (mtime, size, offset, length) in sorted(live.items(), key=lambda item: item[1][2]):
+                old.seek(offset)
+                new_offset = pack.tell()
+                pack.write(old.read(length))
+                new_entries[name] = (mtime, size, new_offset, length)
+                index.write(json.dumps([name, mtime, size, new_offset, length]) + "\n")
+
+        with self._pack.io_lock, self._lock:
+            os.replace(self.pack_path + ".tmp", self.pack_path)
+            os.replace(self.index_path + ".tmp", self.index_path)
+            self.entries = new_entries
+            self._pack.generation += 1
+            self._generation = self._pack.generation
+        return before - os.path.getsize(self.pack_path)
+
+    def build(self, filenames, progress_callback=None, should_stop=None, max_workers=None):
+        """
+        Generates the missing and outdated thumbnails of filenames (in the given order,
+        e.g. nearest to the current frame first) in a process pool and appends them
+        to the pack. progress_callback(done, total) runs after every batch; the build
+        ends early when should_stop() returns True. A build of the same pack that is
+        still running is waited for first.
+
+        Returns:
+            int: Number of thumbnails written.
+        """
+        with self._pack.build_lock:
+            return self._build(filenames, progress_callback, should_stop, max_workers)
+
+    def _build(self, filenames, progress_callback, should_stop, max_workers):
+        if should_stop and should_stop():
+            return 0
+        self.load()
+        dead = self.dead_bytes()
+        if dead >= COMPACT_MIN_DEAD_BYTES and dead >= COMPACT_DEAD_RATIO * os.path.getsize(self.pack_path):
+            self._compact()
+
+        todo = []
+        for filename in filenames:
+            stat = self._stat(filename)
+            if stat is not None and not self.is_current(filename, stat):
+                todo.append((filename, stat))
+
+        total = len(todo)
+        written = 0
+        if not todo:
+            return 0
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                open(self.pack_path, 'ab') as pack, open(self.index_path, 'a') as index:
+            for start in range(0, total, BATCH_SIZE):
+                if should_stop and should_stop():
+                    break
+                batch = todo[start:start + BATCH_SIZE]
+                paths = [os.path.join(self.image_dir, f) for f, _ in batch]
+                results = executor.map(_thumbnail_file, paths, [self.size] * len(paths), chunksize=16)
+
+                lines = []
+                new_entries = {}
+                # The file size, not tell(): the pack may have been written through another handle
+                pack.flush()
+                offset = os.fstat(pack.fileno()).st_size
+                for (filename, (mtime, size)), data in zip(batch, results):
+                    if data is None:
+                        continue
+                    pack.write(data)
+                    new_entries[filename] = (mtime, size, offset, len(data))
+                    lines.append(json.dumps([filename, mtime, size, offset, len(data)]) + "\n")
+                    offset += len(data)
+                # The pack must hold the bytes before the index points at them
+                pack.flush()
+                index.writelines(lines)
+                index.flush()
+
+                with self._lock:
+                    self.entries.update(new_entries)
+                    for filename in new_entries:
+                        self._decoded.pop(filename, None)
+                written += len(new_entries)
+                if progress_callback:
+                    progress_callback(min(start + BATCH_SIZE, total), total)
+        return written
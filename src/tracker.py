@@ -0,0 +1,93 @@
+import numpy as np
+from src.auto_annotate import box_to_pixels, find_template
+
+DEFAULT_SEARCH_RADIUS = 0.03
+DEFAULT_MIN_SCORE = 0.5
+MAX_PATCH_SIZE = 64
+
+def _gray_crop(img, bounds, factor):
+    """Crops a PIL image, downsamples by factor and returns a float32 grayscale array."""
+    crop = img.crop(bounds).convert('L')
+    if factor > 1:
+        w = max(1, int(round(crop.width / factor)))
+        h = max(1, int(round(crop.height / factor)))
+        crop = crop.resize((w, h))
+    return np.asarray(crop, dtype=np.float32)
+
+def track_box(prev_img, next_img, box, search_radius=DEFAULT_SEARCH_RADIUS):
+    """
+    Finds a box of the previous frame again in the next frame.
+
+    The patch under the box is matched by normalized cross-correlation inside a
+    window around the box's previous position. Large boxes are downsampled so the
+    patch is at most MAX_PATCH_SIZE pixels on its longest side.
+
+    Args:
+        prev_img (PIL.Image): Frame the box is labeled on.
+        next_img (PIL.Image): Frame to search. Must have the same size.
+        box (dict): Normalized box on prev_img.
+        search_radius (float): Window margin around the box, as a fraction of the image size.
+
+    Returns:
+        tuple: (score, new_box) or None if the box could not be matched.
+    """
+    iw, ih = prev_img.size
+    if next_img.size != (iw, ih):
+        return None
+
+    x1, y1, x2, y2 = box_to_pixels(box, iw, ih)
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+
+    rx = int(round(search_radius * iw))
+    ry = int(round(search_radius * ih))
+    sx1, sy1 = max(0, x1 - rx), max(0, y1 - ry)
+    sx2, sy2 = min(iw, x2 + rx), min(ih, y2 + ry)
+
+    factor = max(1.0, max(x2 - x1, y2 - y1) / MAX_PATCH_SIZE)
+    template = _gray_crop(prev_img, (x1, y1, x2, y2), factor)
+    search = _gray_crop(next_img, (sx1, sy1, sx2, sy2), factor)
+
+    match = find_template(search, template, (0, 0, search.shape[1], search.shape[0]))
+    if match is None:
+        return None
+
+    score, mx, my = match
+    new_x1 = sx1 + mx * factor
+    new_y1 = sy1 + my * factor
+    new_box = dict(box)
+    new_box['x_center'] = (new_x1 + (x2 - x1) / 2) / iw
+    new_box['y_center'] = (new_y1 + (y2 - y1) / 2) / ih
+    return score, new_box
+
+def track_forward(images, boxes, search_radius=DEFAULT_SEARCH_RADIUS, min_score=DEFAULT_MIN_SCORE):
+    """
+    Propagates boxes through a sequence of frames, one step at a time.
+
+    Args:
+        images (list): PIL images; images[0] is the frame the boxes are labeled on.
+        boxes (list): Normalized boxes on images[0].
+        search_radius (float): Search window margin per step.
+        min_score (float): A box stops being tracked once its match score drops below this.
+
+    Returns:
+        list: For each of images[1:], the list of proposed boxes (each with a 'score' key).
+    """
+    tracks = [dict(b) for b in boxes]
+    results = []
+    for prev_img, next_img in zip(images, images[1:]):
+        proposals = []
+        next_tracks = []
+        for box in tracks:
+            match = track_box(prev_img, next_img, box, search_radius)
+            if match is None or match[0] < min_score:
+                continue
+            score, new_box = match
+            new_box['score'] = score
+            proposals.append(new_box)
+            next_tracks.append(new_box)
+        results.append(proposals)
+        tracks = next_tracks
+        if not tracks:
+            break
+    return results
@@ -99,3 +99,37 @@ class DarkListbox(tk.Listbox):
 class DarkScrollbar(ttk.Scrollbar):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
+
+class ProgressDialog(tk.Toplevel):
+    """
+    Small themed window showing the progress of a background batch job.
+    A modal dialog grabs all input until it is destroyed, so the user cannot
+    edit or navigate while the job rewrites label files.
+    """
+    def __init__(self, master, title, message, modal=False, **kwargs):
+        super().__init__(master, **kwargs)
+        self.title(title)
+        self.geometry("360x110")
+        self.configure(bg=THEME['bg_main'])
+        self.resizable(False, False)
+        self.transient(master)
+        if modal:
+            self.protocol("WM_DELETE_WINDOW", lambda: None)
+            self.wait_visibility()
+            self.grab_set()
+            self.focus_set()
+        
+        self.message_label = DarkLabel(self, text=message, wraplength=330)
+        self.message_label.pack(pady=(15, 5), padx=15, anchor='w')
+        
+        self.progress = ttk.Progressbar(self, orient=tk.HORIZONTAL, mode='determinate', maximum=1)
+        self.progress.pack(fill=tk.X, padx=15, pady=5)
+        
+        self.count_label = DarkLabel(self, text="0 / 0")
+        self.count_label.pack(padx=15, anchor='e')
+
+    def update_progress(self, done, total):
+        if not self.winfo_exists():
+            return
+        self.progress.configure(maximum=max(total, 1), value=done)
+        self.count_label.config(text=f"{done} / {total}")
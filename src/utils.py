@@ -3,6 +3,8 @@ import os
 import json
 import random
 import colorsys
+import concurrent.futures
+import numpy as np
 from PIL import Image
 
 def load_classes(file_path):
@@ -40,7 +42,13 @@ def load_config(path):
         "delete_box": "<Delete>",
         "copy": "<Control-c>",
         "paste": "<Control-v>",
-        "edit_class": "<Control-e>"
+        "edit_class": "<Control-e>",
+        "set_keyframe": "<k>",
+        "interpolate": "<i>",
+        "track_forward": "<t>",
+        "accept_proposals": "<Return>",
+        "toggle_perf_hud": "<F3>",
+        "toggle_input_trace": "<F9>"
     }
     if not os.path.exists(path):
         return default_config
@@ -204,11 +212,13 @@ def generate_color(class_id):
     r, g, b = [int(x * 255) for x in rgb]
     return f'#{r:02x}{g:02x}{b:02x}'
 
-def parse_yolo(file_path, img_width, img_height):
+def parse_yolo(file_path, img_width, img_height, skipped=None):
     """
     Parses a YOLO format .txt file.
     Returns a list of dicts: {'class_id': int, 'x': float, 'y': float, 'w': float, 'h': float}
     Coordinates in the returned dict are NORMALIZED (0-1).
+    Malformed lines are skipped; if skipped is a list, their raw text is appended
+    to it so save_yolo can write them back unchanged.
     """
     boxes = []
     if not os.path.exists(file_path):
@@ -219,11 +229,16 @@ def parse_yolo(file_path, img_width, img_height):
             for line in f:
                 parts = line.strip().split()
                 if len(parts) >= 5:
-                    class_id = int(parts[0])
-                    x_center = float(parts[1])
-                    y_center = float(parts[2])
-                    w = float(parts[3])
-                    h = float(parts[4])
+                    try:
+                        class_id = int(parts[0])
+                        x_center = float(parts[1])
+                        y_center = float(parts[2])
+                        w = float(parts[3])
+                        h = float(parts[4])
+                    except ValueError:
+                        if skipped is not None:
+                            skipped.append(line.rstrip("\n"))
+                        continue # malformed line, the rest of the file still loads
                     
                     boxes.append({
                         'class_id': class_id,
@@ -232,24 +247,104 @@ def parse_yolo(file_path, img_width, img_height):
                         'w': w,
                         'h': h
                     })
+                elif parts and skipped is not None:
+                    skipped.append(line.rstrip("\n"))
     except Exception as e:
         print(f"Error parsing YOLO file {file_path}: {e}")
         
     return boxes
 
-def save_yolo(file_path, boxes):
+def save_yolo(file_path, boxes, extra_lines=()):
     """
     Saves a list of boxes to a YOLO format .txt file.
     Boxes should be a list of dicts with keys: class_id, x_center, y_center, w, h (normalized).
+    extra_lines (raw lines parse_yolo skipped) are written after the boxes as they are.
     """
     try:
         with open(file_path, 'w') as f:
             for box in boxes:
                 line = f"{box['class_id']} {box['x_center']:.6f} {box['y_center']:.6f} {box['w']:.6f} {box['h']:.6f}\n"
                 f.write(line)
+            for line in extra_lines:
+                f.write(line + "\n")
     except Exception as e:
         print(f"Error saving YOLO file {file_path}: {e}")
 
+def scan_images_for_class(output_dir, filenames, class_id, max_workers=None):
+    """
+    Finds the images whose annotation file contains at least one box of class_id.
+    
+    Args:
+        output_dir (str): Directory containing the YOLO .txt files.
+        filenames (list): Image filenames to check.
+        class_id (int): Class to look for.
+        max_workers (int): Thread count for the file reads (default: executor default).
+    
+    Returns:
+        list: Matching filenames, in the order of filenames.
+    """
+    def check_file(filename):
+        name, _ = os.path.splitext(filename)
+        txt_path = os.path.join(output_dir, name + ".txt")
+        if os.path.exists(txt_path):
+            try:
+                with open(txt_path, 'r') as f:
+                    for line in f:
+                        parts = line.strip().split()
+                        if parts and int(parts[0]) == class_id:
+                            return filename
+            except:
+                pass
+        return None
+
+    # Use threading for faster IO
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(check_file, filenames))
+    return [r for r in results if r is not None]
+
+def get_label_path(output_dir, image_filename):
+    """
+    Returns the path of the YOLO .txt file belonging to an image filename.
+    """
+    name, _ = os.path.splitext(image_filename)
+    return os.path.join(output_dir, name + ".txt")
+
+def boxes_to_array(boxes):
+    """
+    Converts a list of box dicts to a float array of shape (N, 4) holding
+    normalized (x_center, y_center, w, h) rows.
+    """
+    if not boxes:
+        return np.zeros((0, 4), dtype=np.float64)
+    return np.array([[b['x_center'], b['y_center'], b['w'], b['h']] for b in boxes], dtype=np.float64)
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Computes the pairwise IoU between two sets of boxes.
+    
+    Args:
+        boxes_a: (N, 4) array or list of box dicts (normalized x_center, y_center, w, h).
+        boxes_b: (M, 4) array or list of box dicts.
+    
+    Returns:
+        np.ndarray: (N, M) matrix of IoU values.
+    """
+    a = boxes_a if isinstance(boxes_a, np.ndarray) else boxes_to_array(boxes_a)
+    b = boxes_b if isinstance(boxes_b, np.ndarray) else boxes_to_array(boxes_b)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float64)
+    
+    a_x1 = a[:, 0] - a[:, 2] / 2; a_x2 = a[:, 0] + a[:, 2] / 2
+    a_y1 = a[:, 1] - a[:, 3] / 2; a_y2 = a[:, 1] + a[:, 3] / 2
+    b_x1 = b[:, 0] - b[:, 2] / 2; b_x2 = b[:, 0] + b[:, 2] / 2
+    b_y1 = b[:, 1] - b[:, 3] / 2; b_y2 = b[:, 1] + b[:, 3] / 2
+    
+    inter_w = np.clip(np.minimum(a_x2[:, None], b_x2[None, :]) - np.maximum(a_x1[:, None], b_x1[None, :]), 0, None)
+    inter_h = np.clip(np.minimum(a_y2[:, None], b_y2[None, :]) - np.maximum(a_y1[:, None], b_y1[None, :]), 0, None)
+    inter = inter_w * inter_h
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-12), 0.0)
+
 def denormalize_box(box, img_width, img_height):
     """
     Convert normalized YOLO coordinates (center_x, center_y, w, h) to pixel coordinates (x1, y1, x2, y2).
@@ -282,6 +377,17 @@ def normalize_box(x1, y1, x2, y2, img_width, img_height):
         'h': h / img_height
     }
 
+def make_thumbnail(path, size=(320, 320)):
+    """
+    Decodes an image as an RGB thumbnail that fits into size.
+    JPEGs are decoded with DCT scaling (draft), so only a fraction of the pixels are decoded.
+    """
+    with Image.open(path) as img:
+        img.draft('RGB', size)
+        img = img.convert('RGB')
+    img.thumbnail(size)
+    return img
+
 def resize_images_to_lowres(input_folder, target_width=720):
     """
     Resizes images in a folder to lower resolution and saves them to a new directory.
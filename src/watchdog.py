@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+DEFAULT_THRESHOLD = 0.5 # seconds without a heartbeat before a stall is reported
+DEFAULT_INTERVAL = 0.1
+STALL_LOG_NAME = "stall_log.txt"
+
+class StallWatchdog:
+    """
+    Detects freezes of the Tk event loop.
+
+    The main thread schedules a heartbeat through root.after(); a daemon thread
+    checks how long ago the last heartbeat ran. When the gap exceeds the threshold,
+    the main thread's stack is captured with sys._current_frames() so the blocking
+    call can be identified. Stalls are appended to a log file and aggregated per
+    call site for a session summary.
+    """
+    def __init__(self, root, threshold=DEFAULT_THRESHOLD, interval=DEFAULT_INTERVAL, log_path=STALL_LOG_NAME):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.log_path = log_path
+        self.stalls = [] # dicts: start, duration, site, stack
+        self._last_beat = time.perf_counter()
+        self._main_ident = threading.main_thread().ident
+        self._current = None # stall in progress
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._last_beat = time.perf_counter()
+        self.root.after(int(self.interval * 1000), self._beat)
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _beat(self):
+        self._last_beat = time.perf_counter()
+        if self._running:
+            self.root.after(int(self.interval * 1000), self._beat)
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.interval)
+            gap = time.perf_counter() - self._last_beat
+
+            with self._lock:
+                if gap > self.threshold and self._current is None:
+                    frame = sys._current_frames().get(self._main_ident)
+                    stack = traceback.extract_stack(frame) if frame else []
+                    self._current = {
+                        'start': datetime.now() - timedelta(seconds=gap),
+                        'beat': self._last_beat,
+                        'site': self._stall_site(stack),
+                        'stack': ''.join(traceback.format_list(stack))
+                    }
+                elif self._current is not None and self._last_beat != self._current['beat']:
+                    # The loop is responsive again: close the stall
+                    self._current['duration'] = self._last_beat - self._current['beat']
+                    self._finish(self._current)
+                    self._current = None
+
+    def _stall_site(self, stack):
+        """Innermost frame that belongs to this application, else the innermost frame."""
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for entry in reversed(stack):
+            path = os.path.abspath(entry.filename)
+            if path.startswith(app_dir) and not path.endswith('watchdog.py'):
+                return f"{os.path.relpath(path, app_dir)}:{entry.lineno} in {entry.name}"
+        if stack:
+            entry = stack[-1]
+            return f"{entry.filename}:{entry.lineno} in {entry.name}"
+        return "unknown"
+
+    def _finish(self, stall):
+        self.stalls.append(stall)
+        try:
+            with open(self.log_path, 'a') as f:
+                f.write(f"[{stall['start']:%Y-%m-%d %H:%M:%S}] Stall of {stall['duration']:.2f}s at {stall['site']}\n")
+                f.write(stall['stack'])
+                f.write("\n")
+        except Exception as e:
+            print(f"Error writing stall log: {e}")
+
+    def summary(self, top=10):
+        """
+        Aggregates the session's stalls per call site.
+
+        Returns:
+            list: Dicts with site, count, total and max duration (seconds), longest total first.
+        """
+        with self._lock:
+            stalls = list(self.stalls)
+
+        sites = {}
+        for stall in stalls:
+            entry = sites.setdefault(stall['site'], {'site': stall['site'], 'count': 0, 'total': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += stall['duration']
+            entry['max'] = max(entry['max'], stall['duration'])
+        return sorted(sites.values(), key=lambda e: e['total'], reverse=True)[:top]
+
+    def format_summary(self, top=10):
+        rows = self.summary(top)
+        if not rows:
+            return "No event-loop stalls recorded this session."
+        lines = [f"{'total':>8} {'max':>7} {'count':>6}  site"]
+        for row in rows:
+            lines.append(f"{row['total']:>7.2f}s {row['max']:>6.2f}s {row['count']:>6}  {row['site']}")
+        return "\n".join(lines)
+
+    def write_summary(self):
+        """Appends the session summary to the stall log (if anything stalled)."""
+        if not self.stalls:
+            return
+        try:
+            with open(self.log_path, 'a') as f:
+                f.write(f"=== Session summary ({datetime.now():%Y-%m-%d %H:%M:%S}) ===\n")
+                f.write(self.format_summary() + "\n\n")
+        except Exception as e:
+            print(f"Error writing stall summary: {e}")